@@ -6,9 +6,12 @@ Provides comprehensive server information including mods, player counts, and rea
 
 import aiohttp
 import asyncio
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+from collections import OrderedDict
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from dataclasses import dataclass, field
 from dzgui_database import ServerRecord
+from dzgui_http import get_http_session
+from dzgui_metrics import get_metrics
 import time
 
 @dataclass
@@ -32,43 +35,56 @@ class BattleMetricsServer:
     details: Dict
     last_seen: str
 
+@dataclass
+class CachedResult:
+    """Servers already fetched for one filter set, plus the cursor to continue from"""
+    servers: List[BattleMetricsServer] = field(default_factory=list)
+    next_url: Optional[str] = None  # links.next of the last page fetched
+    exhausted: bool = False         # the API has no more pages for this filter set
+    fetched_at: float = field(default_factory=time.time)
+
 class BattleMetricsAPI:
     """BattleMetrics API client for DayZ servers"""
     
     BASE_URL = "https://api.battlemetrics.com"
     
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = None, result_ttl: float = 120, result_cache_size: int = 32):
         self.session = None
+        # Overridable so the pipeline can be benchmarked against a local stand-in server
+        self.base_url = base_url or self.BASE_URL
+        
+        # LRU of results per normalized filter set; fresh entries are served without any request
+        self.result_ttl = result_ttl
+        self.result_cache_size = result_cache_size
+        self.result_cache: "OrderedDict[Tuple, CachedResult]" = OrderedDict()
     
     async def _get_session(self):
-        """Get or create aiohttp session"""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
+        """Get the process-wide keep-alive session"""
+        self.session = await get_http_session()
         return self.session
     
     async def close(self):
-        """Close the session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Release the session (the shared pool is closed by dzgui_http on shutdown)"""
+        self.session = None
     
-    async def get_dayz_servers(self, limit: int = 100, page_size: int = 100, filters: Dict[str, str] = None) -> List[BattleMetricsServer]:
+    async def get_dayz_servers(self, limit: int = 100, page_size: int = 100, filters: Dict[str, str] = None,
+                               force: bool = False) -> List[BattleMetricsServer]:
         """Get DayZ servers from BattleMetrics API - only online servers sorted by popularity
-        Optimized sequential approach (BattleMetrics only supports cursor-based pagination)
+        Collects the streaming page pipeline (BattleMetrics only supports cursor-based pagination)
         
         Args:
             limit: Maximum number of servers to fetch
             page_size: Servers per page (max 100)
             filters: Additional API filters (country, search term, etc.)
+            force: Ignore cached results for this filter set
         """
         servers = []
-        session = await self._get_session()
         
         try:
-            print(f"🎯 Fetching {limit} online DayZ servers from BattleMetrics (optimized)...")
+            print(f"🎯 Fetching {limit} online DayZ servers from BattleMetrics (streaming)...")
             
-            # Use optimized sequential pagination with filters
-            await self._fetch_sequential_pages(session, servers, limit, 1, filters)
+            async for batch in self.iter_dayz_servers(limit=limit, filters=filters, force=force):
+                servers.extend(batch)
             
             print(f"🎯 Total BattleMetrics servers fetched: {len(servers)}")
             
@@ -77,80 +93,155 @@ class BattleMetricsAPI:
         
         return servers
     
-    async def _fetch_single_page(self, session, page_num: int, params: dict) -> List[BattleMetricsServer]:
-        """Fetch a single page of servers"""
+    async def iter_dayz_servers(self, limit: int = 100, filters: Dict[str, str] = None,
+                                force: bool = False) -> AsyncIterator[List[BattleMetricsServer]]:
+        """Stream DayZ servers page by page as `BattleMetricsServer` batches
+        
+        A producer task follows `links.next` as soon as each page arrives while pages
+        already received are parsed on a worker thread, so network and parsing overlap.
+        
+        Results are cached per filter set for `result_ttl` seconds: a fresh entry is
+        replayed without any request, and a larger `limit` only fetches the missing
+        servers by resuming from the stored cursor. `force` starts over from page one.
+        """
+        key = self._cache_key(filters)
+        entry = self._cached_result(key) if not force else None
+        
+        total = 0
+        if entry is not None:
+            cached = entry.servers[:limit]
+            for start in range(0, len(cached), 100):
+                yield cached[start:start + 100]
+            total = len(cached)
+            if total >= limit or entry.exhausted:
+                print(f"♻️ BattleMetrics cache hit: {total} servers, no request needed")
+                get_metrics().incr("bm.cache_hit")
+                return
+            print(f"♻️ BattleMetrics cache hit: {total} servers, resuming cursor for {limit - total} more")
+            get_metrics().incr("bm.cache_resume")
+        else:
+            entry = CachedResult()
+        
+        session = await self._get_session()
+        loop = asyncio.get_running_loop()
+        pages = asyncio.Queue()
+        producer = asyncio.create_task(self._produce_pages(session, pages, limit - total, filters, entry.next_url))
+        
         try:
-            url = f"{self.BASE_URL}/servers"
-            async with session.get(url, params=params, timeout=30) as response:
-                if response.status != 200:
-                    print(f"❌ Page {page_num} error: {response.status}")
-                    return []
+            while True:
+                data = await pages.get()
+                if data is None:
+                    break
                 
-                data = await response.json()
-                return self._parse_servers(data)
+                with get_metrics().span("bm.parse") as span:
+                    page = await loop.run_in_executor(None, self._parse_servers, data)
+                    span.count = len(page)
+                # The whole page is cached so the stored cursor stays consistent with it
+                entry.servers.extend(page)
+                entry.next_url = data.get('links', {}).get('next')
+                entry.exhausted = not entry.next_url or not page
+                self._store_result(key, entry)
                 
-        except Exception as e:
-            print(f"❌ Page {page_num} exception: {e}")
-            return []
+                batch = page[:limit - total]
+                total += len(batch)
+                if batch:
+                    yield batch
+        finally:
+            if not producer.done():
+                producer.cancel()
     
-    async def _fetch_remaining_pages(self, session, servers: list, remaining: int, start_page: int):
-        """Fetch remaining pages sequentially using cursor-based pagination"""
-        # This would need cursor from last parallel request - for now use sequential
-        await self._fetch_sequential_pages(session, servers, remaining, start_page)
+    def _cache_key(self, filters: Dict[str, str] = None) -> Tuple:
+        """Normalized filter set: prefixed parameter names, trimmed lowercase values, sorted"""
+        params = self._build_params(100, filters)
+        params.pop('page[size]', None)
+        return tuple(sorted((name, " ".join(str(value).lower().split())) for name, value in params.items()))
     
-    async def _fetch_sequential_pages(self, session, servers: list, limit: int, start_page: int = 1, filters: Dict[str, str] = None):
-        """Fetch pages sequentially using cursor-based pagination"""
-        next_url = None
-        total_fetched = len(servers)
-        page = start_page
+    def _cached_result(self, key: Tuple) -> Optional[CachedResult]:
+        """Fresh cache entry for a filter set (marked most recently used), or None"""
+        entry = self.result_cache.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.fetched_at > self.result_ttl:
+            del self.result_cache[key]
+            return None
+        self.result_cache.move_to_end(key)
+        return entry
+    
+    def _store_result(self, key: Tuple, entry: CachedResult):
+        self.result_cache[key] = entry
+        self.result_cache.move_to_end(key)
+        while len(self.result_cache) > self.result_cache_size:
+            self.result_cache.popitem(last=False)
+    
+    def _build_params(self, page_size: int, filters: Dict[str, str] = None) -> Dict[str, str]:
+        """Build first-page query parameters"""
+        params = {
+            'filter[game]': 'dayz',
+            'filter[status]': 'online',
+            'page[size]': page_size,
+            'sort': '-players'
+        }
         
-        while total_fetched < limit:
-            current_page_size = min(100, limit - total_fetched)
-            
-            if next_url:
-                url = next_url
-                params = {}
-            else:
-                url = f"{self.BASE_URL}/servers"
-                params = {
-                    'filter[game]': 'dayz',
-                    'filter[status]': 'online',
-                    'page[size]': current_page_size,
-                    'sort': '-players'
-                }
-                
-                # Add custom filters
-                if filters:
-                    for key, value in filters.items():
-                        if key.startswith('filter[') or key.startswith('search'):
-                            params[key] = value
-                        else:
-                            # Auto-prefix with filter[] if not already prefixed
-                            params[f'filter[{key}]'] = value
-            
-            print(f"📡 Sequential page {page} ({current_page_size} servers)...")
-            
-            async with session.get(url, params=params, timeout=30) as response:
-                if response.status != 200:
-                    print(f"❌ BattleMetrics API error: {response.status}")
-                    break
-                
-                data = await response.json()
-                page_servers = self._parse_servers(data)
-                servers.extend(page_servers)
+        # Add custom filters
+        if filters:
+            for key, value in filters.items():
+                if key.startswith('filter[') or key.startswith('search'):
+                    params[key] = value
+                else:
+                    # Auto-prefix with filter[] if not already prefixed
+                    params[f'filter[{key}]'] = value
+        
+        return params
+    
+    async def _produce_pages(self, session, pages: asyncio.Queue, limit: int, filters: Dict[str, str] = None,
+                             start_url: Optional[str] = None):
+        """Fetch pages following cursor-based pagination, queueing raw JSON for the consumer
+        
+        `start_url` resumes from a stored `links.next` cursor instead of the first page.
+        """
+        if start_url:
+            url, params = start_url, {}
+        else:
+            url = f"{self.base_url}/servers"
+            params = self._build_params(min(100, limit), filters)
+        requested = 0
+        page = 1
+        
+        try:
+            while requested < limit:
+                print(f"📡 Streaming page {page}...")
                 
-                total_fetched += len(page_servers)
-                print(f"✓ Got {len(page_servers)} servers (total: {total_fetched})")
+                with get_metrics().span("bm.page") as span:
+                    async with session.get(url, params=params, timeout=30) as response:
+                        if response.status != 200:
+                            print(f"❌ BattleMetrics API error: {response.status}")
+                            span.errors = 1
+                            break
+                        
+                        data = await response.json()
+                    
+                    page_count = len(data.get('data', []))
+                    span.count = page_count
+                requested += page_count
+                print(f"✓ Got page {page} with {page_count} servers (total: {requested})")
                 
-                links = data.get('links', {})
-                next_url = links.get('next')
+                # Hand the page to the consumer, then immediately follow the cursor
+                pages.put_nowait(data)
                 
-                if not next_url or len(page_servers) == 0:
+                next_url = data.get('links', {}).get('next')
+                if not next_url or page_count == 0:
                     print("📄 No more pages available")
                     break
                 
+                url = next_url
+                params = {}
                 page += 1
-                await asyncio.sleep(0.1)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Error streaming BattleMetrics pages: {e}")
+        finally:
+            pages.put_nowait(None)
     
     def _parse_servers(self, data: Dict) -> List[BattleMetricsServer]:
         """Parse BattleMetrics API response into server objects"""
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+DZGUI A2S Engine - Native asyncio Source query client
+Multiplexes A2S_INFO / A2S_RULES requests for every server over a single UDP socket
+"""
+
+import asyncio
+import bz2
+import socket
+import struct
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+HEADER_SIMPLE = b"\xFF\xFF\xFF\xFF"
+HEADER_MULTI = b"\xFE\xFF\xFF\xFF"
+
+A2S_INFO_REQUEST = b"\x54Source Engine Query\x00"
+A2S_RULES_REQUEST = b"\x56"
+
+A2S_CHALLENGE_RESPONSE = 0x41  # 'A'
+A2S_INFO_RESPONSE = 0x49       # 'I'
+A2S_RULES_RESPONSE = 0x45      # 'E'
+
+KIND_INFO = "info"
+KIND_RULES = "rules"
+
+MAX_CHALLENGE_RETRIES = 3
+
+Address = Tuple[str, int]
+
+
+class A2SError(Exception):
+    """Raised when a server sends a malformed or unexpected A2S reply"""
+
+
+@dataclass
+class A2SInfo:
+    """A2S_INFO response (attribute names match python-a2s SourceInfo)"""
+    server_name: str = ""
+    map_name: str = ""
+    folder: str = ""
+    game: str = ""
+    app_id: int = 0
+    player_count: int = 0
+    max_players: int = 0
+    bot_count: int = 0
+    server_type: str = ""
+    platform: str = ""
+    password_protected: bool = False
+    vac_enabled: bool = False
+    version: str = ""
+    port: int = 0
+    steam_id: int = 0
+    keywords: str = ""
+    game_id: int = 0
+    ping: float = 0.0  # Round-trip time in seconds, measured from the moment the packet was sent
+
+
+class _PacketReader:
+    """Minimal little-endian reader for A2S payloads"""
+
+    def __init__(self, data: bytes, encoding: str = "utf-8"):
+        self.data = data
+        self.pos = 0
+        self.encoding = encoding
+
+    def remaining(self) -> int:
+        return len(self.data) - self.pos
+
+    def _unpack(self, fmt: str):
+        size = struct.calcsize(fmt)
+        if self.pos + size > len(self.data):
+            raise A2SError("Truncated A2S packet")
+        value = struct.unpack_from(fmt, self.data, self.pos)[0]
+        self.pos += size
+        return value
+
+    def uint8(self) -> int:
+        return self._unpack("<B")
+
+    def uint16(self) -> int:
+        return self._unpack("<H")
+
+    def int16(self) -> int:
+        return self._unpack("<h")
+
+    def uint32(self) -> int:
+        return self._unpack("<I")
+
+    def uint64(self) -> int:
+        return self._unpack("<Q")
+
+    def cbytes(self) -> bytes:
+        end = self.data.find(b"\x00", self.pos)
+        if end == -1:
+            raise A2SError("Unterminated string in A2S packet")
+        value = self.data[self.pos:end]
+        self.pos = end + 1
+        return value
+
+    def cstring(self) -> str:
+        return self.cbytes().decode(self.encoding, errors="replace")
+
+
+def parse_info(payload: bytes, ping: float) -> A2SInfo:
+    """Parse an A2S_INFO body (everything after the 'I' type byte)"""
+    reader = _PacketReader(payload)
+    reader.uint8()  # protocol
+    info = A2SInfo(
+        server_name=reader.cstring(),
+        map_name=reader.cstring(),
+        folder=reader.cstring(),
+        game=reader.cstring(),
+        app_id=reader.uint16(),
+        player_count=reader.uint8(),
+        max_players=reader.uint8(),
+        bot_count=reader.uint8(),
+        server_type=chr(reader.uint8()).lower(),
+        platform=chr(reader.uint8()).lower(),
+        password_protected=bool(reader.uint8()),
+        vac_enabled=bool(reader.uint8()),
+        version=reader.cstring(),
+        ping=ping
+    )
+
+    # Extra Data Flag (optional trailing fields)
+    edf = reader.uint8() if reader.remaining() else 0
+    if edf & 0x80:
+        info.port = reader.uint16()
+    if edf & 0x10:
+        info.steam_id = reader.uint64()
+    if edf & 0x40:
+        reader.uint16()   # SourceTV port
+        reader.cstring()  # SourceTV name
+    if edf & 0x20:
+        info.keywords = reader.cstring()
+    if edf & 0x01:
+        info.game_id = reader.uint64()
+
+    return info
+
+
+def parse_rules(payload: bytes) -> Dict[bytes, bytes]:
+    """Parse an A2S_RULES body into raw key/value bytes (DayZ stores binary mod data in rules)"""
+    reader = _PacketReader(payload)
+    rule_count = reader.int16()
+    rules = {}
+    for _ in range(rule_count):
+        if not reader.remaining():
+            break
+        key = reader.cbytes()
+        rules[key] = reader.cbytes()
+    return rules
+
+
+def decode_dayz_mod_ids(rules: Dict[bytes, bytes]) -> List[str]:
+    """Extract workshop IDs from the binary mod section of DayZ A2S_RULES
+
+    DayZ splits a binary blob over two-byte rule keys and escapes 0x00/0xFF/0x01
+    (see Arma 3 ServerBrowserProtocol3).
+    """
+    chunks = sorted(
+        (int.from_bytes(key, "little"), value)
+        for key, value in rules.items()
+        if len(key) == 2
+    )
+    blob = b"".join(value for _, value in chunks)
+    if not blob:
+        return []
+
+    for sequence, char in ((b"\x01\x02", b"\x00"), (b"\x01\x03", b"\xFF"), (b"\x01\x01", b"\x01")):
+        blob = blob.replace(sequence, char)
+
+    mod_ids = []
+    try:
+        reader = _PacketReader(blob)
+        reader.uint8()  # protocol version
+        reader.uint8()  # overflow flags
+        dlc_flags = reader.uint16()
+        for _ in range(bin(dlc_flags).count("1")):
+            reader.uint32()  # DLC hash
+
+        mods_count = reader.uint8()
+        for _ in range(mods_count):
+            reader.uint32()  # mod hash
+            id_len = reader.uint8() & 0x0F
+            workshop_id = int.from_bytes(blob[reader.pos:reader.pos + id_len], "little")
+            reader.pos += id_len
+            name_len = reader.uint8()
+            reader.pos += name_len
+            if workshop_id:
+                mod_ids.append(str(workshop_id))
+    except A2SError:
+        # Truncated blob - keep whatever mods we managed to decode
+        pass
+
+    return mod_ids
+
+
+class _A2SRequest:
+    """State of a single in-flight A2S request"""
+
+    def __init__(self, address: Address, kind: str, future: asyncio.Future):
+        self.address = address
+        self.kind = kind
+        self.future = future
+        self.challenge = None
+        self.challenge_retries = 0
+        self.sent_at = 0.0
+
+    def packet(self) -> bytes:
+        if self.kind == KIND_INFO:
+            if self.challenge is None:
+                return HEADER_SIMPLE + A2S_INFO_REQUEST
+            return HEADER_SIMPLE + A2S_INFO_REQUEST + self.challenge
+        # A2S_RULES always carries a challenge, -1 asks the server for one
+        return HEADER_SIMPLE + A2S_RULES_REQUEST + (self.challenge or b"\xFF\xFF\xFF\xFF")
+
+
+class _A2SDatagramProtocol(asyncio.DatagramProtocol):
+    """Forwards every datagram on the shared socket to the client"""
+
+    def __init__(self, client: 'A2SClient'):
+        self.client = client
+
+    def datagram_received(self, data: bytes, addr):
+        self.client._on_datagram(data, addr)
+
+    def error_received(self, exc):
+        # ICMP port unreachable etc. - individual requests will time out
+        pass
+
+
+class A2SClient:
+    """Single-socket asyncio A2S client able to keep thousands of queries in flight"""
+
+    def __init__(self, recv_buffer: int = 4 * 1024 * 1024):
+        self.recv_buffer = recv_buffer
+        self.loop = None
+        self._transport = None
+        self._starting: Optional[asyncio.Task] = None  # shared by concurrent first callers
+        self._pending: Dict[Tuple[Address, str], _A2SRequest] = {}
+        # address -> message_id -> fragment number -> body; dropped with the address's last request
+        self._fragments: Dict[Address, Dict[int, Dict[int, bytes]]] = {}
+
+    async def start(self):
+        """Bind the shared UDP socket on the running loop (concurrent callers await the same bind)"""
+        if self._transport is not None:
+            return
+        if self._starting is None:
+            self.loop = asyncio.get_running_loop()
+            self._starting = self.loop.create_task(self._bind())
+        starting = self._starting
+        try:
+            await asyncio.shield(starting)
+        finally:
+            if starting.done() and (starting.cancelled() or starting.exception() is not None):
+                # Failed bind: let the next caller try again
+                if self._starting is starting:
+                    self._starting = None
+
+    async def _bind(self):
+        transport, _ = await self.loop.create_datagram_endpoint(
+            lambda: _A2SDatagramProtocol(self),
+            local_addr=('0.0.0.0', 0),
+            family=socket.AF_INET
+        )
+        self._transport = transport
+        sock = transport.get_extra_info('socket')
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer)
+            except OSError:
+                pass
+
+    def close(self):
+        """Close the socket and fail every pending request"""
+        if self._starting is not None and not self._starting.done():
+            self._starting.cancel()
+        self._starting = None
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for request in self._pending.values():
+            if not request.future.done():
+                request.future.cancel()
+        self._pending.clear()
+        self._fragments.clear()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def info(self, address: Address, timeout: float = 3.0) -> A2SInfo:
+        """Query A2S_INFO - `ping` on the result is the send->reply RTT"""
+        return await self._request(address, KIND_INFO, timeout)
+
+    async def rules(self, address: Address, timeout: float = 3.0) -> Dict[bytes, bytes]:
+        """Query A2S_RULES and return raw key/value bytes"""
+        return await self._request(address, KIND_RULES, timeout)
+
+    async def _request(self, address: Address, kind: str, timeout: float):
+        await self.start()
+        address = (address[0], int(address[1]))
+        key = (address, kind)
+
+        # Share an identical in-flight request instead of sending a duplicate
+        existing = self._pending.get(key)
+        if existing is not None:
+            return await asyncio.wait_for(asyncio.shield(existing.future), timeout)
+
+        request = _A2SRequest(address, kind, self.loop.create_future())
+        self._pending[key] = request
+        try:
+            self._send(request)
+            return await asyncio.wait_for(asyncio.shield(request.future), timeout)
+        finally:
+            if self._pending.get(key) is request:
+                del self._pending[key]
+            if all((address, other) not in self._pending for other in (KIND_INFO, KIND_RULES)):
+                # Timed out or failed with fragments missing: nothing will claim the partial reply
+                self._fragments.pop(address, None)
+
+    def _send(self, request: _A2SRequest):
+        request.sent_at = time.perf_counter()
+        self._transport.sendto(request.packet(), request.address)
+
+    def _on_datagram(self, data: bytes, addr):
+        received_at = time.perf_counter()
+        address = (addr[0], addr[1])
+        header = data[:4]
+
+        if header == HEADER_SIMPLE:
+            self._on_payload(address, data[4:], received_at)
+        elif header == HEADER_MULTI:
+            payload = self._on_fragment(address, data[4:])
+            if payload is not None:
+                self._on_payload(address, payload, received_at)
+
+    def _on_fragment(self, address: Address, data: bytes) -> Optional[bytes]:
+        """Collect a multi-packet fragment, return the reassembled payload once complete"""
+        if len(data) < 8:
+            return None
+        message_id, total, number, _ = struct.unpack_from("<IBBH", data, 0)
+        body = data[8:]
+        compressed = bool(message_id & 0x80000000)
+        if compressed and number == 0:
+            body = body[8:]  # decompressed size + CRC32
+
+        if not any((address, kind) in self._pending for kind in (KIND_INFO, KIND_RULES)):
+            return None  # late fragment of a request that already timed out
+        messages = self._fragments.setdefault(address, {})
+        parts = messages.setdefault(message_id, {})
+        parts[number] = body
+        if len(parts) < total:
+            return None
+
+        del messages[message_id]
+        if not messages:
+            del self._fragments[address]
+        payload = b"".join(parts[i] for i in sorted(parts))
+        if compressed:
+            try:
+                payload = bz2.decompress(payload)
+            except (OSError, ValueError):
+                return None
+        # Reassembled payloads usually carry their own simple header
+        if payload.startswith(HEADER_SIMPLE):
+            payload = payload[4:]
+        return payload
+
+    def _on_payload(self, address: Address, payload: bytes, received_at: float):
+        if not payload:
+            return
+        response_type = payload[0]
+
+        if response_type == A2S_CHALLENGE_RESPONSE:
+            # Source servers issue one challenge per client address - answer every request to that server
+            challenge = payload[1:5]
+            for kind in (KIND_INFO, KIND_RULES):
+                request = self._pending.get((address, kind))
+                if request is None or request.future.done():
+                    continue
+                request.challenge_retries += 1
+                if request.challenge_retries > MAX_CHALLENGE_RETRIES:
+                    request.future.set_exception(A2SError("Server keeps sending challenge responses"))
+                    continue
+                request.challenge = challenge
+                self._send(request)
+            return
+
+        if response_type == A2S_INFO_RESPONSE:
+            request = self._pending.get((address, KIND_INFO))
+            if request is None or request.future.done():
+                return
+            try:
+                request.future.set_result(parse_info(payload[1:], received_at - request.sent_at))
+            except A2SError as e:
+                request.future.set_exception(e)
+        elif response_type == A2S_RULES_RESPONSE:
+            request = self._pending.get((address, KIND_RULES))
+            if request is None or request.future.done():
+                return
+            try:
+                request.future.set_result(parse_rules(payload[1:]))
+            except A2SError as e:
+                request.future.set_exception(e)
+
+
+# Singleton instance (one socket per event loop)
+_a2s_client = None
+
+async def get_a2s_client() -> A2SClient:
+    """Get singleton A2S client bound to the running event loop"""
+    global _a2s_client
+    loop = asyncio.get_running_loop()
+    if _a2s_client is None or _a2s_client.loop is not loop:
+        if _a2s_client is not None and _a2s_client.loop is not None and not _a2s_client.loop.is_closed():
+            _a2s_client.close()
+        _a2s_client = A2SClient()
+        await _a2s_client.start()
+    return _a2s_client
+
+def close_a2s_client():
+    """Close the shared A2S socket"""
+    global _a2s_client
+    if _a2s_client:
+        _a2s_client.close()
+        _a2s_client = None
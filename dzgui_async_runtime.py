@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+DZGUI Async Runtime - One persistent asyncio loop for all network work
+Refresh, ping, mod lookup and connect are scheduled here so the Qt thread never blocks on I/O
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Callable, Coroutine, List, Optional
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+
+class TaskHandle(QObject):
+    """Qt-side view of a coroutine running on the runtime
+
+    finished/failed are always emitted on the thread that created the handle (the GUI thread).
+    """
+
+    finished = Signal(object)  # coroutine result
+    failed = Signal(str)       # error message
+    _done = Signal(object)     # internal: future completed on the runtime thread
+
+    def __init__(self, future: concurrent.futures.Future, parent=None, on_release: Callable = None):
+        super().__init__(parent)
+        self.future = future
+        self._on_release = on_release
+        self._done.connect(self._on_done)  # queued: handle lives on the caller's thread
+
+    def cancel(self):
+        """Cancel the underlying task"""
+        self.future.cancel()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    @Slot(object)
+    def _on_done(self, future: concurrent.futures.Future):
+        try:
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                self.failed.emit(str(error))
+            else:
+                self.finished.emit(future.result())
+        finally:
+            if self._on_release:
+                self._on_release(self)
+
+
+class AsyncRuntime:
+    """Background thread running a single long-lived event loop"""
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._handles = set()
+        self._shutdown_callbacks: List[Callable] = []
+
+    @property
+    def running(self) -> bool:
+        return self.loop is not None and self.loop.is_running()
+
+    def start(self):
+        """Start the loop thread (idempotent)"""
+        with self._lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self._ready.clear()
+            self.thread = threading.Thread(target=self._run, name="dzgui-async", daemon=True)
+            self.thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        print("🔁 Async runtime started")
+        try:
+            self.loop.run_forever()
+        finally:
+            try:
+                pending = asyncio.all_tasks(self.loop)
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            finally:
+                self.loop.close()
+                print("🔁 Async runtime stopped")
+
+    def in_runtime_thread(self) -> bool:
+        return self.thread is not None and threading.current_thread() is self.thread
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the runtime, return a thread-safe future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the runtime and wait for its result (never call from the runtime itself)"""
+        if self.in_runtime_thread():
+            coro.close()
+            raise RuntimeError("AsyncRuntime.run() called from the runtime thread - await the coroutine instead")
+        return self.submit(coro).result(timeout)
+
+    def submit_qt(self, coro: Coroutine, parent: QObject = None) -> TaskHandle:
+        """Schedule a coroutine and get a TaskHandle whose signals fire on the calling Qt thread"""
+        future = self.submit(coro)
+        # Keep the handle alive until its signals have been delivered
+        handle = TaskHandle(future, parent, on_release=self._handles.discard)
+        self._handles.add(handle)
+        future.add_done_callback(handle._done.emit)
+        return handle
+
+    def call_soon(self, callback: Callable, *args):
+        """Run a plain callable on the runtime thread"""
+        self.start()
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def add_shutdown_callback(self, callback: Callable):
+        """Register a cleanup (sync or async) run on the loop before it stops"""
+        if callback not in self._shutdown_callbacks:
+            self._shutdown_callbacks.append(callback)
+
+    async def _run_shutdown_callbacks(self):
+        # Stop in-flight work first so nothing is still using the sessions/sockets being closed
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for callback in reversed(self._shutdown_callbacks):
+            try:
+                result = callback()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                print(f"Shutdown callback error: {e}")
+
+    def shutdown(self, timeout: float = 3.0):
+        """Run cleanups, cancel remaining tasks and stop the loop thread"""
+        if not self.running:
+            return
+        try:
+            self.run(self._run_shutdown_callbacks(), timeout)
+        except Exception as e:
+            print(f"Error during runtime shutdown: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+        self._handles.clear()
+
+
+# Singleton instance
+_async_runtime = None
+
+def get_async_runtime() -> AsyncRuntime:
+    """Get singleton async runtime (started on first use)"""
+    global _async_runtime
+    if _async_runtime is None:
+        _async_runtime = AsyncRuntime()
+    return _async_runtime
+
+def shutdown_async_runtime():
+    """Stop the async runtime and release network resources"""
+    global _async_runtime
+    if _async_runtime:
+        _async_runtime.shutdown()
+        _async_runtime = None
@@ -4,12 +4,18 @@ DZGUI Database Manager - SQLite cache and persistence
 Handles server data storage, caching, and cleanup
 """
 
+import asyncio
 import sqlite3
+import hashlib
 import json
+import re
+import queue
+import threading
 import time
+from concurrent.futures import Future
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from typing import Callable, List, Dict, Optional, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from PySide6.QtCore import QObject, Signal
 
@@ -34,6 +40,18 @@ class ServerRecord:
     last_updated: float = 0.0
     mods: str = "[]"  # JSON array as string
     
+    @property
+    def key(self) -> Tuple[str, int]:
+        """Unique server key, matches UNIQUE(ip, query_port)"""
+        return (self.ip, self.query_port)
+    
+    def content_hash(self) -> str:
+        """Hash of the columns a refresh can change (ping and timestamps are tracked separately)"""
+        content = (self.name, self.port, self.map_name, self.players, self.max_players,
+                   self.queue, self.perspective, self.time_of_day, self.server_type,
+                   bool(self.online), self.mods)
+        return hashlib.blake2b(repr(content).encode('utf-8'), digest_size=8).hexdigest()
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary for UI"""
         return {
@@ -115,6 +133,190 @@ class ServerRecord:
         return 'community'
 
 
+@dataclass
+class ServerChangeset:
+    """Per-refresh delta produced by DZServerDatabase.upsert_servers_batch"""
+    added: List[ServerRecord] = field(default_factory=list)
+    changed: List[ServerRecord] = field(default_factory=list)
+    unchanged: List[ServerRecord] = field(default_factory=list)
+    removed: List[Tuple[str, int]] = field(default_factory=list)  # (ip, query_port)
+    
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+    
+    def keys(self) -> set:
+        """Keys of every server seen in this refresh"""
+        return {record.key for record in self.added + self.changed + self.unchanged}
+    
+    def merge(self, other: 'ServerChangeset') -> 'ServerChangeset':
+        """Combine with a later changeset; a server keeps its strongest state (added > changed > unchanged)"""
+        states = ('unchanged', 'changed', 'added')
+        merged_states = {}
+        for changeset in (self, other):
+            for rank, state in enumerate(states):
+                for record in getattr(changeset, state):
+                    previous_rank = merged_states.get(record.key, (rank, None))[0]
+                    merged_states[record.key] = (max(rank, previous_rank), record)
+        
+        merged = ServerChangeset(removed=list(dict.fromkeys(self.removed + other.removed)))
+        for rank, record in merged_states.values():
+            getattr(merged, states[rank]).append(record)
+        return merged
+    
+    def summary(self) -> str:
+        return (f"+{len(self.added)} ~{len(self.changed)} ={len(self.unchanged)} "
+                f"-{len(self.removed)}")
+
+
+class DatabaseWriter:
+    """Single long-lived SQLite writer thread
+    
+    Owns the only write connection (WAL, synchronous=NORMAL). Writes are
+    queued and run in order; ping/player updates are coalesced per server
+    and committed together every `flush_interval` seconds or `max_batch` rows.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, db_path: Path, on_pings_flushed: Callable[[List[Tuple[str, int]]], None] = None,
+                 flush_interval: float = 0.05, max_batch: int = 200):
+        self.db_path = db_path
+        self.on_pings_flushed = on_pings_flushed
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        
+        self._queue = queue.Queue()
+        self._pending_pings: Dict[Tuple[str, int], Dict] = {}
+        self._pending_since = 0.0
+        self.commits = 0
+        
+        self.conn = None
+        self._thread = threading.Thread(target=self._run, name="dzgui-db-writer", daemon=True)
+        self._thread.start()
+    
+    def execute(self, fn: Callable[[sqlite3.Connection], object], wait: bool = True):
+        """Run fn(conn) in its own transaction on the writer thread"""
+        future = Future()
+        self._queue.put((fn, future))
+        return future.result() if wait else future
+    
+    async def execute_async(self, fn: Callable[[sqlite3.Connection], object]):
+        """execute() for coroutines: awaits the commit without blocking the event loop"""
+        return await asyncio.wrap_future(self.execute(fn, wait=False))
+    
+    def queue_ping(self, ip: str, query_port: int, ping: int, players: int = None,
+                   max_players: int = None, emit_signal: bool = True):
+        """Queue a coalesced ping/player update (latest value wins)"""
+        self._queue.put(((ip, query_port), ping, players, max_players, emit_signal))
+    
+    def flush(self):
+        """Block until every queued write has been committed"""
+        self.execute(lambda conn: None)
+    
+    def close(self):
+        """Commit pending updates and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(5)
+    
+    def _run(self):
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.row_factory = sqlite3.Row
+        
+        while True:
+            timeout = None
+            if self._pending_pings:
+                timeout = max(0.0, self._pending_since + self.flush_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._flush_pings()
+                continue
+            
+            if item is self._STOP:
+                self._flush_pings()
+                break
+            
+            if len(item) == 2:
+                # Keep ordering: pings queued before this write land first
+                self._flush_pings()
+                fn, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with self.conn:
+                        result = fn(self.conn)
+                    self.commits += 1
+                    future.set_result(result)
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                self._merge_ping(*item)
+                if len(self._pending_pings) >= self.max_batch:
+                    self._flush_pings()
+        
+        self.conn.close()
+        self.conn = None
+    
+    def _merge_ping(self, key, ping, players, max_players, emit_signal):
+        pending = self._pending_pings.get(key)
+        if pending is None:
+            if not self._pending_pings:
+                self._pending_since = time.monotonic()
+            self._pending_pings[key] = {'ping': ping, 'players': players,
+                                        'max_players': max_players, 'emit': emit_signal}
+            return
+        pending['ping'] = ping
+        if players is not None and max_players is not None:
+            pending['players'] = players
+            pending['max_players'] = max_players
+        pending['emit'] = pending['emit'] or emit_signal
+    
+    def _flush_pings(self):
+        if not self._pending_pings:
+            return
+        pending, self._pending_pings = self._pending_pings, {}
+        now = time.time()
+        
+        # The 999 sentinel means nobody answered: the server is offline, not merely slow
+        with_players = [(u['players'], u['max_players'], int(u['ping'] < 999),
+                         u['ping'], u['players'], u['max_players'], now, int(u['ping'] < 999), ip, qport)
+                        for (ip, qport), u in pending.items() if u['players'] is not None and u['max_players'] is not None]
+        ping_only = [(int(u['ping'] < 999), u['ping'], now, int(u['ping'] < 999), ip, qport)
+                     for (ip, qport), u in pending.items() if u['players'] is None or u['max_players'] is None]
+        try:
+            with self.conn:
+                # players and online are part of content_hash: a row they change no longer
+                # matches its hash, so the next upsert of the refresh data rewrites it
+                if with_players:
+                    self.conn.executemany("""
+                        UPDATE servers 
+                        SET content_hash = CASE WHEN players IS ? AND max_players IS ? AND online = ?
+                                                THEN content_hash END,
+                            ping = ?, players = ?, max_players = ?, last_updated = ?, online = ?
+                        WHERE ip = ? AND query_port = ?
+                    """, with_players)
+                if ping_only:
+                    self.conn.executemany("""
+                        UPDATE servers 
+                        SET content_hash = CASE WHEN online = ? THEN content_hash END,
+                            ping = ?, last_updated = ?, online = ?
+                        WHERE ip = ? AND query_port = ?
+                    """, ping_only)
+            self.commits += 1
+        except Exception as e:
+            print(f"Ping batch write failed: {e}")
+            return
+        
+        if self.on_pings_flushed:
+            keys = [key for key, u in pending.items() if u['emit']]
+            if keys:
+                self.on_pings_flushed(keys)
+
+
 class DZServerDatabase(QObject):
     """SQLite database manager for DayZ servers"""
     
@@ -139,14 +341,24 @@ class DZServerDatabase(QObject):
         self.offline_cleanup_hours = 2
         self.delete_cleanup_hours = 24
         
+        # Unchanged rows only get last_seen refreshed when it is older than this
+        self.last_seen_touch_seconds = 600
+        
         # Initialize database
         self._init_database()
         
+        # One writer connection for the whole app, read-only connections per reading thread
+        self._readers = threading.local()
+        self.writer = DatabaseWriter(self.db_path, on_pings_flushed=self._emit_ping_updates)
+        
         print(f"Database initialized: {self.db_path}")
     
     def _init_database(self):
         """Initialize database schema"""
         with sqlite3.connect(self.db_path) as conn:
+            # WAL lets the UI read while the writer thread commits
+            conn.execute("PRAGMA journal_mode=WAL")
+            
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS servers (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -166,10 +378,16 @@ class DZServerDatabase(QObject):
                     last_seen REAL NOT NULL,
                     last_updated REAL NOT NULL,
                     mods TEXT DEFAULT '[]',
+                    content_hash TEXT,
                     UNIQUE(ip, query_port)
                 )
             """)
             
+            # Migrate databases created before diff-based upserts
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(servers)")}
+            if 'content_hash' not in columns:
+                conn.execute("ALTER TABLE servers ADD COLUMN content_hash TEXT")
+            
             # Create indexes for performance
             conn.execute("CREATE INDEX IF NOT EXISTS idx_servers_online ON servers(online)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_servers_type ON servers(server_type)")
@@ -180,130 +398,265 @@ class DZServerDatabase(QObject):
             
             # No more cache metadata table needed with BattleMetrics filtering
             
+            self.has_fts = self._init_fts(conn)
+            
             conn.commit()
     
+    # Mod names out of the mods JSON column ([{"id", "name"}] from BattleMetrics, plain ids otherwise)
+    _FTS_MOD_NAMES = """
+        CASE WHEN json_valid({row}.mods) THEN
+            (SELECT group_concat(json_extract(value, '$.name'), ' ')
+             FROM json_each({row}.mods) WHERE type = 'object')
+        ELSE '' END
+    """
+    
+    def _init_fts(self, conn: sqlite3.Connection) -> bool:
+        """Create the FTS5 index over name, map and mod names, kept in sync by triggers"""
+        try:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'servers_fts'").fetchone()
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS servers_fts USING fts5(
+                    name, map_name, mod_names,
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ SQLite FTS5 not available ({e}), search falls back to LIKE")
+            return False
+        
+        new_mods = self._FTS_MOD_NAMES.format(row='new')
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS servers_fts_insert AFTER INSERT ON servers BEGIN
+                INSERT INTO servers_fts(rowid, name, map_name, mod_names)
+                VALUES (new.id, new.name, new.map_name, {new_mods});
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS servers_fts_delete AFTER DELETE ON servers BEGIN
+                DELETE FROM servers_fts WHERE rowid = old.id;
+            END
+        """)
+        # The upsert always SETs these columns; only reindex when one really changed.
+        # Recreated so databases with the older unconditional trigger pick up the WHEN clause.
+        conn.execute("DROP TRIGGER IF EXISTS servers_fts_update")
+        conn.execute(f"""
+            CREATE TRIGGER servers_fts_update AFTER UPDATE OF name, map_name, mods ON servers
+            WHEN old.name IS NOT new.name OR old.map_name IS NOT new.map_name OR old.mods IS NOT new.mods
+            BEGIN
+                DELETE FROM servers_fts WHERE rowid = old.id;
+                INSERT INTO servers_fts(rowid, name, map_name, mod_names)
+                VALUES (new.id, new.name, new.map_name, {new_mods});
+            END
+        """)
+        
+        if not exists:
+            # Index rows stored before the FTS table existed
+            conn.execute(f"""
+                INSERT INTO servers_fts(rowid, name, map_name, mod_names)
+                SELECT id, name, map_name, {self._FTS_MOD_NAMES.format(row='servers')} FROM servers
+            """)
+        return True
+    
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """Turn user input into an FTS5 prefix query: every word must match a token prefix"""
+        words = re.findall(r"\w+", query.lower())
+        return " ".join(f'"{word}"*' for word in words)
+    
+    def _read_conn(self) -> sqlite3.Connection:
+        """Read-only connection owned by the calling thread"""
+        conn = getattr(self._readers, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f"{self.db_path.as_uri()}?mode=ro", uri=True)
+            conn.row_factory = sqlite3.Row
+            self._readers.conn = conn
+        return conn
+    
+    @staticmethod
+    def _row_to_record(row: sqlite3.Row) -> ServerRecord:
+        """Build a ServerRecord from a servers row"""
+        return ServerRecord(
+            id=row['id'],
+            name=row['name'],
+            ip=row['ip'],
+            port=row['port'],
+            query_port=row['query_port'],
+            map_name=row['map_name'],
+            players=row['players'],
+            max_players=row['max_players'],
+            queue=row['queue'],
+            ping=row['ping'],
+            perspective=row['perspective'],
+            time_of_day=row['time_of_day'],
+            server_type=row['server_type'],
+            online=bool(row['online']),
+            last_seen=row['last_seen'],
+            last_updated=row['last_updated'],
+            mods=row['mods']
+        )
+    
+    def _emit_ping_updates(self, keys: List[Tuple[str, int]]):
+        """Emit serverPingUpdated for servers whose ping batch was just committed (writer thread)"""
+        conn = self.writer.conn
+        for ip, query_port in keys:
+            row = conn.execute("SELECT * FROM servers WHERE ip = ? AND query_port = ?", (ip, query_port)).fetchone()
+            if row:
+                # Emit signal for real-time UI update
+                self.serverPingUpdated.emit(self._row_to_record(row).to_dict())
+    
+    def flush(self):
+        """Wait until queued writes (including coalesced pings) are committed"""
+        self.writer.flush()
     
+    def close(self):
+        """Stop the writer thread after committing pending updates"""
+        self.writer.close()
+    
+    # Content columns are only rewritten when the hash differs; a BattleMetrics
+    # placeholder ping (-1) or perspective ('Unknown') never clobbers a measured value.
+    _UPSERT_SQL = """
+        INSERT INTO servers (
+            name, ip, port, query_port, map_name, players, max_players,
+            queue, ping, perspective, time_of_day, server_type, online,
+            last_seen, last_updated, mods, content_hash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(ip, query_port) DO UPDATE SET
+            name = excluded.name,
+            port = excluded.port,
+            map_name = excluded.map_name,
+            players = excluded.players,
+            max_players = excluded.max_players,
+            queue = excluded.queue,
+            ping = CASE WHEN excluded.ping >= 0 THEN excluded.ping ELSE servers.ping END,
+            perspective = CASE WHEN excluded.perspective != 'Unknown' THEN excluded.perspective ELSE servers.perspective END,
+            time_of_day = excluded.time_of_day,
+            server_type = excluded.server_type,
+            online = excluded.online,
+            last_seen = excluded.last_seen,
+            last_updated = excluded.last_updated,
+            mods = excluded.mods,
+            content_hash = excluded.content_hash
+    """
     
     def upsert_server(self, server: ServerRecord) -> int:
-        """Insert or update a server record"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                INSERT OR REPLACE INTO servers (
-                    name, ip, port, query_port, map_name, players, max_players,
-                    queue, ping, perspective, time_of_day, server_type, online,
-                    last_seen, last_updated, mods
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                server.name, server.ip, server.port, server.query_port,
-                server.map_name, server.players, server.max_players,
-                server.queue, server.ping, server.perspective, server.time_of_day,
-                server.server_type, server.online, server.last_seen,
-                server.last_updated, server.mods
-            ))
-            
-            conn.commit()
-            return cursor.lastrowid
+        """Insert or update a server record, return its id"""
+        self.upsert_servers_batch([server])
+        row = self._read_conn().execute(
+            "SELECT id FROM servers WHERE ip = ? AND query_port = ?", server.key).fetchone()
+        return row['id'] if row else None
     
-    def upsert_servers_batch(self, servers: List[ServerRecord]):
-        """Batch insert/update servers"""
+    def upsert_servers_batch(self, servers: List[ServerRecord]) -> ServerChangeset:
+        """Batch insert/update servers, writing only new or changed rows
+        
+        Returns the changeset (added/changed/unchanged); `removed` is left to the
+        caller, which knows what the previous refresh for the same filters returned.
+        """
+        changeset, write = self._upsert_job(servers)
+        if write is not None:
+            self._report_upsert(servers, changeset, self.writer.execute(write))
+        return changeset
+    
+    async def upsert_servers_batch_async(self, servers: List[ServerRecord]) -> ServerChangeset:
+        """upsert_servers_batch() for coroutines on the async runtime"""
+        changeset, write = self._upsert_job(servers)
+        if write is not None:
+            self._report_upsert(servers, changeset, await self.writer.execute_async(write))
+        return changeset
+    
+    def _upsert_job(self, servers: List[ServerRecord]) -> Tuple[ServerChangeset, Optional[Callable]]:
+        """Changeset to fill plus the write to run on the writer thread (None for no servers)"""
+        changeset = ServerChangeset()
         if not servers:
-            return
+            return changeset, None
+        
+        # Last record wins when a batch repeats a server
+        records = {server.key: server for server in servers}
+        hashes = {key: server.content_hash() for key, server in records.items()}
+        touch_before = time.time() - self.last_seen_touch_seconds
+        
+        def write(conn):
+            existing = {}
+            keys = list(records)
+            for start in range(0, len(keys), 400):
+                chunk = keys[start:start + 400]
+                placeholders = ", ".join("(?, ?)" for _ in chunk)
+                params = [value for key in chunk for value in key]
+                cursor = conn.execute(f"""
+                    SELECT ip, query_port, content_hash, last_seen FROM servers
+                    WHERE (ip, query_port) IN (VALUES {placeholders})
+                """, params)
+                for row in cursor:
+                    existing[(row['ip'], row['query_port'])] = (row['content_hash'], row['last_seen'])
             
-        with sqlite3.connect(self.db_path) as conn:
             data = []
-            for server in servers:
+            touched = []
+            for key, server in records.items():
+                if key not in existing:
+                    changeset.added.append(server)
+                elif existing[key][0] != hashes[key]:
+                    changeset.changed.append(server)
+                else:
+                    changeset.unchanged.append(server)
+                    # Identical row: only move last_seen, and only when cleanup would need it
+                    if existing[key][1] < touch_before:
+                        touched.append((server.last_seen, server.ip, server.query_port))
+                    continue
                 data.append((
                     server.name, server.ip, server.port, server.query_port,
                     server.map_name, server.players, server.max_players,
                     server.queue, server.ping, server.perspective, server.time_of_day,
                     server.server_type, server.online, server.last_seen,
-                    server.last_updated, server.mods
+                    server.last_updated, server.mods, hashes[key]
                 ))
             
-            conn.executemany("""
-                INSERT OR REPLACE INTO servers (
-                    name, ip, port, query_port, map_name, players, max_players,
-                    queue, ping, perspective, time_of_day, server_type, online,
-                    last_seen, last_updated, mods
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, data)
-            
-            conn.commit()
-            print(f"Batch updated {len(servers)} servers")
+            if data:
+                conn.executemany(self._UPSERT_SQL, data)
+            if touched:
+                conn.executemany("UPDATE servers SET last_seen = ? WHERE ip = ? AND query_port = ?", touched)
+            return len(data) + len(touched)
+        
+        return changeset, write
+    
+    @staticmethod
+    def _report_upsert(servers: List[ServerRecord], changeset: ServerChangeset, written: int):
+        print(f"Batch updated {len(servers)} servers ({changeset.summary()}, {written} rows written)")
     
     def update_server_ping(self, ip: str, query_port: int, ping: int, players: int = None, max_players: int = None, emit_signal: bool = True):
-        """Update server ping and player count"""
-        with sqlite3.connect(self.db_path) as conn:
-            if players is not None and max_players is not None:
-                conn.execute("""
-                    UPDATE servers 
-                    SET ping = ?, players = ?, max_players = ?, last_updated = ?, online = 1
-                    WHERE ip = ? AND query_port = ?
-                """, (ping, players, max_players, time.time(), ip, query_port))
-            else:
-                conn.execute("""
-                    UPDATE servers 
-                    SET ping = ?, last_updated = ?, online = 1
-                    WHERE ip = ? AND query_port = ?
-                """, (ping, time.time(), ip, query_port))
-            
-            conn.commit()
-            
-            # Emit real-time signal with updated server data
-            if emit_signal:
-                # Get the updated server data
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute("""
-                    SELECT * FROM servers WHERE ip = ? AND query_port = ?
-                """, (ip, query_port))
-                
-                row = cursor.fetchone()
-                if row:
-                    server_record = ServerRecord(
-                        id=row['id'],
-                        name=row['name'],
-                        ip=row['ip'],
-                        port=row['port'],
-                        query_port=row['query_port'],
-                        map_name=row['map_name'],
-                        players=row['players'],
-                        max_players=row['max_players'],
-                        queue=row['queue'],
-                        ping=row['ping'],
-                        perspective=row['perspective'],
-                        time_of_day=row['time_of_day'],
-                        server_type=row['server_type'],
-                        online=bool(row['online']),
-                        last_seen=row['last_seen'],
-                        last_updated=row['last_updated'],
-                        mods=row['mods']
-                    )
-                    
-                    # Emit signal for real-time UI update
-                    self.serverPingUpdated.emit(server_record.to_dict())
+        """Queue a server ping/player update
+        
+        Updates are coalesced per server and committed in batches by the writer
+        thread; serverPingUpdated is emitted once the batch is committed.
+        """
+        self.writer.queue_ping(ip, query_port, ping, players, max_players, emit_signal)
     
     def mark_server_offline(self, ip: str, query_port: int):
         """Mark server as offline"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                UPDATE servers 
-                SET online = 0, last_updated = ?
-                WHERE ip = ? AND query_port = ?
-            """, (time.time(), ip, query_port))
-            
-            conn.commit()
+        self.writer.execute(lambda conn: conn.execute("""
+            UPDATE servers 
+            SET online = 0, last_updated = ?, content_hash = NULL
+            WHERE ip = ? AND query_port = ?
+        """, (time.time(), ip, query_port)))
     
     def cleanup_old_servers(self):
         """Clean up old/offline servers"""
+        self._report_cleanup(*self.writer.execute(self._cleanup_job()))
+    
+    async def cleanup_old_servers_async(self):
+        """cleanup_old_servers() for coroutines on the async runtime"""
+        self._report_cleanup(*await self.writer.execute_async(self._cleanup_job()))
+    
+    def _cleanup_job(self) -> Callable[[sqlite3.Connection], Tuple[int, int]]:
         current_time = time.time()
         offline_cutoff = current_time - (self.offline_cleanup_hours * 3600)
         delete_cutoff = current_time - (self.delete_cleanup_hours * 3600)
         
-        with sqlite3.connect(self.db_path) as conn:
+        def write(conn):
             # Mark servers as offline if not seen recently
             cursor = conn.execute("""
                 UPDATE servers 
-                SET online = 0 
+                SET online = 0, content_hash = NULL
                 WHERE last_seen < ? AND online = 1
             """, (offline_cutoff,))
             offline_count = cursor.rowcount
@@ -313,140 +666,157 @@ class DZServerDatabase(QObject):
                 DELETE FROM servers 
                 WHERE last_seen < ?
             """, (delete_cutoff,))
-            deleted_count = cursor.rowcount
-            
-            conn.commit()
-            
-            if offline_count > 0 or deleted_count > 0:
-                print(f"Cleanup: {offline_count} marked offline, {deleted_count} deleted")
+            return offline_count, cursor.rowcount
+        
+        return write
+    
+    @staticmethod
+    def _report_cleanup(offline_count: int, deleted_count: int):
+        if offline_count > 0 or deleted_count > 0:
+            print(f"Cleanup: {offline_count} marked offline, {deleted_count} deleted")
     
     
     def get_server_counts(self) -> Dict[str, int]:
         """Get server counts by type"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT server_type, COUNT(*) 
-                FROM servers 
-                WHERE online = 1 
-                GROUP BY server_type
-            """)
-            
-            counts = {'official': 0, 'community': 0, 'private': 0}
-            for server_type, count in cursor.fetchall():
-                counts[server_type] = count
-                
-            return counts
-    
-    def search_servers(self, query: str, server_type: Optional[str] = None) -> List[Dict]:
-        """Search servers by name, map, or other criteria"""
+        conn = self._read_conn()
+        cursor = conn.execute("""
+            SELECT server_type, COUNT(*) 
+            FROM servers 
+            WHERE online = 1 
+            GROUP BY server_type
+        """)
+        
+        counts = {'official': 0, 'community': 0, 'private': 0}
+        for server_type, count in cursor.fetchall():
+            counts[server_type] = count
+        
+        return counts
+    
+    def search_servers(self, query: str, server_type: Optional[str] = None, limit: int = 500) -> List[Dict]:
+        """Search servers by name, map or mod names
+        
+        Uses the FTS5 index (word-prefix matching, ranked by bm25 with name
+        weighted over map over mods); falls back to LIKE without FTS5.
+        """
+        fts_query = self._fts_query(query) if self.has_fts else ""
+        if not fts_query:
+            return self._search_servers_like(query, server_type, limit)
+        
+        conn = self._read_conn()
+        type_clause = "AND s.server_type = ?" if server_type else ""
+        params = [fts_query] + ([server_type] if server_type else []) + [limit]
+        try:
+            cursor = conn.execute(f"""
+                SELECT s.* FROM servers_fts
+                JOIN servers s ON s.id = servers_fts.rowid
+                WHERE servers_fts MATCH ? AND s.online = 1 {type_clause}
+                ORDER BY bm25(servers_fts, 10.0, 3.0, 1.0), s.ping ASC
+                LIMIT ?
+            """, params)
+            return [self._row_to_record(row).to_dict() for row in cursor]
+        except sqlite3.OperationalError as e:
+            print(f"FTS search failed ({e}), using LIKE")
+            return self._search_servers_like(query, server_type, limit)
+    
+    def _search_servers_like(self, query: str, server_type: Optional[str] = None, limit: int = 500) -> List[Dict]:
+        """Substring search by name or map (full table scan)"""
         query_lower = f"%{query.lower()}%"
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            
-            if server_type:
-                cursor = conn.execute("""
-                    SELECT * FROM servers 
-                    WHERE online = 1 AND server_type = ?
-                    AND (LOWER(name) LIKE ? OR LOWER(map_name) LIKE ?)
-                    ORDER BY ping ASC, name ASC
-                """, (server_type, query_lower, query_lower))
-            else:
-                cursor = conn.execute("""
-                    SELECT * FROM servers 
-                    WHERE online = 1
-                    AND (LOWER(name) LIKE ? OR LOWER(map_name) LIKE ?)
-                    ORDER BY ping ASC, name ASC
-                """, (query_lower, query_lower))
-            
-            servers = []
-            for row in cursor:
-                record = ServerRecord(
-                    id=row['id'],
-                    name=row['name'],
-                    ip=row['ip'],
-                    port=row['port'],
-                    query_port=row['query_port'],
-                    map_name=row['map_name'],
-                    players=row['players'],
-                    max_players=row['max_players'],
-                    queue=row['queue'],
-                    ping=row['ping'],
-                    perspective=row['perspective'],
-                    time_of_day=row['time_of_day'],
-                    server_type=row['server_type'],
-                    online=bool(row['online']),
-                    last_seen=row['last_seen'],
-                    last_updated=row['last_updated'],
-                    mods=row['mods']
-                )
-                servers.append(record.to_dict())
-            
-            return servers
+        conn = self._read_conn()
+        if server_type:
+            cursor = conn.execute("""
+                SELECT * FROM servers 
+                WHERE online = 1 AND server_type = ?
+                AND (LOWER(name) LIKE ? OR LOWER(map_name) LIKE ?)
+                ORDER BY ping ASC, name ASC
+                LIMIT ?
+            """, (server_type, query_lower, query_lower, limit))
+        else:
+            cursor = conn.execute("""
+                SELECT * FROM servers 
+                WHERE online = 1
+                AND (LOWER(name) LIKE ? OR LOWER(map_name) LIKE ?)
+                ORDER BY ping ASC, name ASC
+                LIMIT ?
+            """, (query_lower, query_lower, limit))
+        
+        servers = []
+        for row in cursor:
+            servers.append(self._row_to_record(row).to_dict())
+        
+        return servers
     
     def get_database_stats(self) -> Dict:
         """Get database statistics"""
-        with sqlite3.connect(self.db_path) as conn:
-            stats = {}
-            
-            # Total servers
-            cursor = conn.execute("SELECT COUNT(*) FROM servers")
-            stats['total'] = cursor.fetchone()[0]
-            
-            # Online servers
-            cursor = conn.execute("SELECT COUNT(*) FROM servers WHERE online = 1")
-            stats['online'] = cursor.fetchone()[0]
-            
-            # By type
-            cursor = conn.execute("""
-                SELECT server_type, COUNT(*) 
-                FROM servers 
-                WHERE online = 1 
-                GROUP BY server_type
-            """)
-            stats['by_type'] = dict(cursor.fetchall())
-            
-            # No more cache age - using real-time BattleMetrics filtering
-            stats['filtering_method'] = 'BattleMetrics API (real-time)'
-                
-            return stats
+        conn = self._read_conn()
+        stats = {}
+        
+        # Total servers
+        cursor = conn.execute("SELECT COUNT(*) FROM servers")
+        stats['total'] = cursor.fetchone()[0]
+        
+        # Online servers
+        cursor = conn.execute("SELECT COUNT(*) FROM servers WHERE online = 1")
+        stats['online'] = cursor.fetchone()[0]
+        
+        # By type
+        cursor = conn.execute("""
+            SELECT server_type, COUNT(*) 
+            FROM servers 
+            WHERE online = 1 
+            GROUP BY server_type
+        """)
+        stats['by_type'] = dict(cursor.fetchall())
+        
+        # No more cache age - using real-time BattleMetrics filtering
+        stats['filtering_method'] = 'BattleMetrics API (real-time)'
+        
+        return stats
+    
+    def get_records(self, keys: List[Tuple[str, int]]) -> List[ServerRecord]:
+        """ServerRecords for (ip, query_port) keys, in chunks below SQLite's variable limit"""
+        conn = self._read_conn()
+        records = []
+        for start in range(0, len(keys), 400):
+            chunk = keys[start:start + 400]
+            placeholders = ", ".join("(?, ?)" for _ in chunk)
+            params = [value for key in chunk for value in key]
+            cursor = conn.execute(f"""
+                SELECT * FROM servers
+                WHERE (ip, query_port) IN (VALUES {placeholders})
+            """, params)
+            records.extend(self._row_to_record(row) for row in cursor)
+        return records
+    
+    def get_cached_servers(self, server_type: Optional[str] = None, limit: int = -1, offset: int = 0) -> List[Dict]:
+        """Online servers, lowest ping first (servers past the cleanup cutoffs are excluded)"""
+        conn = self._read_conn()
+        type_clause = "AND server_type = ?" if server_type else ""
+        params = ([server_type] if server_type else []) + [limit, offset]
+        cursor = conn.execute(f"""
+            SELECT * FROM servers
+            WHERE online = 1 {type_clause}
+            ORDER BY ping ASC, name ASC
+            LIMIT ? OFFSET ?
+        """, params)
+        
+        return [self._row_to_record(row).to_dict() for row in cursor]
     
     def get_top_servers(self, limit: int = 150) -> List[Dict]:
         """Get top servers by player count"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            
-            cursor = conn.execute("""
-                SELECT * FROM servers 
-                WHERE online = 1
-                ORDER BY players DESC, ping ASC, name ASC
-                LIMIT ?
-            """, (limit,))
-            
-            servers = []
-            for row in cursor:
-                record = ServerRecord(
-                    id=row['id'],
-                    name=row['name'],
-                    ip=row['ip'],
-                    port=row['port'],
-                    query_port=row['query_port'],
-                    map_name=row['map_name'],
-                    players=row['players'],
-                    max_players=row['max_players'],
-                    queue=row['queue'],
-                    ping=row['ping'],
-                    perspective=row['perspective'],
-                    time_of_day=row['time_of_day'],
-                    server_type=row['server_type'],
-                    online=bool(row['online']),
-                    last_seen=row['last_seen'],
-                    last_updated=row['last_updated'],
-                    mods=row['mods']
-                )
-                servers.append(record.to_dict())
-            
-            return servers
+        conn = self._read_conn()
+        cursor = conn.execute("""
+            SELECT * FROM servers 
+            WHERE online = 1
+            ORDER BY players DESC, ping ASC, name ASC
+            LIMIT ?
+        """, (limit,))
+        
+        servers = []
+        for row in cursor:
+            servers.append(self._row_to_record(row).to_dict())
+        
+        return servers
 
 
 # Singleton instance
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+DZGUI Filter Engine - Debounced, local-first server filtering
+Search, map, ping, status and sidebar predicates run against the in-memory store and
+the SQLite cache; BattleMetrics is only asked in the background when the cached result
+set is too small or stale
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from dzgui_server_store import ServerKey, ServerStore, server_key
+
+# Map filter name -> map identifiers as reported by servers (Livonia runs as "enoch")
+MAP_ALIASES = {
+    "Chernarus": ("chernarus",),
+    "Livonia": ("livonia", "enoch"),
+    "Namalsk": ("namalsk",),
+    "Sakhal": ("sakhal",),
+}
+
+MODDED_KEYWORDS = ('mod', 'trader', 'loot+', 'custom')
+
+
+@dataclass(frozen=True)
+class FilterCriteria:
+    """Snapshot of every filter control in the server browser"""
+    search: str = ""
+    map_filter: str = "All"
+    ping_filter: str = "All"
+    status_filter: str = "All"
+    sort_option: str = "Ping"
+    show_empty: bool = True
+    show_full: bool = True
+    show_modded: bool = True
+    only_1pp: bool = False
+    only_3pp: bool = False
+
+    @property
+    def is_default(self) -> bool:
+        """True when nothing is filtered out (sorting alone does not count)"""
+        return self == FilterCriteria(sort_option=self.sort_option)
+
+    def api_params(self) -> Optional[str]:
+        """BattleMetrics search term covering this filter set, None when the full list applies"""
+        terms = [self.search] if self.search else []
+        # BattleMetrics has no map filter, the map name is added to the search instead
+        if self.map_filter in MAP_ALIASES:
+            terms.append(MAP_ALIASES[self.map_filter][0])
+        return " ".join(terms) or None
+
+
+def map_matches(map_name: str, map_filter: str) -> bool:
+    """Check a server map against the map filter"""
+    if map_filter == "All":
+        return True
+    map_name = (map_name or '').lower()
+    if map_filter == "Other":
+        return not any(alias in map_name for aliases in MAP_ALIASES.values() for alias in aliases)
+    return any(alias in map_name for alias in MAP_ALIASES.get(map_filter, ()))
+
+
+def server_matches(server: Dict, criteria: FilterCriteria, search_keys: Optional[Set[ServerKey]] = None) -> bool:
+    """Check one server against all filter predicates"""
+    # Local search results only
+    if search_keys is not None and server_key(server) not in search_keys:
+        return False
+
+    if not map_matches(server.get('map', ''), criteria.map_filter):
+        return False
+
+    # Ping filter
+    if criteria.ping_filter != "All":
+        ping = server.get('ping', -1)
+        ping_filter = criteria.ping_filter
+        if not ((ping_filter == "< 50ms" and 0 <= ping < 50) or
+                (ping_filter == "< 100ms" and 0 <= ping < 100) or
+                (ping_filter == "< 200ms" and 0 <= ping < 200) or
+                (ping_filter == "> 200ms" and ping >= 200 and ping < 999) or
+                (ping_filter == "Offline" and ping >= 999)):
+            return False
+
+    players = server.get('players', 0)
+    max_players = server.get('max_players', 1)
+
+    # Status filter (player count)
+    if criteria.status_filter != "All":
+        status_filter = criteria.status_filter
+        percentage = (players / max_players * 100) if max_players > 0 else 0
+        if not ((status_filter == "Empty" and players == 0) or
+                (status_filter == "Low (1-25%)" and 0 < percentage <= 25) or
+                (status_filter == "Medium (25-75%)" and 25 < percentage <= 75) or
+                (status_filter == "High (75-99%)" and 75 < percentage < 100) or
+                (status_filter == "Full" and percentage >= 100)):
+            return False
+
+    # Sidebar checkboxes
+    if not criteria.show_empty and players == 0:
+        return False
+
+    if not criteria.show_full and players >= max_players and max_players > 0:
+        return False
+
+    # Modded (simplified heuristic)
+    if not criteria.show_modded:
+        server_name = server.get('name', '').lower()
+        if any(keyword in server_name for keyword in MODDED_KEYWORDS):
+            return False
+
+    perspective = (server.get('perspective') or '').lower()
+    if criteria.only_1pp and ('1pp' not in perspective or '3pp' in perspective):
+        return False
+
+    if criteria.only_3pp and '3pp' not in perspective:
+        return False
+
+    return True
+
+
+def sort_servers(servers: List[Dict], sort_option: str) -> List[Dict]:
+    """Sort a server list by the sort filter"""
+    if sort_option == "Name":
+        return sorted(servers, key=lambda s: s.get('name', '').lower())
+    elif sort_option == "Players":
+        return sorted(servers, key=lambda s: s.get('players', 0), reverse=True)
+    elif sort_option == "Ping":
+        return sorted(servers, key=lambda s: s.get('ping', 999))
+    elif sort_option == "Map":
+        return sorted(servers, key=lambda s: s.get('map', '').lower())
+    else:
+        return servers
+
+
+class FilterEngine(QObject):
+    """Debounces filter changes and answers them from local data
+
+    resultsReady carries the filtered, sorted servers. refreshNeeded asks the owner
+    to refresh from BattleMetrics in the background; it fires at most once per
+    search term per cooldown, and only when the local answer looks insufficient.
+    """
+
+    resultsReady = Signal(list, object)  # filtered servers, FilterCriteria
+    refreshNeeded = Signal(object)       # FilterCriteria whose API result set should be refreshed
+
+    def __init__(self, store: ServerStore, database, debounce_ms: int = 150,
+                 min_results: int = 10, stale_seconds: float = 300,
+                 refresh_cooldown: float = 60, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.database = database
+        self.min_results = min_results
+        self.stale_seconds = stale_seconds
+        self.refresh_cooldown = refresh_cooldown
+
+        self.criteria = FilterCriteria()
+        self.search_keys: Optional[Set[ServerKey]] = None  # keys of the current search, None when not searching
+        self._pending: Optional[FilterCriteria] = None
+        self._refreshed_at: Dict[str, float] = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._evaluate_pending)
+
+    def request(self, criteria: FilterCriteria):
+        """Schedule an evaluation; further requests within the debounce window replace it"""
+        self._pending = criteria
+        self._timer.start()
+
+    def reevaluate(self):
+        """Re-run the current filters (e.g. after new data landed in the cache)"""
+        self.request(self._pending or self.criteria)
+
+    def matches(self, server: Dict) -> bool:
+        """Check one server against the active filters"""
+        return server_matches(server, self.criteria, self.search_keys)
+
+    def _evaluate_pending(self):
+        criteria, self._pending = self._pending, None
+        if criteria is not None:
+            self.evaluate(criteria)
+
+    def evaluate(self, criteria: FilterCriteria) -> List[Dict]:
+        """Filter local data now and emit resultsReady"""
+        started = time.perf_counter()
+        search_keys = None
+
+        if criteria.search:
+            # Full-text index over everything cached, live store entries have the freshest pings
+            cached = self.database.search_servers(criteria.search)
+            search_keys = {server_key(server) for server in cached}
+            candidates = [self.store.get(server_key(server)) or server for server in cached]
+        elif criteria.sort_option == "Ping":
+            # Already ordered by the store's ping index; filtering keeps the order
+            candidates = self.store.sorted_by_ping()
+        else:
+            candidates = self.store.copy()
+
+        results = [server for server in candidates if server_matches(server, criteria, search_keys)]
+        if criteria.search or criteria.sort_option != "Ping":
+            results = sort_servers(results, criteria.sort_option)
+
+        self.criteria = criteria
+        self.search_keys = search_keys
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"🎯 Local filter: {len(results)}/{len(candidates)} servers in {elapsed_ms:.1f}ms")
+
+        self.resultsReady.emit(results, criteria)
+        self._check_refresh(criteria, results)
+        return results
+
+    def _check_refresh(self, criteria: FilterCriteria, results: List[Dict]):
+        """Ask for a background API refresh when the local answer is too small or stale"""
+        search_term = criteria.api_params()
+        if search_term is None:
+            return  # nothing the API could narrow down; the regular refresh covers it
+
+        too_few = len(results) < self.min_results
+        last_seen = max((server.get('last_seen') or 0 for server in results), default=0)
+        stale = last_seen > 0 and time.time() - last_seen > self.stale_seconds
+        if not (too_few or stale):
+            return
+
+        now = time.time()
+        if now - self._refreshed_at.get(search_term, 0) < self.refresh_cooldown:
+            return
+        self._refreshed_at[search_term] = now
+
+        reason = "few results" if too_few else "stale cache"
+        print(f"🌐 Background refresh for '{search_term}' ({reason})")
+        self.refreshNeeded.emit(criteria)
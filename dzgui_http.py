@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+DZGUI HTTP Client - Process-wide aiohttp session
+One keep-alive connection pool with DNS cache, per-host limits and compression for every module
+"""
+
+import asyncio
+import aiohttp
+
+DEFAULT_HEADERS = {
+    'Accept-Encoding': 'gzip, deflate',
+    'User-Agent': 'DayZConnect/1.0'
+}
+
+
+class HttpClient:
+    """Shared aiohttp session reused by BattleMetrics, Steam and Workshop requests"""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 8,
+                 dns_cache_ttl: int = 600, keepalive_timeout: float = 60.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.session = None
+        self.loop = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on the running loop if needed"""
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self.loop is not loop:
+            # A session cannot be used from another event loop
+            self.session = None
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers=DEFAULT_HEADERS,
+                auto_decompress=True,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+            self.loop = loop
+            print(f"🌐 HTTP session pool created (limit {self.limit}, {self.limit_per_host}/host, DNS cache {self.dns_cache_ttl}s)")
+        return self.session
+
+    async def close(self):
+        """Close the session if it belongs to the running loop"""
+        if self.session is not None and not self.session.closed and self.loop is asyncio.get_running_loop():
+            await self.session.close()
+        self.session = None
+        self.loop = None
+
+
+# Singleton instance
+_http_client = None
+
+def get_http_client() -> HttpClient:
+    """Get singleton HTTP client"""
+    global _http_client
+    if _http_client is None:
+        _http_client = HttpClient()
+    return _http_client
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """Get the process-wide aiohttp session"""
+    return await get_http_client().get_session()
+
+async def close_http_session():
+    """Close the process-wide aiohttp session"""
+    if _http_client is not None:
+        await _http_client.close()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+DZGUI ICMP Engine - In-process echo (ping) for many hosts
+Uses an unprivileged SOCK_DGRAM ICMP socket when the kernel allows it, raw sockets otherwise
+"""
+
+import asyncio
+import os
+import socket
+import struct
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+PAYLOAD_SIZE = 56
+
+
+def _checksum(data: bytes) -> int:
+    """RFC 1071 internet checksum"""
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(ident: int, seq: int) -> bytes:
+    """Build an ICMP echo request packet"""
+    payload = struct.pack("!d", time.time()).ljust(PAYLOAD_SIZE, b"\x00")
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = _checksum(header + payload)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + payload
+
+
+def parse_echo_reply(data: bytes) -> Optional[Tuple[int, int]]:
+    """Return (ident, seq) for an echo reply, None for anything else
+
+    Raw sockets (and DGRAM sockets on BSD/macOS) deliver the IPv4 header too.
+    """
+    if data and data[0] >> 4 == 4:
+        data = data[(data[0] & 0x0F) * 4:]
+    if len(data) < 8 or data[0] != ICMP_ECHO_REPLY:
+        return None
+    _, _, _, ident, seq = struct.unpack("!BBHHH", data[:8])
+    return ident, seq
+
+
+class IcmpPinger:
+    """Sends echo requests to any number of hosts from one socket and matches replies by id/sequence"""
+
+    def __init__(self):
+        self.loop = None
+        self.sock = None
+        self.mode = None  # 'dgram', 'raw' or None when ICMP is not permitted
+        self.ident = os.getpid() & 0xFFFF
+        self._seq = 0
+        self._pending: Dict[int, Tuple[str, asyncio.Future, float]] = {}
+
+    @property
+    def available(self) -> bool:
+        return self.sock is not None
+
+    def start(self):
+        """Open the ICMP socket on the running loop (no-op if ICMP is not permitted)"""
+        if self.loop is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+
+        for mode, sock_type in (('dgram', socket.SOCK_DGRAM), ('raw', socket.SOCK_RAW)):
+            try:
+                sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+            except (PermissionError, OSError):
+                continue
+            sock.setblocking(False)
+            self.sock = sock
+            self.mode = mode
+            break
+
+        if self.sock is None:
+            print("ℹ️ ICMP sockets not permitted - falling back to A2S round-trip time")
+            return
+
+        try:
+            self.loop.add_reader(self.sock.fileno(), self._on_readable)
+        except NotImplementedError:
+            # Proactor loops (Windows) cannot watch raw sockets
+            self.sock.close()
+            self.sock = None
+            self.mode = None
+
+    def close(self):
+        """Close the socket and cancel outstanding probes"""
+        if self.sock is not None:
+            try:
+                if self.loop is not None and not self.loop.is_closed():
+                    self.loop.remove_reader(self.sock.fileno())
+            except Exception:
+                pass
+            self.sock.close()
+            self.sock = None
+        for _, future, _ in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+    def _next_seq(self) -> int:
+        for _ in range(0x10000):
+            self._seq = (self._seq + 1) & 0xFFFF
+            if self._seq not in self._pending:
+                return self._seq
+        raise RuntimeError("Too many ICMP probes in flight")
+
+    async def ping(self, ip: str, timeout: float = 1.0) -> Optional[float]:
+        """Ping one host, return RTT in milliseconds or None on timeout/failure"""
+        self.start()
+        if self.sock is None:
+            return None
+
+        seq = self._next_seq()
+        future = self.loop.create_future()
+        sent_at = time.perf_counter()
+        self._pending[seq] = (ip, future, sent_at)
+        try:
+            self.sock.sendto(build_echo_request(self.ident, seq), (ip, 0))
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, OSError):
+            return None
+        finally:
+            self._pending.pop(seq, None)
+
+    async def ping_many(self, ips: Iterable[str], timeout: float = 1.0) -> Dict[str, Optional[float]]:
+        """Ping every host in one pass, return {ip: RTT ms or None}"""
+        unique_ips = list(dict.fromkeys(ips))
+        results = await asyncio.gather(*(self.ping(ip, timeout) for ip in unique_ips))
+        return dict(zip(unique_ips, results))
+
+    def _on_readable(self):
+        received_at = time.perf_counter()
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+
+            parsed = parse_echo_reply(data)
+            if parsed is None:
+                continue
+            ident, seq = parsed
+            # Unprivileged DGRAM sockets rewrite the identifier to the socket's local port
+            if self.mode == 'raw' and ident != self.ident:
+                continue
+
+            pending = self._pending.get(seq)
+            if pending is None:
+                continue
+            ip, future, sent_at = pending
+            if addr[0] != ip or future.done():
+                continue
+            future.set_result((received_at - sent_at) * 1000)
+
+
+# Singleton instance (one socket per event loop)
+_icmp_pinger = None
+
+async def get_icmp_pinger() -> IcmpPinger:
+    """Get singleton ICMP pinger bound to the running event loop"""
+    global _icmp_pinger
+    loop = asyncio.get_running_loop()
+    if _icmp_pinger is None or _icmp_pinger.loop is not loop:
+        if _icmp_pinger is not None:
+            _icmp_pinger.close()
+        _icmp_pinger = IcmpPinger()
+        _icmp_pinger.start()
+    return _icmp_pinger
+
+def close_icmp_pinger():
+    """Close the shared ICMP socket"""
+    global _icmp_pinger
+    if _icmp_pinger:
+        _icmp_pinger.close()
+        _icmp_pinger = None
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+DZGUI Metrics - Lightweight timing instrumentation for the refresh pipeline
+Stage spans and counters go to an in-memory ring buffer; percentiles feed the
+Diagnostics tab and the buffer can be exported as JSON or CSV
+"""
+
+import asyncio
+import csv
+import json
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Deque, Dict, List
+
+# Refresh pipeline stages, in pipeline order (used to order the diagnostics table)
+STAGES = (
+    "refresh.total",
+    "bm.page",
+    "bm.parse",
+    "convert",
+    "steam.enrich",
+    "steam.lookup",
+    "db.upsert",
+    "ping.sweep",
+    "ui.populate",
+)
+
+
+@dataclass
+class SpanRecord:
+    """One timed run of a pipeline stage"""
+    stage: str
+    started_at: float  # wall clock, for exports
+    duration_ms: float
+    count: int = 0     # items handled (servers, rows, hosts...)
+    errors: int = 0    # items that failed; a span that raised counts one
+
+
+@dataclass
+class StageSummary:
+    """Aggregated spans of one stage"""
+    stage: str
+    runs: int
+    items: int
+    errors: int
+    error_rate: float  # share of runs with at least one error
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class _Span:
+    """Context manager returned by Metrics.span(); set `count`/`errors` inside the block"""
+
+    __slots__ = ('metrics', 'stage', 'count', 'errors', '_started', '_wall')
+
+    def __init__(self, metrics: 'Metrics', stage: str, count: int = 0):
+        self.metrics = metrics
+        self.stage = stage
+        self.count = count
+        self.errors = 0
+
+    def __enter__(self) -> '_Span':
+        self._wall = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        if exc_type is not None and issubclass(exc_type, asyncio.CancelledError):
+            return False  # superseded work is not a sample of the stage
+        errors = self.errors + (1 if exc_type is not None else 0)
+        self.metrics._append(SpanRecord(self.stage, self._wall, duration_ms, self.count, errors))
+        return False
+
+
+class Metrics:
+    """Thread-safe ring buffer of stage spans plus named counters
+
+    Spans come from the async runtime loop, its executor threads and the GUI
+    thread; recording is a deque append under a lock, cheap enough for hot paths.
+    """
+
+    def __init__(self, capacity: int = 5000):
+        self.spans: Deque[SpanRecord] = deque(maxlen=capacity)
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def span(self, stage: str, count: int = 0) -> _Span:
+        """Time a block: `with metrics.span("db.upsert", len(rows)):`"""
+        return _Span(self, stage, count)
+
+    def record(self, stage: str, duration_ms: float, count: int = 0, errors: int = 0):
+        """Add a span measured elsewhere"""
+        self._append(SpanRecord(stage, time.time() - duration_ms / 1000, duration_ms, count, errors))
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def _append(self, record: SpanRecord):
+        with self._lock:
+            self.spans.append(record)
+
+    def snapshot(self) -> List[SpanRecord]:
+        with self._lock:
+            return list(self.spans)
+
+    def counter_snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def summary(self) -> List[StageSummary]:
+        """Per-stage percentiles over the buffer, known stages first in pipeline order"""
+        by_stage: Dict[str, List[SpanRecord]] = {}
+        for record in self.snapshot():
+            by_stage.setdefault(record.stage, []).append(record)
+
+        order = {stage: index for index, stage in enumerate(STAGES)}
+        summaries = []
+        for stage in sorted(by_stage, key=lambda s: (order.get(s, len(STAGES)), s)):
+            records = by_stage[stage]
+            durations = sorted(record.duration_ms for record in records)
+            summaries.append(StageSummary(
+                stage=stage,
+                runs=len(records),
+                items=sum(record.count for record in records),
+                errors=sum(record.errors for record in records),
+                error_rate=sum(1 for record in records if record.errors) / len(records),
+                p50=percentile(durations, 50),
+                p90=percentile(durations, 90),
+                p99=percentile(durations, 99),
+                max=durations[-1],
+            ))
+        return summaries
+
+    def export_json(self, path: Path) -> int:
+        """Write counters, stage summary and raw spans; return the number of spans"""
+        spans = self.snapshot()
+        payload = {
+            'exported_at': time.time(),
+            'counters': self.counter_snapshot(),
+            'summary': [asdict(summary) for summary in self.summary()],
+            'spans': [asdict(record) for record in spans],
+        }
+        Path(path).write_text(json.dumps(payload, indent=2))
+        return len(spans)
+
+    def export_csv(self, path: Path) -> int:
+        """Write raw spans, one row each; return the number of spans"""
+        spans = self.snapshot()
+        columns = [f.name for f in fields(SpanRecord)]
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for record in spans:
+                writer.writerow([getattr(record, column) for column in columns])
+        return len(spans)
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+
+# Singleton instance
+_metrics = None
+
+def get_metrics() -> Metrics:
+    """Get singleton metrics instance"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
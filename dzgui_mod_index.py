@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+DZGUI Mod Index - Persistent index of installed workshop mods
+Mod names, sizes and Steam titles are stored in SQLite keyed by workshop ID with a
+directory fingerprint, so a rescan only re-reads mod folders that changed
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+Fingerprint = Tuple[int, int]  # (inode, newest mtime_ns of the folder and its direct entries)
+
+
+@dataclass
+class ModInfo:
+    """Mod information structure"""
+    workshop_id: str
+    name: str = ""
+    installed: bool = False
+    local_path: Path = None
+    size_mb: float = 0.0
+    size_pending: bool = False  # size_mb is from an older version of the folder (or unknown)
+    last_updated: float = 0.0
+    required_by_server: bool = False
+
+
+def mod_fingerprint(mod_dir: Path) -> Optional[Fingerprint]:
+    """Cheap change marker for a mod folder: one stat plus one scandir
+
+    Steam replaces files and rewrites meta.cpp when it updates a mod, which moves
+    the mtime of the folder itself or of one of its direct entries (addons/, keys/).
+    """
+    try:
+        stat = os.stat(mod_dir)
+        newest = stat.st_mtime_ns
+        with os.scandir(mod_dir) as entries:
+            for entry in entries:
+                newest = max(newest, entry.stat(follow_symlinks=False).st_mtime_ns)
+        return stat.st_ino, newest
+    except OSError:
+        return None
+
+
+class ModIndex:
+    """mods table in mods.db plus an in-memory copy that serves all lookups
+
+    scan() lists the workshop folder, compares fingerprints and hands only new or
+    changed folders to `scan_mod`; removed folders are dropped from the index.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or Path.home() / ".cache" / "dzgui" / "mods.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS mods (
+                workshop_id TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                name TEXT,
+                steam_name TEXT,
+                size_mb REAL DEFAULT 0,
+                sized_mtime_ns INTEGER,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                scanned_at REAL NOT NULL
+            )
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(mods)")}
+        if 'sized_mtime_ns' not in columns:
+            self.conn.execute("ALTER TABLE mods ADD COLUMN sized_mtime_ns INTEGER")
+        self.conn.commit()
+
+        self._lock = threading.RLock()  # scans may come from the GUI thread and worker threads
+        self.mods: Dict[str, ModInfo] = {}
+        self.fingerprints: Dict[str, Fingerprint] = {}
+        self.steam_names: Dict[str, str] = {}
+        self.scanned = False  # True once the in-memory copy matches the workshop folder
+        self._load()
+
+    def _load(self):
+        for row in self.conn.execute("SELECT * FROM mods"):
+            workshop_id = row['workshop_id']
+            self.fingerprints[workshop_id] = (row['inode'], row['mtime_ns'])
+            if row['steam_name']:
+                self.steam_names[workshop_id] = row['steam_name']
+            self.mods[workshop_id] = ModInfo(
+                workshop_id=workshop_id,
+                name=row['steam_name'] or row['name'] or f"Mod {workshop_id}",
+                installed=True,
+                local_path=Path(row['path']),
+                size_mb=row['size_mb'] or 0.0,
+                size_pending=row['sized_mtime_ns'] != row['mtime_ns'],
+                last_updated=row['mtime_ns'] / 1e9,
+            )
+
+    def scan(self, workshop_path: Path, scan_mod: Callable[[Path], ModInfo]) -> List[ModInfo]:
+        """Bring the index in line with the workshop folder; return all installed mods"""
+        started = time.perf_counter()
+        try:
+            with os.scandir(workshop_path) as entries:
+                mod_dirs = {entry.name: Path(entry.path) for entry in entries
+                            if entry.name.isdigit() and entry.is_dir()}
+        except OSError as e:
+            print(f"Error scanning mods: {e}")
+            mod_dirs = {}
+
+        with self._lock:
+            changed = {}
+            for workshop_id, mod_dir in mod_dirs.items():
+                fingerprint = mod_fingerprint(mod_dir)
+                if fingerprint is None:
+                    continue
+                if self.fingerprints.get(workshop_id) != fingerprint or workshop_id not in self.mods:
+                    changed[workshop_id] = (mod_dir, fingerprint)
+            removed = [workshop_id for workshop_id in self.mods if workshop_id not in mod_dirs]
+
+            for workshop_id, (mod_dir, fingerprint) in changed.items():
+                self._store(scan_mod(mod_dir), fingerprint)
+            self.conn.commit()
+            self.remove(removed)
+            self.scanned = True
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(f"🧩 Mod index: {len(self.mods)} mods, {len(changed)} rescanned, "
+                  f"{len(removed)} removed in {elapsed_ms:.0f}ms")
+            return list(self.mods.values())
+
+    def rescan(self, mod_dir: Path, scan_mod: Callable[[Path], ModInfo]) -> Optional[ModInfo]:
+        """Re-read one mod folder if its fingerprint changed (or drop it if it is gone)"""
+        workshop_id = mod_dir.name
+        fingerprint = mod_fingerprint(mod_dir)
+        with self._lock:
+            if fingerprint is None:
+                self.remove([workshop_id])
+                return None
+            if self.fingerprints.get(workshop_id) != fingerprint or workshop_id not in self.mods:
+                self._store(scan_mod(mod_dir), fingerprint)
+                self.conn.commit()
+            return self.mods[workshop_id]
+
+    def _store(self, mod: ModInfo, fingerprint: Fingerprint):
+        steam_name = self.steam_names.get(mod.workshop_id)
+        local_name = mod.name
+        if steam_name:
+            mod.name = steam_name
+        # Sizing is done by the size service; keep the last known size until it reports
+        previous = self.mods.get(mod.workshop_id)
+        mod.size_mb = previous.size_mb if previous else 0.0
+        mod.size_pending = True
+        mod.last_updated = fingerprint[1] / 1e9
+        self.mods[mod.workshop_id] = mod
+        self.fingerprints[mod.workshop_id] = fingerprint
+        self.conn.execute("""
+            INSERT INTO mods (workshop_id, path, name, steam_name, size_mb, mtime_ns, inode, scanned_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(workshop_id) DO UPDATE SET
+                path = excluded.path,
+                name = excluded.name,
+                mtime_ns = excluded.mtime_ns,
+                inode = excluded.inode,
+                scanned_at = excluded.scanned_at
+        """, (mod.workshop_id, str(mod.local_path), local_name, steam_name, mod.size_mb,
+              fingerprint[1], fingerprint[0], time.time()))
+
+    def pending_sizes(self) -> List[Tuple[str, Path, int]]:
+        """(workshop_id, folder, mtime_ns) of mods whose size must be (re)computed"""
+        with self._lock:
+            return [(workshop_id, mod.local_path, self.fingerprints[workshop_id][1])
+                    for workshop_id, mod in self.mods.items() if mod.size_pending]
+
+    def set_size(self, workshop_id: str, size_mb: float, mtime_ns: int) -> bool:
+        """Memoize a computed size; ignored if the folder changed since mtime_ns"""
+        with self._lock:
+            mod = self.mods.get(workshop_id)
+            if mod is None or self.fingerprints[workshop_id][1] != mtime_ns:
+                return False
+            mod.size_mb = size_mb
+            mod.size_pending = False
+            self.conn.execute("UPDATE mods SET size_mb = ?, sized_mtime_ns = ? WHERE workshop_id = ?",
+                              (size_mb, mtime_ns, workshop_id))
+            self.conn.commit()
+            return True
+
+    def remove(self, workshop_ids: List[str]):
+        """Drop mods whose folders are gone"""
+        if not workshop_ids:
+            return
+        with self._lock:
+            for workshop_id in workshop_ids:
+                self.mods.pop(workshop_id, None)
+                self.fingerprints.pop(workshop_id, None)
+            self.conn.executemany("DELETE FROM mods WHERE workshop_id = ?", [(i,) for i in workshop_ids])
+            self.conn.commit()
+
+    def set_steam_names(self, names: Dict[str, str]):
+        """Remember Steam Workshop titles; they take precedence over names read from disk"""
+        if not names:
+            return
+        with self._lock:
+            self.steam_names.update(names)
+            for workshop_id, name in names.items():
+                if workshop_id in self.mods:
+                    self.mods[workshop_id].name = name
+            self.conn.executemany("UPDATE mods SET steam_name = ? WHERE workshop_id = ?",
+                                  [(name, workshop_id) for workshop_id, name in names.items()])
+            self.conn.commit()
+
+    def missing_steam_names(self) -> List[str]:
+        """Installed mods that have no Steam title yet"""
+        with self._lock:
+            return [workshop_id for workshop_id in self.mods if workshop_id not in self.steam_names]
+
+    def fingerprint_snapshot(self) -> Dict[str, Fingerprint]:
+        with self._lock:
+            return dict(self.fingerprints)
+
+    def installed_ids(self) -> set:
+        with self._lock:
+            return set(self.mods)
+
+    def all(self) -> List[ModInfo]:
+        with self._lock:
+            return list(self.mods.values())
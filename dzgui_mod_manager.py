@@ -10,20 +10,15 @@ import re
 import shutil
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
 import aiohttp
 import asyncio
 
-@dataclass
-class ModInfo:
-    """Mod information structure"""
-    workshop_id: str
-    name: str = ""
-    installed: bool = False
-    local_path: Path = None
-    size_mb: float = 0.0
-    last_updated: float = 0.0
-    required_by_server: bool = False
+from dzgui_http import get_http_session
+from dzgui_async_runtime import get_async_runtime
+from dzgui_mod_index import ModIndex, ModInfo
+from dzgui_mod_sizes import ModSizeService
+from dzgui_workshop_meta import get_workshop_metadata
+from dzgui_server_mods import ServerModsCache
 
 class DZModManager:
     """DayZ Mod Manager for Steam Workshop integration"""
@@ -43,6 +38,19 @@ class DZModManager:
         # Detect actual workshop path
         self.workshop_path = self._find_workshop_path()
         
+        # Persistent mod index: only changed mod folders are rescanned, lookups come from memory
+        self.mod_index = ModIndex()
+        self.watched = False  # True while a WorkshopWatcher pushes workshop changes into the index
+        
+        # Folder sizes are computed on a worker pool and memoized in the index
+        self.sizes = ModSizeService(self.mod_index)
+        
+        # Steam Workshop titles/sizes, cached and shared with the connect dialog and server tooltips
+        self.workshop_meta = get_workshop_metadata()
+        
+        # Required mods per server, prefetched so Connect reads them from memory
+        self.server_mods = ServerModsCache(self)
+        
         print(f"Workshop path: {self.workshop_path}")
     
     def _find_workshop_path(self) -> Path:
@@ -58,65 +66,57 @@ class DZModManager:
         return self.workshop_path
     
     def get_installed_mods(self, use_steam_api: bool = True) -> List[ModInfo]:
-        """Get list of installed mods from Steam Workshop"""
-        mods = []
+        """Get list of installed mods from Steam Workshop
+        
+        Steam names need network I/O, so that path runs on the async runtime;
+        call get_installed_mods_async() from coroutines instead.
+        """
+        if use_steam_api:
+            return get_async_runtime().run(self.get_installed_mods_async())
+        return self.scan_mods()
+    
+    async def get_installed_mods_async(self, use_steam_api: bool = True) -> List[ModInfo]:
+        """Get list of installed mods, scanning disk in a worker thread"""
+        loop = asyncio.get_running_loop()
+        mods = await loop.run_in_executor(None, self.scan_mods)
+        
+        # Steam titles are stored in the mod index, so only mods never named before are looked up
+        missing_names = self.mod_index.missing_steam_names()
+        if use_steam_api and missing_names:
+            try:
+                items = await self.workshop_meta.get(missing_names)
+                steam_names = {mod_id: item.title for mod_id, item in items.items()}
+                await loop.run_in_executor(None, self.mod_index.set_steam_names, steam_names)
+                print(f"✓ Got names for {len(steam_names)} mods from Steam API")
+            except Exception as e:
+                print(f"Failed to get mod names from Steam API: {e}")
         
+        return mods
+    
+    def scan_mods(self) -> List[ModInfo]:
+        """Sync the mod index with the workshop folder, re-reading only changed mods"""
         if not self.workshop_path.exists():
             print(f"Workshop path does not exist: {self.workshop_path}")
-            return mods
-        
-        try:
-            # Each subdirectory is a mod by workshop ID
-            mod_dirs = []
-            for mod_dir in self.workshop_path.iterdir():
-                if mod_dir.is_dir() and mod_dir.name.isdigit():
-                    mod_dirs.append(mod_dir)
-            
-            # Try to get names from Steam API first (batch operation)
-            steam_names = {}
-            if use_steam_api and mod_dirs:
-                try:
-                    workshop_ids = [mod_dir.name for mod_dir in mod_dirs[:50]]  # Limit to avoid API limits
-                    steam_mod_info = asyncio.run(self.get_mod_info_from_steam(workshop_ids))
-                    steam_names = {mod_id: info.get('name', f'Mod {mod_id}') 
-                                 for mod_id, info in steam_mod_info.items()}
-                    print(f"✓ Got names for {len(steam_names)} mods from Steam API")
-                except Exception as e:
-                    print(f"Failed to get mod names from Steam API: {e}")
-            
-            # Process each mod directory
-            for mod_dir in mod_dirs:
-                workshop_id = mod_dir.name
-                
-                # Get mod name (try Steam API first, then local files)
-                mod_name = steam_names.get(workshop_id)
-                if not mod_name or mod_name == f"Mod {workshop_id}":
-                    mod_name = self._get_mod_name(mod_dir)
-                
-                # Get mod size
-                size_mb = self._get_directory_size_mb(mod_dir)
-                
-                # Get last modified time
-                last_updated = mod_dir.stat().st_mtime
-                
-                mod_info = ModInfo(
-                    workshop_id=workshop_id,
-                    name=mod_name or f"Mod {workshop_id}",
-                    installed=True,
-                    local_path=mod_dir,
-                    size_mb=size_mb,
-                    last_updated=last_updated
-                )
-                
-                mods.append(mod_info)
-            
-            print(f"Found {len(mods)} installed mods")
-            
-        except Exception as e:
-            print(f"Error scanning mods: {e}")
-        
+            return []
+        mods = self.mod_index.scan(self.workshop_path, self._scan_mod)
+        self.sizes.request()
         return mods
     
+    def installed_mods(self) -> List[ModInfo]:
+        """Installed mods from memory (scans once if the index was never synced)"""
+        if not self.mod_index.scanned:
+            return self.scan_mods()
+        return self.mod_index.all()
+    
+    def _scan_mod(self, mod_dir: Path) -> ModInfo:
+        """Read the name of one mod folder (its size is filled in by the size service)"""
+        return ModInfo(
+            workshop_id=mod_dir.name,
+            name=self._get_mod_name(mod_dir) or f"Mod {mod_dir.name}",
+            installed=True,
+            local_path=mod_dir
+        )
+    
     def _get_mod_name(self, mod_dir: Path) -> str:
         """Extract mod name from various mod files"""
         
@@ -183,30 +183,22 @@ class DZModManager:
         # Last resort: use workshop ID
         return f"Mod {mod_dir.name}"
     
-    def _get_directory_size_mb(self, directory: Path) -> float:
-        """Get directory size in MB"""
-        try:
-            total_size = sum(f.stat().st_size for f in directory.rglob('*') if f.is_file())
-            return round(total_size / (1024 * 1024), 2)
-        except Exception:
-            return 0.0
-    
     async def get_server_mods(self, server_ip: str, server_port: int) -> List[str]:
         """Get required mods for a server using DayZ SA Launcher API"""
         try:
             # Try DayZ SA Launcher API (commonly used)
             api_url = f"https://dayzsalauncher.com/api/v1/query/{server_ip}/{server_port}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(api_url, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Extract mod IDs from response
-                        if 'mods' in data:
-                            return [str(mod['workshopId']) for mod in data['mods']]
-                        elif 'modIds' in data:
-                            return [str(mod_id) for mod_id in data['modIds']]
+            session = await get_http_session()
+            async with session.get(api_url, timeout=10) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    
+                    # Extract mod IDs from response
+                    if 'mods' in data:
+                        return [str(mod['workshopId']) for mod in data['mods']]
+                    elif 'modIds' in data:
+                        return [str(mod_id) for mod_id in data['modIds']]
             
         except Exception as e:
             print(f"Error getting server mods via API: {e}")
@@ -222,32 +214,36 @@ class DZModManager:
     async def _get_server_mods_a2s(self, server_ip: str, server_port: int) -> List[str]:
         """Get server mods using A2S rules query"""
         try:
-            from a2s import rules
-            
-            # Query server rules
-            server_rules = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: rules((server_ip, server_port + 1))
-            )
-            
-            mod_ids = []
-            
-            # Look for mod-related rules
+            from dzgui_a2s import get_a2s_client, decode_dayz_mod_ids
+
+            # Query server rules over the shared A2S socket
+            a2s_client = await get_a2s_client()
+            server_rules = await a2s_client.rules((server_ip, server_port + 1))
+
+            # DayZ packs its mod list into binary rules
+            mod_ids = decode_dayz_mod_ids(server_rules)
+
+            # Look for mod-related text rules
             for key, value in server_rules.items():
-                if 'mod' in key.lower():
+                if b'mod' in key.lower():
                     # Extract workshop IDs from the value
-                    workshop_ids = re.findall(r'\b\d{9,10}\b', str(value))
+                    workshop_ids = re.findall(r'\b\d{9,10}\b', value.decode('utf-8', errors='ignore'))
                     mod_ids.extend(workshop_ids)
-            
-            return list(set(mod_ids))  # Remove duplicates
+
+            return list(dict.fromkeys(mod_ids))  # Remove duplicates, keep load order
             
         except Exception as e:
             print(f"A2S rules query failed: {e}")
             return []
     
     def check_missing_mods(self, required_mod_ids: List[str]) -> Tuple[List[str], List[str]]:
-        """Check which required mods are missing"""
-        installed_mods = self.get_installed_mods()
-        installed_ids = {mod.workshop_id for mod in installed_mods}
+        """Check which required mods are missing, from the in-memory index
+        
+        The index is synced first only when it never was or no watcher keeps it current.
+        """
+        if not self.mod_index.scanned or not self.watched:
+            self.scan_mods()
+        installed_ids = self.mod_index.installed_ids()
         
         missing = []
         available = []
@@ -266,8 +262,7 @@ class DZModManager:
             return ""
         
         # Filter only installed mods
-        installed_mods = self.get_installed_mods()
-        installed_ids = {mod.workshop_id for mod in installed_mods}
+        installed_ids = {mod.workshop_id for mod in self.installed_mods()}
         
         valid_mods = [mod_id for mod_id in mod_ids if mod_id in installed_ids]
         
@@ -291,119 +286,37 @@ class DZModManager:
         return f"https://steamcommunity.com/sharedfiles/filedetails/?id={mod_id}"
     
     async def get_mod_info_from_steam(self, mod_ids: List[str]) -> Dict[str, dict]:
-        """Get mod information from Steam Workshop API (public endpoint)"""
+        """Get mod information from Steam Workshop API (cached, any number of IDs)"""
         if not mod_ids:
             return {}
         
         try:
-            # Use the working Steam Workshop API (ISteamRemoteStorage - no key required)
-            api_url = "https://api.steampowered.com/ISteamRemoteStorage/GetPublishedFileDetails/v1/"
-            
-            # Prepare form data for POST request
-            form_data = {
-                'itemcount': len(mod_ids[:20]),  # Limit to 20 mods per request
-                'format': 'json'
-            }
-            
-            # Add mod IDs to the form data
-            for i, mod_id in enumerate(mod_ids[:20]):
-                form_data[f'publishedfileids[{i}]'] = mod_id
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(api_url, data=form_data, timeout=15) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        mod_info = {}
-                        published_files = data.get('response', {}).get('publishedfiledetails', [])
-                        
-                        for item in published_files:
-                            mod_id = str(item.get('publishedfileid', ''))
-                            result = item.get('result', 0)
-                            
-                            # Result 1 = success
-                            if result == 1:
-                                mod_info[mod_id] = {
-                                    'name': item.get('title', f'Mod {mod_id}'),
-                                    'description': item.get('description', ''),
-                                    'size': item.get('file_size', 0),
-                                    'updated': item.get('time_created', 0),  # Use time_created instead of time_updated
-                                    'subscriptions': 0,  # Not available in this API
-                                    'tags': []  # Not available in this API
-                                }
-                            else:
-                                print(f"Failed to get info for mod {mod_id}, result code: {result}")
-                        
-                        return mod_info
-                    else:
-                        print(f"Steam API returned status {response.status}")
-        
+            items = await self.workshop_meta.get(mod_ids)
+            return {mod_id: item.to_info() for mod_id, item in items.items()}
         except Exception as e:
             print(f"Error getting mod info from Steam: {e}")
-        
-        # Fallback: try alternative Steam Workshop scraping approach
-        try:
-            return await self._get_mod_info_fallback(mod_ids)
-        except Exception as e:
-            print(f"Fallback mod info failed: {e}")
-        
-        return {}
-    
-    async def _get_mod_info_fallback(self, mod_ids: List[str]) -> Dict[str, dict]:
-        """Fallback method to get mod info via web scraping"""
-        mod_info = {}
-        
-        # Only try for first few mods to avoid overwhelming requests
-        for mod_id in mod_ids[:10]:
-            try:
-                workshop_url = f"https://steamcommunity.com/sharedfiles/filedetails/?id={mod_id}"
-                
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(workshop_url, timeout=10) as response:
-                        if response.status == 200:
-                            html = await response.text()
-                            
-                            # Extract title from HTML (simple regex)
-                            import re
-                            title_match = re.search(r'<div class="workshopItemTitle">([^<]+)</div>', html)
-                            if title_match:
-                                title = title_match.group(1).strip()
-                                mod_info[mod_id] = {
-                                    'name': title,
-                                    'description': '',
-                                    'size': 0,
-                                    'updated': 0,
-                                    'subscriptions': 0
-                                }
-                
-                # Add small delay between requests
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                print(f"Failed to get fallback info for mod {mod_id}: {e}")
-                continue
-        
-        return mod_info
+            return {}
     
     def cleanup_unused_mods(self, keep_mod_ids: List[str] = None) -> int:
         """Remove unused mods to save disk space"""
         if keep_mod_ids is None:
             keep_mod_ids = []
         
-        installed_mods = self.get_installed_mods()
-        removed_count = 0
+        installed_mods = self.installed_mods()
+        removed_ids = []
         
         for mod in installed_mods:
             if mod.workshop_id not in keep_mod_ids:
                 try:
                     if mod.local_path and mod.local_path.exists():
                         shutil.rmtree(mod.local_path)
-                        removed_count += 1
+                        removed_ids.append(mod.workshop_id)
                         print(f"Removed unused mod: {mod.name} ({mod.workshop_id})")
                 except Exception as e:
                     print(f"Error removing mod {mod.workshop_id}: {e}")
         
-        return removed_count
+        self.mod_index.remove(removed_ids)
+        return len(removed_ids)
 
 
 # Singleton instance
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+DZGUI Mod Sizes - Background mod folder sizing
+Mod folders are walked with os.scandir on a worker pool; sizes are memoized in the
+mod index against the folder fingerprint and streamed to the UI as they finish
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from dzgui_mod_index import ModIndex
+
+
+def directory_size(path: Path) -> int:
+    """Total size in bytes of all files below path (os.scandir walk, no symlinks followed)"""
+    total = 0
+    stack = [os.fspath(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+class ModSizeService(QObject):
+    """Sizes mods whose memoized size is missing or stale
+
+    sizeReady is emitted from a worker thread; Qt queues it to receivers on the GUI thread.
+    """
+
+    sizeReady = Signal(str, float)  # workshop_id, size in MB
+
+    def __init__(self, mod_index: ModIndex, max_workers: int = 8, parent=None):
+        super().__init__(parent)
+        self.mod_index = mod_index
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dzgui-modsize")
+        self.in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def request(self) -> int:
+        """Queue every mod with a pending size; return the number of new jobs"""
+        queued = 0
+        for workshop_id, mod_dir, mtime_ns in self.mod_index.pending_sizes():
+            with self._lock:
+                if workshop_id in self.in_flight:
+                    continue
+                self.in_flight[workshop_id] = self.executor.submit(self._size_mod, workshop_id, mod_dir, mtime_ns)
+            queued += 1
+        if queued:
+            print(f"📏 Sizing {queued} mods in the background")
+        return queued
+
+    def _size_mod(self, workshop_id: str, mod_dir: Path, mtime_ns: int):
+        try:
+            size_mb = round(directory_size(mod_dir) / (1024 * 1024), 2)
+            # Dropped when the folder changed meanwhile; the rescan queues it again
+            if self.mod_index.set_size(workshop_id, size_mb, mtime_ns):
+                self.sizeReady.emit(workshop_id, size_mb)
+        except Exception as e:
+            print(f"Error sizing mod {workshop_id}: {e}")
+        finally:
+            with self._lock:
+                self.in_flight.pop(workshop_id, None)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+DZGUI Mod Watcher - Push updates for the workshop folder
+A QFileSystemWatcher (inotify on Linux) on the workshop folder and each mod folder
+(with its direct subfolders) syncs the mod index when Steam adds, updates or removes mods
+"""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Set
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+from dzgui_async_runtime import get_async_runtime
+
+
+class WorkshopWatcher(QObject):
+    """Watches DZModManager.workshop_path and keeps its mod index current
+
+    Filesystem events are coalesced for `settle_ms` (Steam writes many files per
+    update), then one incremental index sync runs on a worker thread. modsChanged
+    carries the workshop IDs that appeared, were rescanned, or disappeared.
+    """
+
+    modsChanged = Signal(list, list, list)  # added, updated, removed workshop IDs
+
+    def __init__(self, mod_manager, settle_ms: int = 1000, parent=None):
+        super().__init__(parent)
+        self.mod_manager = mod_manager
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._on_directory_changed)
+        self._sync_handle = None
+        self._resync = False
+
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(settle_ms)
+        self._settle_timer.timeout.connect(self._sync)
+
+        self.watch_paths()
+
+    def watch_paths(self):
+        """Watch the workshop folder and its mod folders, or the closest existing parent"""
+        workshop_path = self.mod_manager.workshop_path
+        wanted: Set[str] = set()
+        if workshop_path.exists():
+            wanted.add(str(workshop_path))
+            for mod in self.mod_manager.mod_index.all():
+                # The mod folder plus its direct subfolders (addons/, keys/), matching the index fingerprint
+                wanted.add(str(mod.local_path))
+                try:
+                    with os.scandir(mod.local_path) as entries:
+                        wanted.update(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+                except OSError:
+                    continue
+        else:
+            # Not created until the first subscription; wait for it to appear
+            parent = workshop_path.parent
+            while not parent.exists() and parent != parent.parent:
+                parent = parent.parent
+            wanted.add(str(parent))
+
+        current = set(self.watcher.directories())
+        stale = list(current - wanted)
+        if stale:
+            self.watcher.removePaths(stale)
+        new = [path for path in wanted - current if Path(path).is_dir()]
+        if new:
+            self.watcher.addPaths(new)
+        # Without a watch on the workshop folder itself (missing, or inotify limits), lookups rescan
+        self.mod_manager.watched = str(workshop_path) in self.watcher.directories()
+
+    def _on_directory_changed(self, path: str):
+        self._settle_timer.start()
+
+    def _sync(self):
+        if self._sync_handle is not None and not self._sync_handle.done():
+            self._resync = True  # events arrived during a sync; run again when it finishes
+            return
+        self._sync_handle = get_async_runtime().submit_qt(self._sync_async(), self)
+        self._sync_handle.finished.connect(self._on_synced)
+        self._sync_handle.failed.connect(lambda error: print(f"Error syncing mod index: {error}"))
+
+    async def _sync_async(self):
+        loop = asyncio.get_running_loop()
+        index = self.mod_manager.mod_index
+        before = index.fingerprint_snapshot()
+        await loop.run_in_executor(None, self.mod_manager.scan_mods)
+        after = index.fingerprint_snapshot()
+        added = sorted(set(after) - set(before))
+        removed = sorted(set(before) - set(after))
+        updated = sorted(workshop_id for workshop_id in set(after) & set(before)
+                         if after[workshop_id] != before[workshop_id])
+        return added, updated, removed
+
+    def _on_synced(self, result):
+        added, updated, removed = result
+        self.watch_paths()
+        if added or updated or removed:
+            print(f"👀 Workshop changed: {len(added)} added, {len(updated)} updated, {len(removed)} removed")
+            self.modsChanged.emit(added, updated, removed)
+        if self._resync:
+            self._resync = False
+            self._sync()
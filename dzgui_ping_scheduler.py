@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+DZGUI Ping Scheduler - Prioritized, adaptive latency probing
+Visible and favorite servers are probed first, each server gets several samples
+(min/avg/jitter), lost probes are retried with backoff and concurrency follows
+observed loss (AIMD) instead of fixed sleeps
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from dzgui_database import ServerRecord
+
+PingKey = Tuple[str, int]  # (ip, query_port), as ServerRecord.key
+
+# Priority tiers, lowest probed first
+TIER_VISIBLE = 0
+TIER_FAVORITE = 1
+TIER_POPULATED = 2
+TIER_EMPTY = 3
+
+UNREACHABLE_PING = 999  # stored when every sample of every attempt was lost
+
+
+@dataclass
+class PortReply:
+    """A2S_INFO answer of one server: liveness, RTT and player counts"""
+    rtt: float  # milliseconds
+    players: int
+    max_players: int
+
+
+@dataclass
+class PingStats:
+    """RTT samples of one server (milliseconds), plus players from its A2S reply"""
+    samples: List[float] = field(default_factory=list)
+    sent: int = 0
+    players: Optional[int] = None
+    max_players: Optional[int] = None
+
+    @property
+    def received(self) -> int:
+        return len(self.samples)
+
+    @property
+    def loss(self) -> float:
+        return 1.0 - self.received / self.sent if self.sent else 0.0
+
+    @property
+    def min(self) -> Optional[float]:
+        return min(self.samples) if self.samples else None
+
+    @property
+    def avg(self) -> Optional[float]:
+        return sum(self.samples) / len(self.samples) if self.samples else None
+
+    @property
+    def jitter(self) -> float:
+        """Mean absolute difference between consecutive samples"""
+        if len(self.samples) < 2:
+            return 0.0
+        diffs = [abs(b - a) for a, b in zip(self.samples, self.samples[1:])]
+        return sum(diffs) / len(diffs)
+
+    @property
+    def ping(self) -> int:
+        """Value stored for the server: average RTT, or the unreachable sentinel"""
+        if not self.samples:
+            return UNREACHABLE_PING
+        return min(max(1, int(round(self.avg))), UNREACHABLE_PING)
+
+
+class _ProbeGroup:
+    """One measure() call: its servers, callback and completion future"""
+
+    def __init__(self, servers: List[ServerRecord], on_result: Optional[Callable]):
+        self.remaining = len(servers)
+        self.results: Dict[PingKey, PingStats] = {}
+        self.on_result = on_result
+        self.cancelled = False
+        self.done = asyncio.get_running_loop().create_future()
+
+    def complete(self, server: ServerRecord, stats: PingStats):
+        self.results[server.key] = stats
+        self.remaining -= 1
+        if self.on_result and not self.cancelled:
+            self.on_result(server, stats)
+        if self.remaining <= 0 and not self.done.done():
+            self.done.set_result(self.results)
+
+
+@dataclass
+class _Target:
+    """One server inside a host job"""
+    server: ServerRecord
+    group: _ProbeGroup
+    stats: PingStats = field(default_factory=PingStats)
+
+
+@dataclass
+class _HostJob:
+    """All queued servers on one IP, probed together"""
+    ip: str
+    targets: List[_Target]
+    attempt: int = 0
+    not_before: float = 0.0
+    host_stats: Optional[PingStats] = None  # ICMP series, kept for retries of silent ports
+
+    @property
+    def cancelled(self) -> bool:
+        return all(target.group.cancelled for target in self.targets)
+
+
+class PingScheduler:
+    """Shared probe queue for all ping measurements on the async runtime
+
+    Servers are grouped by IP: a host gets one ICMP series (latency only depends
+    on the IP) whose samples fan out to every server on it, and each server gets
+    one A2S_INFO query that confirms it is up and reports its players. A server
+    whose port stays silent is unreachable even on a live host; on a host that
+    does not answer ICMP, the RTT comes from further A2S samples per port.
+    Jobs from concurrent measure() calls share one priority heap and one
+    concurrency budget. Silent servers are retried after `backoff * 2**attempt`
+    seconds; partial loss on a responsive host is taken as congestion and halves
+    concurrency, clean jobs grow it additively.
+    """
+
+    def __init__(self, host_probe: Callable[[str], Awaitable[Optional[float]]],
+                 port_probe: Callable[[str, int], Awaitable[Optional[PortReply]]], samples: int = 3,
+                 max_retries: int = 2, backoff: float = 0.25, initial_concurrency: int = 32,
+                 min_concurrency: int = 4, max_concurrency: int = 128):
+        self.host_probe = host_probe
+        self.port_probe = port_probe
+        self.samples = samples
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(initial_concurrency)
+        self.decrease_interval = 1.0  # at most one multiplicative decrease per interval
+
+        self.visible: Set[PingKey] = set()
+        self.favorites: Set[PingKey] = set()
+        self.stats: Dict[PingKey, PingStats] = {}  # last result per server
+        self.measured_at: Dict[PingKey, float] = {}  # monotonic time of that result
+        self.packets_sent = 0  # probes sent since start, host and port
+
+        self._counter = itertools.count()
+        self._ready: List[Tuple] = []    # heap of (tier, -players, seq, job)
+        self._delayed: List[Tuple] = []  # heap of (not_before, seq, job) waiting for a retry
+        self._queued_hosts: Dict[str, _HostJob] = {}  # jobs in _ready, so new servers join them
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._last_decrease = 0.0
+
+    def _tier(self, server: ServerRecord) -> int:
+        if server.key in self.visible:
+            return TIER_VISIBLE
+        if server.key in self.favorites:
+            return TIER_FAVORITE
+        if server.players > 0:
+            return TIER_POPULATED
+        return TIER_EMPTY
+
+    def _priority(self, job: _HostJob) -> Tuple:
+        """A host is as urgent as its most urgent server"""
+        tier = min(self._tier(target.server) for target in job.targets)
+        players = max(target.server.players for target in job.targets)
+        return (tier, -players, next(self._counter), job)
+
+    def _reprioritize(self):
+        self._ready = [self._priority(entry[-1]) for entry in self._ready]
+        heapq.heapify(self._ready)
+
+    def set_priorities(self, visible: Iterable[PingKey] = (), favorites: Iterable[PingKey] = ()):
+        """Update visible/favorite servers and re-rank queued jobs (call on the runtime loop)"""
+        self.visible = set(visible)
+        self.favorites = set(favorites)
+        self._reprioritize()
+
+    async def measure(self, servers: List[ServerRecord],
+                      on_result: Optional[Callable[[ServerRecord, PingStats], None]] = None) -> Dict[PingKey, PingStats]:
+        """Probe servers and return their stats; on_result is called as each server finishes"""
+        if not servers:
+            return {}
+        group = _ProbeGroup(servers, on_result)
+        merged = False
+        for server in servers:
+            target = _Target(server, group)
+            job = self._queued_hosts.get(server.ip)
+            if job is not None:
+                job.targets.append(target)
+                merged = True
+            else:
+                job = _HostJob(server.ip, [target])
+                self._queued_hosts[server.ip] = job
+                heapq.heappush(self._ready, self._priority(job))
+        if merged:
+            self._reprioritize()
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        self._wakeup.set()
+
+        try:
+            return await asyncio.shield(group.done)
+        except asyncio.CancelledError:
+            # Queued jobs of this group are dropped by the dispatcher
+            group.cancelled = True
+            raise
+
+    async def _dispatch(self):
+        in_flight: Set[asyncio.Task] = set()
+        try:
+            while self._ready or self._delayed or in_flight:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    job = heapq.heappop(self._delayed)[-1]
+                    heapq.heappush(self._ready, self._priority(job))
+
+                while self._ready and len(in_flight) < int(self.concurrency):
+                    job = heapq.heappop(self._ready)[-1]
+                    if self._queued_hosts.get(job.ip) is job:
+                        del self._queued_hosts[job.ip]
+                    if job.cancelled:
+                        continue
+                    in_flight.add(asyncio.create_task(self._run_job(job)))
+
+                timeout = max(0.0, self._delayed[0][0] - time.monotonic()) if self._delayed else None
+                self._wakeup.clear()
+                waiter = asyncio.create_task(self._wakeup.wait())
+                done, _ = await asyncio.wait(in_flight | {waiter}, timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                in_flight -= done
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _sample(self, probe: Callable[[], Awaitable[Optional[float]]],
+                      count: Optional[int] = None) -> PingStats:
+        """Up to `count` (default `samples`) probes; stops after a first loss so silent hosts do not cost more timeouts"""
+        stats = PingStats()
+        for _ in range(self.samples if count is None else count):
+            stats.sent += 1
+            self.packets_sent += 1
+            try:
+                rtt = await probe()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                rtt = None
+            if rtt is not None and rtt > 0:
+                stats.samples.append(float(rtt))
+            elif not stats.samples:
+                break
+        return stats
+
+    async def _query_port(self, ip: str, port: int) -> Optional[PortReply]:
+        """One A2S_INFO query, None when lost"""
+        self.packets_sent += 1
+        try:
+            return await self.port_probe(ip, port)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return None
+
+    async def _port_rtt(self, ip: str, port: int) -> Optional[float]:
+        reply = await self._query_port(ip, port)
+        return reply.rtt if reply is not None else None
+
+    async def _run_job(self, job: _HostJob):
+        targets = [target for target in job.targets if not target.group.cancelled]
+
+        # Every server answers for itself; the host's ICMP series runs alongside (once per job, retries reuse it)
+        port_queries = [self._query_port(job.ip, target.server.query_port) for target in targets]
+        if job.host_stats is None:
+            job.host_stats, *replies = await asyncio.gather(
+                self._sample(lambda: self.host_probe(job.ip)), *port_queries)
+            self._adjust_concurrency(job.host_stats.sent, job.host_stats.received)
+        else:
+            replies = await asyncio.gather(*port_queries)
+        host_stats = job.host_stats
+
+        silent = []
+        a2s_timed = []
+        for target, reply in zip(targets, replies):
+            if reply is None:
+                target.stats.sent += 1
+                silent.append(target)
+                continue
+            target.stats.players = reply.players
+            target.stats.max_players = reply.max_players
+            if host_stats.received:
+                # Live server on a live host: the host's RTT applies to it
+                target.stats.samples.extend(host_stats.samples)
+                target.stats.sent += host_stats.sent
+                self._finish(target)
+            else:
+                target.stats.sent += 1
+                target.stats.samples.append(reply.rtt)
+                a2s_timed.append(target)
+
+        if a2s_timed:
+            # Host silent (or ICMP unavailable): RTT from more A2S samples of each live port
+            port_stats = await asyncio.gather(*(
+                self._sample(lambda port=target.server.query_port: self._port_rtt(job.ip, port), self.samples - 1)
+                for target in a2s_timed
+            ))
+            self._adjust_concurrency(sum(stats.sent for stats in port_stats),
+                                     sum(stats.received for stats in port_stats))
+            for target, stats in zip(a2s_timed, port_stats):
+                target.stats.samples.extend(stats.samples)
+                target.stats.sent += stats.sent
+                self._finish(target)
+
+        if silent and job.attempt < self.max_retries:
+            delay = self.backoff * (2 ** job.attempt)
+            retry = _HostJob(job.ip, silent, job.attempt + 1, time.monotonic() + delay, host_stats)
+            heapq.heappush(self._delayed, (retry.not_before, next(self._counter), retry))
+            self._wakeup.set()
+            return
+
+        # No A2S reply after every retry: the server is down, whatever the host's ICMP says
+        for target in silent:
+            self._finish(target)
+
+    def _finish(self, target: _Target):
+        key = target.server.key
+        self.stats[key] = target.stats
+        self.measured_at[key] = time.monotonic()
+        target.group.complete(target.server, target.stats)
+
+    def _adjust_concurrency(self, sent: int, received: int):
+        """AIMD: partial loss from a responsive host halves concurrency, clean rounds add ~1 per window"""
+        if sent == 0 or received == 0:
+            return  # nothing answered: a dead host, not a congestion signal
+        if received == sent:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+        else:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.decrease_interval:
+                self._last_decrease = now
+                self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+                print(f"📉 Ping loss detected, concurrency -> {int(self.concurrency)}")
+
+
+class PingRefresher:
+    """Low-rate rolling re-ping of visible servers and favorites
+
+    Every `tick` seconds, servers whose last measurement is older than their
+    interval are probed through the scheduler, oldest first, as far as a token
+    bucket of `packets_per_second` (burst `burst`) allows. Probes actually
+    sent (host, per-port and retries) are charged to the bucket.
+    """
+
+    def __init__(self, scheduler: PingScheduler, load_records: Callable[[List[PingKey]], List[ServerRecord]],
+                 on_result: Callable[[ServerRecord, PingStats], None], packets_per_second: float = 20.0,
+                 burst: float = 60.0, visible_interval: float = 30.0, favorite_interval: float = 120.0,
+                 tick: float = 1.0, is_paused: Callable[[], bool] = lambda: False):
+        self.scheduler = scheduler
+        self.load_records = load_records
+        self.on_result = on_result
+        self.packets_per_second = packets_per_second
+        self.burst = burst
+        self.visible_interval = visible_interval
+        self.favorite_interval = favorite_interval
+        self.tick = tick
+        self.is_paused = is_paused
+        self.tokens = burst
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the refresh loop (call on the runtime loop)"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.running:
+            self._task.cancel()
+
+    def due_keys(self, now: float) -> List[PingKey]:
+        """Visible then favorite servers past their interval, least recently measured first"""
+        def age(key):
+            return now - self.scheduler.measured_at.get(key, float('-inf'))
+
+        visible = sorted((key for key in self.scheduler.visible if age(key) > self.visible_interval),
+                         key=age, reverse=True)
+        favorites = sorted((key for key in self.scheduler.favorites - self.scheduler.visible
+                            if age(key) > self.favorite_interval), key=age, reverse=True)
+        return visible + favorites
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(self.tick)
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - last) * self.packets_per_second)
+            last = now
+            if self.is_paused():
+                continue
+
+            # Worst case per server: a full ICMP series plus its A2S query
+            affordable = int(self.tokens // (self.scheduler.samples + 1))
+            keys = self.due_keys(now)[:affordable]
+            if not keys:
+                continue
+
+            sent_before = self.scheduler.packets_sent
+            try:
+                records = await loop.run_in_executor(None, self.load_records, keys)
+                await self.scheduler.measure(records, self.on_result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Ping refresher error: {e}")
+            self.tokens -= self.scheduler.packets_sent - sent_before
@@ -7,16 +7,25 @@ Test moderne interface with working components
 import sys
 import os
 import json
+import asyncio
 from pathlib import Path
 from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                                QWidget, QLabel, QPushButton, QScrollArea, QFrame,
-                               QLineEdit, QCheckBox, QGroupBox, QProgressBar, QTabWidget, QSpinBox, QComboBox)
+                               QLineEdit, QCheckBox, QGroupBox, QProgressBar, QTabWidget, QSpinBox, QComboBox,
+                               QListView, QAbstractItemView, QTableWidget, QTableWidgetItem,
+                               QHeaderView, QFileDialog)
 from PySide6.QtCore import Qt, QTimer, QThread, Signal
 from PySide6.QtGui import QFont, QPalette, QColor
 
 # Import our native Python server manager and mod manager
 from dzgui_server_manager import get_server_manager
 from dzgui_mod_manager import get_mod_manager
+from dzgui_mod_watcher import WorkshopWatcher
+from dzgui_async_runtime import get_async_runtime, shutdown_async_runtime
+from dzgui_server_list import ServerListModel, ServerCardDelegate, PingUpdateBatcher, ServerRole, age_display
+from dzgui_server_store import ServerStore, server_key
+from dzgui_filter_engine import FilterEngine, FilterCriteria, sort_servers
+from dzgui_metrics import get_metrics
 
 class ModernDZGUI(QMainWindow):
     """Modern DZGUI with PySide6 Widgets"""
@@ -38,13 +47,30 @@ class ModernDZGUI(QMainWindow):
         self.server_manager.progressUpdate.connect(self.on_progress_update)
         self.server_manager.serverPingUpdated.connect(self.on_server_ping_updated)  # NEW: Real-time ping updates
         
+        # Ping updates are applied to the list once per frame-ish interval, not per signal
+        self.ping_batcher = PingUpdateBatcher(80, self)
+        self.ping_batcher.batchReady.connect(self.on_ping_batch)
+        
         # Mod manager
         self.mod_manager = get_mod_manager()
+        self.mod_manager.sizes.sizeReady.connect(self.on_mod_size_ready)
+        self.mod_size_labels = {}  # workshop_id -> size label of the shown mod card
+        
+        # Workshop folder changes are pushed instead of polled
+        self.mod_watcher = WorkshopWatcher(self.mod_manager, parent=self)
+        self.mod_watcher.modsChanged.connect(self.on_workshop_changed)
+        self.pending_connect = None  # (server_data, missing mod IDs) waiting for Steam downloads
         
-        # Server data
-        self.servers = []
+        # Server data - indexed by (ip, qport), see the servers property
+        self.server_store = ServerStore()
         self.filtered_servers = []  # For search results
         
+        # Filter changes are debounced and answered from the store/database first
+        self.filter_engine = FilterEngine(self.server_store, self.server_manager.database, parent=self)
+        self.filter_engine.resultsReady.connect(self.on_filter_results)
+        self.filter_engine.refreshNeeded.connect(self.apply_battlemetrics_filters)
+        self.server_manager.serversChanged.connect(self.on_servers_changed)
+        
         # Server type selection
         self.selected_server_type = None  # No default selection - show all servers initially
         self.server_type_buttons = {}  # Store button references
@@ -57,7 +83,16 @@ class ModernDZGUI(QMainWindow):
         
         # Set initial server type styling and load servers immediately
         QTimer.singleShot(50, self.update_server_type_styles)  # Apply styling after UI is ready
-        QTimer.singleShot(100, self.load_servers_immediately)  # Load servers immediately
+        QTimer.singleShot(0, self.load_servers_immediately)  # Show cached servers on the first event loop pass
+    
+    @property
+    def servers(self) -> ServerStore:
+        """All known servers (list-like, O(1) lookup by (ip, qport))"""
+        return self.server_store
+    
+    @servers.setter
+    def servers(self, servers):
+        self.server_store.replace_all(servers)
     
     def load_favorites(self):
         """Load favorites from JSON file"""
@@ -422,6 +457,12 @@ class ModernDZGUI(QMainWindow):
         self.create_mod_tab_content()
         self.tab_widget.addTab(self.mod_tab, "🧩 Mods")
         
+        # Create diagnostics tab
+        self.diagnostics_tab = QWidget()
+        self.create_diagnostics_tab_content()
+        self.tab_widget.addTab(self.diagnostics_tab, "📊 Diagnostics")
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
+        
         layout.addWidget(self.tab_widget)
         
         # Status bar
@@ -466,18 +507,33 @@ class ModernDZGUI(QMainWindow):
         self.progress.setRange(0, 0)
         layout.addWidget(self.progress)
         
-        # Server list
-        self.server_scroll = QScrollArea()
-        self.server_scroll.setWidgetResizable(True)
-        self.server_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.server_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        
-        self.server_list_widget = QWidget()
-        self.server_list_layout = QVBoxLayout(self.server_list_widget)
-        self.server_list_layout.setSpacing(8)
-        
-        self.server_scroll.setWidget(self.server_list_widget)
-        layout.addWidget(self.server_scroll)
+        # Server list - model/view, rows are painted by the delegate (no widget per server)
+        self.server_model = ServerListModel(self.is_favorite, self, mod_titles=self.workshop_titles)
+        self.server_delegate = ServerCardDelegate(self)
+        self.server_delegate.connectClicked.connect(self.connect_to_server)
+        self.server_delegate.favoriteClicked.connect(self.toggle_favorite)
+        
+        self.server_view = QListView()
+        self.server_view.setModel(self.server_model)
+        self.server_view.setItemDelegate(self.server_delegate)
+        self.server_view.setUniformItemSizes(True)
+        self.server_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.server_view.verticalScrollBar().setSingleStep(20)
+        self.server_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.server_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.server_view.setMouseTracking(True)
+        self.server_view.setStyleSheet("QListView { background-color: transparent; border: none; }")
+        self.server_view.entered.connect(lambda index: self.prefetch_server_mods([index.data(ServerRole)]))
+        layout.addWidget(self.server_view)
+        
+        # On-screen and favorite servers are pinged first; recomputed once scrolling/updates settle
+        self.ping_priority_timer = QTimer(self)
+        self.ping_priority_timer.setSingleShot(True)
+        self.ping_priority_timer.setInterval(150)
+        self.ping_priority_timer.timeout.connect(self.update_ping_priorities)
+        self.server_view.verticalScrollBar().valueChanged.connect(self.ping_priority_timer.start)
+        self.server_model.modelReset.connect(self.ping_priority_timer.start)
+        self.server_model.rowsInserted.connect(self.ping_priority_timer.start)
     
     def create_mod_tab_content(self):
         """Create mod management tab content"""
@@ -522,186 +578,111 @@ class ModernDZGUI(QMainWindow):
         # Load mods initially
         self.refresh_mods()
     
-    def create_server_card(self, server_data):
-        """Create a server card widget"""
-        card = QFrame()
-        card.setFrameStyle(QFrame.Box)
-        card.setFixedHeight(100)
-        
-        # Store server data in widget for later reference
-        card._server_data = server_data
-        card.setStyleSheet("""
-            QFrame {
-                background-color: #2a2a2a;
-                border: 1px solid #404040;
-                border-radius: 12px;
-                padding: 8px;
-            }
-            QFrame:hover {
-                border-color: #4a7c59;
-                background-color: #333333;
-            }
-        """)
-        
-        layout = QVBoxLayout(card)
-        layout.setSpacing(4)
+    def create_diagnostics_tab_content(self):
+        """Create refresh pipeline diagnostics tab content"""
+        layout = QVBoxLayout(self.diagnostics_tab)
+        layout.setSpacing(16)
+        layout.setContentsMargins(16, 16, 16, 16)
         
-        # Header
+        # Diagnostics header
         header_layout = QHBoxLayout()
-        
-        name_label = QLabel(server_data["name"])
-        name_label.setFont(QFont("Cantarell", 11, QFont.Bold))
-        header_layout.addWidget(name_label)
+        diagnostics_title = QLabel("📊 Refresh Pipeline Timings")
+        diagnostics_title.setFont(QFont("Cantarell", 14, QFont.Bold))
+        header_layout.addWidget(diagnostics_title)
         
         header_layout.addStretch()
         
-        # Favorite button
-        is_fav = self.is_favorite(server_data)
-        fav_btn = QPushButton("★" if is_fav else "☆")
-        fav_btn.setFixedSize(24, 24)
-        fav_btn.setStyleSheet(f"""
-            QPushButton {{
-                background-color: transparent;
-                border: none;
-                color: {'#FFD700' if is_fav else '#666666'};
-                font-size: 16px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                color: #FFD700;
-                background-color: rgba(255, 215, 0, 0.1);
-                border-radius: 12px;
-            }}
-        """)
-        fav_btn.clicked.connect(lambda: self.toggle_favorite(server_data))
-        header_layout.addWidget(fav_btn)
-        
-        # Status and players
-        status_color = "#4CAF50" if server_data["online"] else "#F44336"
-        players_label = QLabel(f"● {server_data['players']}/{server_data['max_players']}")
-        players_label.setStyleSheet(f"color: {status_color};")
-        header_layout.addWidget(players_label)
-        
-        # Connect button for this server
-        connect_btn = QPushButton("⚡ Connect")
-        connect_btn.setFixedSize(80, 24)
-        connect_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4a7c59;
-                color: white;
-                border: 1px solid #5a8c69;
-                border-radius: 4px;
-                font-weight: bold;
-                font-size: 10px;
-            }
-            QPushButton:hover {
-                background-color: #5a8c69;
-                border-color: #6a9c79;
-            }
-            QPushButton:pressed {
-                background-color: #3a6c49;
-            }
-        """)
-        connect_btn.clicked.connect(lambda: self.connect_to_server(server_data))
-        header_layout.addWidget(connect_btn)
+        export_json_btn = QPushButton("Export JSON")
+        export_json_btn.setStyleSheet("QPushButton { background-color: #5c7a89; color: white; }")
+        export_json_btn.clicked.connect(lambda: self.export_metrics("json"))
+        header_layout.addWidget(export_json_btn)
         
-        layout.addLayout(header_layout)
+        export_csv_btn = QPushButton("Export CSV")
+        export_csv_btn.setStyleSheet("QPushButton { background-color: #5c7a89; color: white; }")
+        export_csv_btn.clicked.connect(lambda: self.export_metrics("csv"))
+        header_layout.addWidget(export_csv_btn)
         
-        # Info row
-        info_layout = QHBoxLayout()
+        layout.addLayout(header_layout)
         
-        map_label = QLabel(f"Map: {server_data['map']}")
-        map_label.setStyleSheet("color: #b8b8b8; font-size: 10px;")
-        info_layout.addWidget(map_label)
+        # Per-stage percentiles over the metrics ring buffer
+        columns = ["Stage", "Runs", "Items", "p50 (ms)", "p90 (ms)", "p99 (ms)", "Max (ms)", "Error rate"]
+        self.diagnostics_table = QTableWidget(0, len(columns))
+        self.diagnostics_table.setHorizontalHeaderLabels(columns)
+        self.diagnostics_table.verticalHeader().setVisible(False)
+        self.diagnostics_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.diagnostics_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.diagnostics_table)
+        
+        self.diagnostics_counters = QLabel()
+        self.diagnostics_counters.setStyleSheet("color: #b8b8b8; font-size: 11px;")
+        layout.addWidget(self.diagnostics_counters)
+        
+        # Only refreshed while the tab is shown
+        self.diagnostics_timer = QTimer(self)
+        self.diagnostics_timer.setInterval(2000)
+        self.diagnostics_timer.timeout.connect(self.update_diagnostics)
+    
+    def on_tab_changed(self, index):
+        """Start the diagnostics refresh timer only while its tab is visible"""
+        if self.tab_widget.widget(index) is self.diagnostics_tab:
+            self.update_diagnostics()
+            self.diagnostics_timer.start()
+        else:
+            self.diagnostics_timer.stop()
+    
+    def update_diagnostics(self):
+        """Fill the diagnostics table from the metrics ring buffer"""
+        metrics = get_metrics()
+        summaries = metrics.summary()
+        self.diagnostics_table.setRowCount(len(summaries))
+        for row, summary in enumerate(summaries):
+            values = [summary.stage, str(summary.runs), str(summary.items),
+                      f"{summary.p50:.1f}", f"{summary.p90:.1f}", f"{summary.p99:.1f}", f"{summary.max:.1f}",
+                      f"{summary.error_rate:.0%}"]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.diagnostics_table.setItem(row, column, item)
+        
+        counters = ", ".join(f"{name}: {value}" for name, value in sorted(metrics.counter_snapshot().items()))
+        self.diagnostics_counters.setText(counters or "No refresh recorded yet")
+    
+    def export_metrics(self, file_format):
+        """Save the metrics ring buffer as JSON or CSV"""
+        default_path = str(Path.home() / f"dzgui-metrics.{file_format}")
+        path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", default_path,
+                                              f"{file_format.upper()} files (*.{file_format})")
+        if not path:
+            return
         
-        # Mods information from BattleMetrics
         try:
-            mods_str = server_data.get('mods', '[]')
-            
-            if isinstance(mods_str, str):
-                import json
-                mods_list = json.loads(mods_str) if mods_str != '[]' else []
-            else:
-                mods_list = mods_str if isinstance(mods_str, list) else []
-            
-            if mods_list:
-                mod_count = len(mods_list)
-                mod_label = QLabel(f"🔧 {mod_count} mod{'s' if mod_count != 1 else ''}")
-                mod_label.setStyleSheet("color: #ff9800; font-size: 10px; font-weight: bold;")
-                
-                # Create tooltip with mod names if available
-                tooltip_lines = [f"This server uses {mod_count} mods:"]
-                for i, mod in enumerate(mods_list[:10]):  # Show first 10 mods
-                    if isinstance(mod, dict):
-                        mod_name = mod.get('name', f"Mod {mod.get('id', 'Unknown')}")
-                        mod_id = mod.get('id', '')
-                        tooltip_lines.append(f"• {mod_name} ({mod_id})")
-                    else:
-                        # Old format - just ID
-                        tooltip_lines.append(f"• Mod {mod}")
-                
-                if len(mods_list) > 10:
-                    tooltip_lines.append(f"... and {len(mods_list) - 10} more")
-                
-                mod_label.setToolTip('\n'.join(tooltip_lines))
-                info_layout.addWidget(mod_label)
-            else:
-                # No mods - vanilla server
-                vanilla_label = QLabel("✅ Vanilla")
-                vanilla_label.setStyleSheet("color: #4CAF50; font-size: 10px; font-weight: bold;")
-                vanilla_label.setToolTip("This server uses no mods (vanilla DayZ)")
-                info_layout.addWidget(vanilla_label)
+            metrics = get_metrics()
+            count = metrics.export_json(path) if file_format == "json" else metrics.export_csv(path)
+            self.status_label.setText(f"Exported {count} timing samples to {path}")
         except Exception as e:
-            print(f"Error displaying mods for {server_data.get('name', 'Unknown')}: {e}")
-            # Fallback - just show unknown
-            unknown_label = QLabel("❓ Mods")
-            unknown_label.setStyleSheet("color: #9E9E9E; font-size: 10px;")
-            unknown_label.setToolTip("Mod information not available")
-            info_layout.addWidget(unknown_label)
-        
-        # Ping with colors and status
-        ping = server_data.get("ping", -1)
-        if ping == -1:
-            ping_text = "Pinging..."
-            ping_color = "#b8b8b8"
-        elif ping >= 999:
-            ping_text = "Offline"
-            ping_color = "#F44336"  # Red
-        elif ping < 50:
-            ping_text = f"{ping}ms"
-            ping_color = "#4CAF50"  # Green - Excellent
-        elif ping < 100:
-            ping_text = f"{ping}ms"
-            ping_color = "#8BC34A"  # Light Green - Good
-        elif ping < 200:
-            ping_text = f"{ping}ms"
-            ping_color = "#FF9800"  # Orange - Acceptable
-        else:
-            ping_text = f"{ping}ms"
-            ping_color = "#F44336"  # Red - Poor
-        
-        ping_label = QLabel(f"Ping: {ping_text}")
-        ping_label.setStyleSheet(f"color: {ping_color}; font-size: 10px; font-weight: bold;")
-        info_layout.addWidget(ping_label)
-        
-        layout.addLayout(info_layout)
-        
-        layout.addStretch()
-        
-        return card
+            self.status_label.setText(f"Error exporting metrics: {e}")
     
     def on_servers_updated(self, servers):
-        """Handle servers updated signal"""
-        # Only update if we don't have servers already (avoid overriding real-time updates)
-        if not self.servers or len(servers) > len(self.servers):
-            self.servers = servers
-            # Apply server type filter only if explicitly selected by user
-            if hasattr(self, 'selected_server_type') and self.selected_server_type is not None:
-                self.filter_by_server_type(self.selected_server_type)
-            else:
-                # Show all servers by default - no automatic filtering
-                if self.server_list_layout.count() == 0:
-                    self.populate_server_list()
+        """A refresh finished: its servers replace the cached rows still shown for them
+        
+        on_servers_changed has already applied the refresh's changeset (including
+        removals); what is left are unchanged servers still marked as cached.
+        """
+        revalidated = []
+        for server_data in servers:
+            known = self.server_store.get(server_key(server_data))
+            if known is None or known.get('cached_at'):
+                revalidated.append(self.refreshed_server(server_data))
+        if revalidated:
+            self.apply_server_updates(revalidated)
+        
+        # Apply server type filter only if explicitly selected by user
+        if hasattr(self, 'selected_server_type') and self.selected_server_type is not None:
+            self.filter_by_server_type(self.selected_server_type)
+        elif self.server_model.rowCount() == 0 and not getattr(self, '_filters_applied', False):
+            # Nothing pinged yet (cold start without a cache): show the servers while pings arrive
+            self.populate_server_list()
     
     def on_server_error(self, error_msg):
         """Handle server error signal"""
@@ -766,57 +747,59 @@ class ModernDZGUI(QMainWindow):
             ))
     
     def on_server_ping_updated(self, server_data):
-        """Handle real-time server ping updates - add server to UI immediately"""
+        """Buffer real-time server ping updates; they reach the list in batches"""
+        self.ping_batcher.add(server_data)
+    
+    def on_ping_batch(self, servers):
+        """Apply a batch of ping updates, re-filtering only the affected rows"""
+        self.apply_server_updates(servers)
+    
+    def apply_server_updates(self, servers):
+        """Upsert servers into the store and add, repaint or drop just their rows"""
         try:
             # NO SERVER TYPE FILTERING DURING LOADING - Show ALL servers that respond
             # Only apply server type filtering when user explicitly selects a type
-            
-            # Update existing server in list or add new one
-            server_found = False
-            for i, existing_server in enumerate(self.servers):
-                if (existing_server.get('ip') == server_data.get('ip') and 
-                    existing_server.get('qport') == server_data.get('qport')):
-                    # Update existing server
-                    self.servers[i] = server_data
-                    server_found = True
-                    break
-            
-            if not server_found:
-                # Add new server to list
-                self.servers.append(server_data)
-            
-            # Check if server type filtering is explicitly active
             server_type_filter_active = (hasattr(self, 'selected_server_type') and 
                                        self.selected_server_type is not None)
+            filters_applied = hasattr(self, '_filters_applied') and self._filters_applied
+            sort_option = self.filter_engine.criteria.sort_option
             
-            if server_type_filter_active:
-                # Server type filter is active - check if this server matches
-                server_type = server_data.get('server_type', 'community')
-                if server_type != self.selected_server_type:
-                    return  # Skip display if doesn't match active filter
-            
-            # Update filtered list if we have other active filters (search, ping, etc.)
-            if hasattr(self, '_filters_applied') and self._filters_applied:
-                # Reapply current filters to include the new/updated server
-                self.apply_filters()
-            else:
-                # No active filters, just add to main display
-                if not server_found:
+            for server_data in servers:
+                # Update existing server or add new one - O(1) by (ip, qport)
+                server_found = not self.server_store.upsert(server_data)
+                
+                if server_type_filter_active:
+                    # Server type filter is active - check if this server matches
+                    server_type = server_data.get('server_type', 'community')
+                    if server_type != self.selected_server_type:
+                        continue  # Skip display if doesn't match active filter
+                
+                if filters_applied:
+                    # Only this server is re-checked against the current filters
+                    if self.filter_engine.matches(server_data):
+                        if not self.server_model.update_server(server_data):
+                            if sort_option == "Ping":
+                                self.server_model.insert_by_ping(server_data)
+                            else:
+                                self.server_model.insert_server(self.server_model.rowCount(), server_data)
+                    else:
+                        self.server_model.remove_server(server_data)
+                elif not server_found or self.server_model.row_of(server_data) < 0:
+                    # No active filters, just add to main display
                     self.add_server_to_ui(server_data)
                 else:
                     self.update_server_in_ui(server_data)
+            
+            if filters_applied:
+                self.filtered_servers = self.server_model.servers()
                     
         except Exception as e:
-            print(f"Error in real-time ping update: {e}")
+            print(f"Error applying server updates: {e}")
     
     def clear_server_list_ui(self):
         """Clear the server list UI display only"""
         try:
-            # Clear existing servers properly
-            while self.server_list_layout.count():
-                item = self.server_list_layout.takeAt(0)
-                if item and item.widget():
-                    item.widget().deleteLater()
+            self.server_model.clear()
             print("Server list UI cleared")
         except Exception as e:
             print(f"Error clearing server list UI: {e}")
@@ -829,23 +812,8 @@ class ModernDZGUI(QMainWindow):
             if ping == -1 or ping >= 999:
                 return
                 
-            # Create server card
-            server_card = self.create_server_card(server_data)
-            
             # Insert in the right position (sorted by ping)
-            inserted = False
-            for i in range(self.server_list_layout.count()):
-                widget = self.server_list_layout.itemAt(i).widget()
-                if widget and hasattr(widget, '_server_data'):
-                    widget_ping = widget._server_data.get('ping', 999)
-                    if ping < widget_ping:
-                        self.server_list_layout.insertWidget(i, server_card)
-                        inserted = True
-                        break
-            
-            if not inserted:
-                # Add at the end if not inserted elsewhere
-                self.server_list_layout.addWidget(server_card)
+            self.server_model.insert_by_ping(server_data)
                 
             print(f"➕ Added to UI: {server_data.get('name', 'Unknown')[:40]}... - {ping}ms")
             
@@ -853,79 +821,29 @@ class ModernDZGUI(QMainWindow):
             print(f"Error adding server to UI: {e}")
     
     def update_server_in_ui(self, server_data):
-        """Update an existing server in the UI"""
+        """Update an existing server in the UI (repaints only that row)"""
         try:
-            ip = server_data.get('ip')
-            qport = server_data.get('qport')
-            
-            # Find and update existing server card
-            for i in range(self.server_list_layout.count()):
-                widget = self.server_list_layout.itemAt(i).widget()
-                if (widget and hasattr(widget, '_server_data') and
-                    widget._server_data.get('ip') == ip and 
-                    widget._server_data.get('qport') == qport):
-                    
-                    # Update the widget's data and display
-                    widget._server_data = server_data
-                    self.update_server_card_display(widget, server_data)
-                    print(f"🔄 Updated in UI: {server_data.get('name', 'Unknown')[:40]}... - {server_data.get('ping', 999)}ms")
-                    break
+            if self.server_model.update_server(server_data):
+                print(f"🔄 Updated in UI: {server_data.get('name', 'Unknown')[:40]}... - {server_data.get('ping', 999)}ms")
                     
         except Exception as e:
             print(f"Error updating server in UI: {e}")
     
-    def update_server_card_display(self, widget, server_data):
-        """Update the display of an existing server card"""
-        try:
-            # Find and update ping label
-            ping = server_data.get('ping', 999)
-            players = server_data.get('players', 0)
-            max_players = server_data.get('max_players', 0)
-            
-            # Update ping display
-            ping_labels = widget.findChildren(QLabel)
-            for label in ping_labels:
-                if 'Ping:' in label.text():
-                    if ping < 999:
-                        label.setText(f"Ping: {ping}ms")
-                        # Color code ping
-                        if ping < 50:
-                            label.setStyleSheet("color: #4CAF50; font-weight: bold;")  # Green
-                        elif ping < 100:
-                            label.setStyleSheet("color: #FF9800; font-weight: bold;")  # Orange
-                        else:
-                            label.setStyleSheet("color: #F44336; font-weight: bold;")  # Red
-                    else:
-                        label.setText("Ping: ---")
-                        label.setStyleSheet("color: #9E9E9E;")
-                elif 'Players:' in label.text():
-                    label.setText(f"Players: {players}/{max_players}")
-                    
-        except Exception as e:
-            print(f"Error updating server card display: {e}")
-    
     def populate_server_list(self):
         """Populate the server list"""
-        # Clear existing servers properly
-        while self.server_list_layout.count():
-            item = self.server_list_layout.takeAt(0)
-            if item and item.widget():
-                item.widget().deleteLater()
-        
         # Use filtered servers if we have applied filters, even if the result is empty
         # This fixes the bug where empty filter results showed all servers
         if hasattr(self, 'filtered_servers') and hasattr(self, '_filters_applied') and self._filters_applied:
             servers_to_show = self.filtered_servers  # Even if empty!
+            ping_ordered = self.filter_engine.criteria.sort_option == "Ping"
+            if ping_ordered:
+                servers_to_show = sort_servers(servers_to_show, "Ping")
         else:
-            servers_to_show = self.servers
+            # Unfiltered rows stay in ping order; ping batches insert and move rows by ping
+            servers_to_show = self.server_store.sorted_by_ping()
+            ping_ordered = True
         
-        # Add server cards
-        for server in servers_to_show:
-            card = self.create_server_card(server)
-            self.server_list_layout.addWidget(card)
-        
-        # Add stretch at the end
-        self.server_list_layout.addStretch()
+        self.server_model.set_servers(servers_to_show, ping_ordered=ping_ordered)
         
         # Update status with better messaging
         if hasattr(self, '_filters_applied') and self._filters_applied:
@@ -937,16 +855,49 @@ class ModernDZGUI(QMainWindow):
             self.status_label.setText(f"{len(servers_to_show)} servers loaded")
     
     def load_servers_immediately(self):
-        """Load servers immediately on startup using BattleMetrics filtering"""
+        """Show the last known servers from the cache, revalidate in the background when stale"""
         try:
-            print("Loading servers with BattleMetrics filtering...")
-            self.status_label.setText("Loading popular servers...")
-            # Start fresh server load - no more cache checking
+            # First screen (best pings) right away, the rest of the cache on the next event loop pass
+            first_page = 300
+            cached = self.server_manager.load_cached_servers(limit=first_page)
+            if cached.servers:
+                self.servers = cached.servers
+                self.populate_server_list()
+                age_text = f"updated {age_display(cached.age)}" if cached.age is not None else "from a previous session"
+                self.status_label.setText(f"Cached servers ({age_text})")
+                print(f"⚡ Showing {len(cached.servers)} cached servers ({age_text})")
+                if len(cached.servers) == first_page:
+                    QTimer.singleShot(0, lambda: self.load_remaining_cached_servers(first_page))
+            
+            if cached.fresh:
+                print("Server cache is fresh, skipping network refresh")
+                return
+            
+            print("Revalidating servers with BattleMetrics filtering...")
+            if not cached.servers:
+                self.status_label.setText("Loading popular servers...")
             self.server_manager.refresh_servers()
         except Exception as e:
             print(f"Error loading servers: {e}")
             self.status_label.setText(f"Error loading servers: {e}")
     
+    def load_remaining_cached_servers(self, offset):
+        """Add the rest of the cached servers behind the first screen"""
+        try:
+            rest = self.server_manager.load_cached_servers(offset=offset).servers
+            # Servers already updated live (ping batches) keep their fresh data
+            new_servers = [server for server in rest if server not in self.server_store]
+            if not new_servers:
+                return
+            self.servers = self.server_store.copy() + new_servers
+            if getattr(self, '_filters_applied', False):
+                self.filter_engine.reevaluate()
+            else:
+                self.populate_server_list()
+            print(f"⚡ Loaded {len(new_servers)} more cached servers")
+        except Exception as e:
+            print(f"Error loading cached servers: {e}")
+    
     def refresh_servers(self):
         """Refresh server list using BattleMetrics API filtering"""
         try:
@@ -957,10 +908,11 @@ class ModernDZGUI(QMainWindow):
             print("Clearing server list for fresh load")
             self.servers = []
             self.filtered_servers = []
+            self.ping_batcher.clear()
             self.clear_server_list_ui()
             
-            # Use BattleMetrics filtering
-            self.server_manager.refresh_servers()
+            # Use BattleMetrics filtering (explicit refresh bypasses the result cache)
+            self.server_manager.refresh_servers(force=True)
             
         except Exception as e:
             self.status_label.setText(f"Error: {str(e)}")
@@ -975,10 +927,11 @@ class ModernDZGUI(QMainWindow):
             # Always clear for manual refresh
             self.servers = []
             self.filtered_servers = []
+            self.ping_batcher.clear()
             self.clear_server_list_ui()
             
             # Force refresh with BattleMetrics filtering
-            self.server_manager.refresh_servers()
+            self.server_manager.refresh_servers(force=True)
             
         except Exception as e:
             self.status_label.setText(f"Error: {str(e)}")
@@ -1106,7 +1059,46 @@ class ModernDZGUI(QMainWindow):
         
         # Update displays
         self.update_favorites_display()
-        self.populate_server_list()  # Refresh server list to update star icons
+        self.server_model.refresh_favorites()  # Repaint star icons
+        self.ping_priority_timer.start()
+    
+    def update_ping_priorities(self):
+        """Tell the ping scheduler which servers are on screen and which are favorites"""
+        def ping_key(server):
+            qport = str(server.get('qport', ''))
+            return (server.get('ip') or '', int(qport) if qport.isdigit() else 0)
+        
+        try:
+            viewport = self.server_view.viewport().rect()
+            first = max(self.server_view.indexAt(viewport.topLeft()).row(), 0)
+            last = self.server_view.indexAt(viewport.bottomLeft()).row()
+            if last < 0:
+                last = self.server_model.rowCount() - 1
+            visible_servers = [self.server_model.server_at(row) for row in range(first, last + 1)]
+            visible = [ping_key(server) for server in visible_servers]
+            
+            favorite_ids = {fav.get('id') for fav in self.favorites}
+            favorites = [ping_key(server) for server in self.server_store
+                         if f"{server.get('name')}_{server.get('ip', 'unknown')}" in favorite_ids]
+            
+            self.server_manager.set_ping_priorities(visible, favorites)
+            self.prefetch_server_mods(visible_servers)
+        except Exception as e:
+            print(f"Error updating ping priorities: {e}")
+    
+    def prefetch_server_mods(self, servers):
+        """Look up required mods (and their Workshop titles) of hovered/visible servers ahead of Connect"""
+        server_mods = self.mod_manager.server_mods
+        keys = []
+        for server in servers:
+            qport = str((server or {}).get('qport', ''))
+            if not server or not server.get('ip') or not qport.isdigit():
+                continue
+            if server_mods.cached(server['ip'], int(qport)) is None:
+                server_mods.seed(server['ip'], int(qport), server.get('mods'))
+            keys.append((server['ip'], int(qport)))
+        if keys:
+            get_async_runtime().submit(server_mods.prefetch(keys))
     
     def filter_servers(self):
         """Filter servers based on search input (now integrated with apply_filters)"""
@@ -1248,184 +1240,71 @@ class ModernDZGUI(QMainWindow):
         self.apply_filters()
     
     def apply_filters(self):
-        """Apply filters using BattleMetrics API or client-side for ping/sorting only"""
-        # Get current filter values
-        search_text = self.search_input.text().lower().strip()
-        ping_filter = self.ping_filter.currentText() if hasattr(self, 'ping_filter') else "All"
-        map_filter = self.map_filter.currentText() if hasattr(self, 'map_filter') else "All"
-        status_filter = self.status_filter.currentText() if hasattr(self, 'status_filter') else "All"
-        sort_option = self.sort_filter.currentText() if hasattr(self, 'sort_filter') else "Ping"
-        
-        # For some filters, we need to refetch from BattleMetrics API
-        api_filters_needed = (search_text or map_filter != "All")
-        
-        if api_filters_needed:
-            # Use BattleMetrics API filtering for search and map
-            self.apply_battlemetrics_filters()
-            return
-        
-        # For ping and player count filtering, we can filter client-side since we have the data
-        if not self.servers:
-            return
-        
-        # Check sidebar checkboxes
-        sidebar_filters_active = False
+        """Queue a local filter pass (debounced; BattleMetrics is only hit in the background)"""
+        self.filter_engine.request(self.current_filter_criteria())
+    
+    def current_filter_criteria(self) -> FilterCriteria:
+        """Snapshot the filter bar, search box and sidebar checkboxes"""
+        criteria = {
+            'search': self.search_input.text().lower().strip() if hasattr(self, 'search_input') else "",
+            'map_filter': self.map_filter.currentText() if hasattr(self, 'map_filter') else "All",
+            'ping_filter': self.ping_filter.currentText() if hasattr(self, 'ping_filter') else "All",
+            'status_filter': self.status_filter.currentText() if hasattr(self, 'status_filter') else "All",
+            'sort_option': self.sort_filter.currentText() if hasattr(self, 'sort_filter') else "Ping",
+        }
         if hasattr(self, 'filters'):
-            sidebar_filters_active = (
-                not self.filters.get("Show Empty", QCheckBox()).isChecked() or
-                not self.filters.get("Show Full", QCheckBox()).isChecked() or
-                not self.filters.get("Show Modded", QCheckBox()).isChecked() or
-                self.filters.get("1PP Only", QCheckBox()).isChecked() or
-                self.filters.get("3PP Only", QCheckBox()).isChecked()
+            criteria.update(
+                show_empty=self.filters["Show Empty"].isChecked(),
+                show_full=self.filters["Show Full"].isChecked(),
+                show_modded=self.filters["Show Modded"].isChecked(),
+                only_1pp=self.filters["1PP Only"].isChecked(),
+                only_3pp=self.filters["3PP Only"].isChecked(),
             )
-        
-        filters_active = (ping_filter != "All" or 
-                         status_filter != "All" or
-                         sidebar_filters_active)
-        
-        self._filters_applied = filters_active
-        
-        # Start with all servers
-        filtered_servers = self.servers.copy()
-        
-        # Apply client-side filters (ping, player count, sidebar filters)
-        filtered_servers = self.apply_client_side_filters(filtered_servers, ping_filter, status_filter)
-        
-        # Apply sorting
-        filtered_servers = self.apply_sorting(filtered_servers, sort_option)
-        
-        # Store and display
-        self.filtered_servers = filtered_servers
-        self.display_servers(filtered_servers)
+        return FilterCriteria(**criteria)
     
-    def apply_battlemetrics_filters(self):
-        """Apply filters using BattleMetrics API for search and map"""
-        # Get current filter values
-        search_text = self.search_input.text().lower().strip()
-        map_filter = self.map_filter.currentText() if hasattr(self, 'map_filter') else "All"
-        
-        # Map UI filter names to BattleMetrics API concepts
-        search_term = search_text if search_text else None
-        
-        # Convert map filter
-        region = None
-        if map_filter == "Chernarus":
-            # BattleMetrics doesn't have map filters, but we can search for it
-            search_term = "chernarus" if not search_term else f"{search_term} chernarus"
-        elif map_filter == "Livonia":
-            search_term = "livonia" if not search_term else f"{search_term} livonia"
-        elif map_filter == "Namalsk":
-            search_term = "namalsk" if not search_term else f"{search_term} namalsk"
+    def on_filter_results(self, servers, criteria):
+        """Show the result of a local filter pass"""
+        self._filters_applied = not criteria.is_default
+        self.filtered_servers = servers
+        self.display_servers(servers)
+    
+    def on_servers_changed(self, changeset):
+        """A refresh finished: apply its added/changed/removed servers to the store and the list"""
+        for ip, query_port in changeset.removed:
+            server_data = self.server_store.remove((ip, str(query_port)))
+            if server_data is not None:
+                self.server_model.remove_server(server_data)
+        updates = [self.refreshed_server(record.to_dict()) for record in changeset.added + changeset.changed]
+        if updates:
+            self.apply_server_updates(updates)
+        if changeset.has_changes:
+            print(f"🧮 Applied refresh changeset to the list: {changeset.summary()}")
+    
+    def refreshed_server(self, server_data):
+        """Refreshed server dict (no cached_at); a measured ping survives BattleMetrics' placeholder"""
+        server_data = dict(server_data)
+        server_data.pop('cached_at', None)
+        known = self.server_store.get((server_data['ip'], server_data['qport']))
+        if server_data.get('ping', -1) < 0 and known is not None:
+            server_data['ping'] = known.get('ping', -1)
+        return server_data
+    
+    def apply_battlemetrics_filters(self, criteria):
+        """Refresh the cached servers for a filter set from the BattleMetrics API"""
+        search_term = criteria.api_params()
         
-        print(f"🎯 Applying BattleMetrics filters: search='{search_term}', region='{region}'")
-        self.status_label.setText("Applying filters via BattleMetrics API...")
+        print(f"🎯 Background BattleMetrics refresh: search='{search_term}'")
         
-        # Trigger fresh server fetch with filters
-        self.server_manager.refresh_servers(
-            search_term=search_term,
-            region=region
-        )
-    
-    def apply_client_side_filters(self, servers, ping_filter, status_filter):
-        """Apply client-side filters for ping and player count"""
-        filtered = servers
-        
-        # Apply ping filter
-        if ping_filter != "All":
-            ping_filtered = []
-            for server in filtered:
-                ping = server.get('ping', -1)
-                if ping_filter == "< 50ms" and 0 <= ping < 50:
-                    ping_filtered.append(server)
-                elif ping_filter == "< 100ms" and 0 <= ping < 100:
-                    ping_filtered.append(server)
-                elif ping_filter == "< 200ms" and 0 <= ping < 200:
-                    ping_filtered.append(server)
-                elif ping_filter == "> 200ms" and ping >= 200 and ping < 999:
-                    ping_filtered.append(server)
-                elif ping_filter == "Offline" and ping >= 999:
-                    ping_filtered.append(server)
-            filtered = ping_filtered
-        
-        # Apply status filter (player count)
-        if status_filter != "All":
-            status_filtered = []
-            for server in filtered:
-                players = server.get('players', 0)
-                max_players = server.get('max_players', 1)
-                percentage = (players / max_players * 100) if max_players > 0 else 0
-                
-                if status_filter == "Empty" and players == 0:
-                    status_filtered.append(server)
-                elif status_filter == "Low (1-25%)" and 0 < percentage <= 25:
-                    status_filtered.append(server)
-                elif status_filter == "Medium (25-75%)" and 25 < percentage <= 75:
-                    status_filtered.append(server)
-                elif status_filter == "High (75-99%)" and 75 < percentage < 100:
-                    status_filtered.append(server)
-                elif status_filter == "Full" and percentage >= 100:
-                    status_filtered.append(server)
-            filtered = status_filtered
-        
-        # Apply sidebar checkbox filters
-        if hasattr(self, 'filters'):
-            sidebar_filtered = []
-            for server in filtered:
-                # Show Empty filter
-                if not self.filters["Show Empty"].isChecked() and server.get('players', 0) == 0:
-                    continue
-                
-                # Show Full filter
-                if not self.filters["Show Full"].isChecked():
-                    players = server.get('players', 0)
-                    max_players = server.get('max_players', 1)
-                    if players >= max_players and max_players > 0:
-                        continue
-                
-                # Show Modded filter (simplified heuristic)
-                if not self.filters["Show Modded"].isChecked():
-                    server_name = server.get('name', '').lower()
-                    if any(keyword in server_name for keyword in ['mod', 'trader', 'loot+', 'custom']):
-                        continue
-                
-                # 1PP Only filter
-                if self.filters["1PP Only"].isChecked():
-                    perspective = server.get('perspective', '').lower()
-                    if '1pp' not in perspective or '3pp' in perspective:
-                        continue
-                
-                # 3PP Only filter
-                if self.filters["3PP Only"].isChecked():
-                    perspective = server.get('perspective', '').lower()  
-                    if '3pp' not in perspective:
-                        continue
-                
-                sidebar_filtered.append(server)
-            filtered = sidebar_filtered
-        
-        return filtered
-    
-    def apply_sorting(self, servers, sort_option):
-        """Apply sorting to server list"""
-        if sort_option == "Name":
-            return sorted(servers, key=lambda s: s.get('name', '').lower())
-        elif sort_option == "Players":
-            return sorted(servers, key=lambda s: s.get('players', 0), reverse=True)
-        elif sort_option == "Ping":
-            return sorted(servers, key=lambda s: s.get('ping', 999))
-        elif sort_option == "Map":
-            return sorted(servers, key=lambda s: s.get('map', '').lower())
-        else:
-            return servers
+        # Runs beside the main refresh; results land in the database and the store, and
+        # on_servers_changed re-filters them
+        self.server_manager.refresh_search(search_term)
     
     def display_servers(self, servers):
         """Display filtered servers in the UI"""
-        # Clear existing servers
-        self.clear_server_list_ui()
-        
-        # Add filtered servers
-        for server in servers:
-            self.add_server_to_ui(server)
+        # Servers without a valid ping (not -1 or 999) are not shown, like add_server_to_ui
+        self.server_model.set_servers([server for server in servers
+                                       if server.get('ping', 999) != -1 and server.get('ping', 999) < 999],
+                                      ping_ordered=self.filter_engine.criteria.sort_option == "Ping")
         
         # Update status
         total_count = len(self.servers)
@@ -1442,34 +1321,14 @@ class ModernDZGUI(QMainWindow):
         try:
             print("🔄 Application closing, cleaning up...")
             
-            # Stop server refresh thread
-            if hasattr(self.server_manager, 'refresh_thread') and self.server_manager.refresh_thread:
-                if self.server_manager.refresh_thread.isRunning():
-                    print("🛑 Stopping refresh thread...")
-                    self.server_manager.refresh_thread.terminate()
-                    if not self.server_manager.refresh_thread.wait(3000):  # Wait 3 seconds
-                        print("⚠️ Thread did not stop gracefully, forcing...")
-                        
-            # Close BattleMetrics API session
-            try:
-                import asyncio
-                from battlemetrics_api import close_battlemetrics_api
-                
-                # Try to close API session
-                loop = None
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop and loop.is_running():
-                        # Schedule cleanup task
-                        asyncio.create_task(close_battlemetrics_api())
-                except Exception:
-                    # Create new loop if needed
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    loop.run_until_complete(close_battlemetrics_api())
-                    loop.close()
-            except Exception as e:
-                print(f"Error closing API session: {e}")
+            # Cancel in-flight network work, close sessions/sockets and stop the async runtime
+            shutdown_async_runtime()
+            
+            # Drop queued mod sizing jobs
+            self.mod_manager.sizes.shutdown()
+            
+            # Commit queued ping updates and stop the database writer
+            self.server_manager.database.close()
             
             print("✅ Cleanup completed")
             
@@ -1570,33 +1429,66 @@ class ModernDZGUI(QMainWindow):
         
         print(f"Showing all servers: {len(self.servers)} total")
     
-    async def connect_to_server_async(self, server_data):
+    async def resolve_server_mods_async(self, server_ip: str, server_port: int):
+        """Detect required mods and fetch names of missing ones (runs on the async runtime)
+        
+        Both usually come from caches filled by the hover/visibility prefetch.
+        """
+        required_mod_ids = await self.mod_manager.server_mods.get(server_ip, server_port)
+        if not required_mod_ids:
+            return [], [], [], {}
+        
+        loop = asyncio.get_running_loop()
+        missing_mods, available_mods = await loop.run_in_executor(
+            None, self.mod_manager.check_missing_mods, required_mod_ids)
+        
+        mod_info = {}
+        if missing_mods:
+            mod_info = await self.mod_manager.get_mod_info_from_steam(missing_mods)
+        
+        return required_mod_ids, missing_mods, available_mods, mod_info
+    
+    def connect_to_server(self, server_data):
         """Connect to DayZ server with mod detection and management"""
         try:
             server_ip = server_data.get('ip', '')
             server_port = int(server_data.get('qport', '27016'))
-            server_name = server_data.get('name', 'Unknown Server')
             
             if not server_ip or server_ip == '127.0.0.1':
                 self.status_label.setText("Cannot connect to this server (invalid IP)")
                 return
             
-            # Step 1: Detect required mods
+            # A new connect replaces one still waiting for mod downloads
+            self.pending_connect = None
+            
+            # Step 1: Detect required mods without blocking the UI (BattleMetrics data needs no request)
+            if self.mod_manager.server_mods.cached(server_ip, server_port) is None:
+                self.mod_manager.server_mods.seed(server_ip, server_port, server_data.get('mods'))
             self.status_label.setText("Detecting required mods...")
             self.status_label.setStyleSheet("color: #FFD700;")
             
-            required_mod_ids = await self.mod_manager.get_server_mods(server_ip, server_port)
+            handle = get_async_runtime().submit_qt(self.resolve_server_mods_async(server_ip, server_port), self)
+            handle.finished.connect(lambda result: self.on_server_mods_resolved(server_data, result))
+            handle.failed.connect(self.on_connect_error)
+            
+        except Exception as e:
+            self.on_connect_error(str(e))
+    
+    def on_server_mods_resolved(self, server_data, result):
+        """Launch or ask for missing mods once mod detection has finished"""
+        try:
+            server_ip = server_data.get('ip', '')
+            server_port = int(server_data.get('qport', '27016'))
+            server_name = server_data.get('name', 'Unknown Server')
+            required_mod_ids, missing_mods, available_mods, mod_info = result
             
             if required_mod_ids:
                 print(f"Server requires {len(required_mod_ids)} mods: {required_mod_ids}")
                 
                 # Step 2: Check missing mods
-                missing_mods, available_mods = self.mod_manager.check_missing_mods(required_mod_ids)
-                
                 if missing_mods:
                     # Show mod installation dialog
-                    await self.show_mod_installation_dialog(server_data, missing_mods, available_mods)
-                    return
+                    self.show_mod_installation_dialog(server_data, missing_mods, available_mods, mod_info)
                 else:
                     # All mods available, launch with mods
                     self.launch_dayz_with_mods(server_ip, server_port, server_name, required_mod_ids)
@@ -1606,22 +1498,13 @@ class ModernDZGUI(QMainWindow):
                 self.launch_dayz_with_mods(server_ip, server_port, server_name, [])
                 
         except Exception as e:
-            print(f"Error connecting to server: {e}")
-            self.status_label.setText(f"Connection error: {str(e)}")
-            self.status_label.setStyleSheet("color: #F44336;")
+            self.on_connect_error(str(e))
     
-    def connect_to_server(self, server_data):
-        """Connect to DayZ server (wrapper for async function)"""
-        import asyncio
-        
-        # Create async task
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            loop.run_until_complete(self.connect_to_server_async(server_data))
-        finally:
-            loop.close()
+    def on_connect_error(self, error: str):
+        """Report a failed connection attempt"""
+        print(f"Error connecting to server: {error}")
+        self.status_label.setText(f"Connection error: {error}")
+        self.status_label.setStyleSheet("color: #F44336;")
     
     def launch_dayz_with_mods(self, server_ip: str, server_port: str, server_name: str, mod_ids: list):
         """Launch DayZ with specified mods using Steam launch options"""
@@ -2139,17 +2022,21 @@ Bohemia/Steam disabled direct connection protocols in 2024.<br><br>
             self.status_label.setStyleSheet("color: #F44336;")
     
     def refresh_mods(self):
-        """Refresh the mod list"""
+        """Refresh the mod list (disk scan and Steam names run on the async runtime)"""
+        handle = get_async_runtime().submit_qt(self.mod_manager.get_installed_mods_async(), self)
+        handle.finished.connect(self.on_installed_mods_loaded)
+        handle.failed.connect(lambda error: print(f"Error refreshing mods: {error}"))
+    
+    def on_installed_mods_loaded(self, installed_mods):
+        """Populate the mod list with scanned mods"""
         try:
             # Clear existing mod list
+            self.mod_size_labels = {}
             for i in reversed(range(self.mod_list_layout.count())):
                 child = self.mod_list_layout.itemAt(i).widget()
                 if child:
                     child.deleteLater()
             
-            # Get installed mods
-            installed_mods = self.mod_manager.get_installed_mods()
-            
             if not installed_mods:
                 no_mods_label = QLabel("No mods found. Subscribe to mods on Steam Workshop first.")
                 no_mods_label.setStyleSheet("color: #b8b8b8; font-size: 12px; padding: 20px;")
@@ -2164,12 +2051,15 @@ Bohemia/Steam disabled direct connection protocols in 2024.<br><br>
                     self.mod_list_layout.addWidget(mod_card)
             
             # Update statistics
-            self.update_mod_stats()
+            self.update_mod_stats(installed_mods)
+            
+            # Newly scanned mod folders get watched for updates
+            self.mod_watcher.watch_paths()
             
         except Exception as e:
             print(f"Error refreshing mods: {e}")
     
-    def update_mod_stats(self):
+    def update_mod_stats(self, installed_mods=None):
         """Update mod statistics display"""
         # Clear existing stats
         for i in reversed(range(self.mod_stats_layout.count())):
@@ -2178,17 +2068,16 @@ Bohemia/Steam disabled direct connection protocols in 2024.<br><br>
                 child.deleteLater()
         
         try:
-            installed_mods = self.mod_manager.get_installed_mods()
+            if installed_mods is None:
+                installed_mods = self.mod_manager.installed_mods()
             
             # Calculate statistics
             total_mods = len(installed_mods)
-            total_size_mb = sum(mod.size_mb for mod in installed_mods)
-            total_size_gb = round(total_size_mb / 1024, 2)
             
             # Create stat labels
             stats = [
                 ("Total Mods:", str(total_mods)),
-                ("Total Size:", f"{total_size_gb} GB"),
+                ("Total Size:", self.mod_total_size_text(installed_mods)),
                 ("Workshop Path:", str(self.mod_manager.workshop_path.name))
             ]
             
@@ -2202,6 +2091,8 @@ Bohemia/Steam disabled direct connection protocols in 2024.<br><br>
                 
                 value = QLabel(value_text)
                 value.setStyleSheet("color: #e8e8e8; font-size: 11px; font-weight: bold;")
+                if label_text == "Total Size:":
+                    self.mod_total_size_label = value  # updated as background sizes arrive
                 
                 stat_layout.addWidget(label)
                 stat_layout.addWidget(value)
@@ -2212,6 +2103,20 @@ Bohemia/Steam disabled direct connection protocols in 2024.<br><br>
         except Exception as e:
             print(f"Error updating mod stats: {e}")
     
+    def mod_total_size_text(self, installed_mods):
+        """Total size of installed mods, marked while some sizes are still being computed"""
+        total_size_gb = round(sum(mod.size_mb for mod in installed_mods) / 1024, 2)
+        pending = any(mod.size_pending for mod in installed_mods)
+        return f"{total_size_gb} GB" + (" (sizing...)" if pending else "")
+    
+    def on_mod_size_ready(self, workshop_id, size_mb):
+        """A background folder size finished: update its card and the total"""
+        size_label = self.mod_size_labels.get(workshop_id)
+        if size_label is not None:
+            size_label.setText(f"{size_mb} MB")
+        if hasattr(self, 'mod_total_size_label'):
+            self.mod_total_size_label.setText(self.mod_total_size_text(self.mod_manager.installed_mods()))
+    
     def create_mod_card(self, mod_info):
         """Create a mod card widget"""
         card = QFrame()
@@ -2252,9 +2157,10 @@ Bohemia/Steam disabled direct connection protocols in 2024.<br><br>
         # Mod details
         details_layout = QHBoxLayout()
         
-        size_label = QLabel(f"{mod_info.size_mb} MB")
+        size_label = QLabel("Sizing..." if mod_info.size_pending else f"{mod_info.size_mb} MB")
         size_label.setStyleSheet("color: #b8b8b8; font-size: 10px;")
         details_layout.addWidget(size_label)
+        self.mod_size_labels[mod_info.workshop_id] = size_label
         
         # Status
         status_label = QLabel("✓ Installed" if mod_info.installed else "✗ Missing")
@@ -2327,7 +2233,7 @@ Bohemia/Steam disabled direct connection protocols in 2024.<br><br>
                 self.status_label.setText(f"Error removing mod: {e}")
                 self.status_label.setStyleSheet("color: #F44336;")
     
-    async def show_mod_installation_dialog(self, server_data, missing_mod_ids: list, available_mod_ids: list):
+    def show_mod_installation_dialog(self, server_data, missing_mod_ids: list, available_mod_ids: list, mod_info: dict = None):
         """Show dialog for installing missing mods"""
         from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QScrollArea
         
@@ -2371,8 +2277,7 @@ Bohemia/Steam disabled direct connection protocols in 2024.<br><br>
         layout.addWidget(status_label)
         
         if missing_mod_ids:
-            # Get mod info for missing mods
-            mod_info = await self.mod_manager.get_mod_info_from_steam(missing_mod_ids)
+            mod_info = mod_info or {}
             
             # Instructions
             instructions = QLabel("❗ Missing mods must be subscribed on Steam Workshop:")
@@ -2440,6 +2345,11 @@ Bohemia/Steam disabled direct connection protocols in 2024.<br><br>
         for mod_id in missing_mod_ids:
             self.open_workshop_page(mod_id)
         
+        # The workshop watcher resumes the connection once every missing mod is installed
+        self.pending_connect = (server_data, set(missing_mod_ids))
+        self.status_label.setText(f"Waiting for {len(missing_mod_ids)} mods to download...")
+        self.status_label.setStyleSheet("color: #FFD700;")
+        
         # Show instructions
         from PySide6.QtWidgets import QMessageBox
         msg = QMessageBox(self)
@@ -2448,12 +2358,38 @@ Bohemia/Steam disabled direct connection protocols in 2024.<br><br>
 <b>Steam Workshop pages opened!</b><br><br>
 <b>Next steps:</b><br>
 1. Subscribe to the required mods<br>
-2. Wait for mods to download<br>
-3. Click 'Connect' on the server again<br><br>
-<i>DayZConnect will automatically detect the installed mods.</i>
+2. Wait for mods to download<br><br>
+<i>DayZConnect connects automatically once all mods are installed.</i>
         """)
         msg.setTextFormat(Qt.RichText)
-        msg.exec()
+        msg.open()
+    
+    def workshop_titles(self, mod_ids):
+        """Cached workshop titles for a server tooltip; unknown or stale IDs are fetched in the background"""
+        workshop_meta = self.mod_manager.workshop_meta
+        titles = {mod_id: workshop_meta.title(mod_id) for mod_id in mod_ids if workshop_meta.title(mod_id)}
+        stale = [mod_id for mod_id in mod_ids if not workshop_meta.is_fresh(mod_id)]
+        if stale:
+            get_async_runtime().submit(workshop_meta.get(stale))
+        return titles
+    
+    def on_workshop_changed(self, added, updated, removed):
+        """Mods were added, updated or removed by Steam: refresh the list, resume a waiting connect"""
+        self.on_installed_mods_loaded(self.mod_manager.installed_mods())
+        
+        if self.pending_connect is None:
+            return
+        server_data, missing_mod_ids = self.pending_connect
+        still_missing = missing_mod_ids - self.mod_manager.mod_index.installed_ids()
+        if still_missing:
+            installed = len(missing_mod_ids) - len(still_missing)
+            self.status_label.setText(f"Waiting for mods to download ({installed}/{len(missing_mod_ids)} installed)...")
+            return
+        
+        print(f"🧩 All {len(missing_mod_ids)} missing mods installed, resuming connection")
+        self.pending_connect = None
+        self.status_label.setText("Required mods installed, connecting...")
+        self.connect_to_server(server_data)
     
     def proceed_with_connection(self, dialog, server_data, mod_ids):
         """Proceed with server connection using available mods"""
@@ -2474,7 +2410,7 @@ Bohemia/Steam disabled direct connection protocols in 2024.<br><br>
         
         if mod_ids and len(mod_ids) <= 5:
             # Show mod list if not too many
-            installed_mods = self.mod_manager.get_installed_mods()
+            installed_mods = self.mod_manager.installed_mods()
             mod_dict = {mod.workshop_id: mod.name for mod in installed_mods}
             
             mod_list = "<br><b>Mods loaded:</b><br>"
@@ -2550,12 +2486,9 @@ def main():
         print("Interrupted by user")
         return 0
     finally:
-        # Clean up any running threads
+        # Stop the async runtime if the window did not already
         try:
-            if hasattr(window.server_manager, 'refresh_thread'):
-                if window.server_manager.refresh_thread.isRunning():
-                    window.server_manager.refresh_thread.terminate()
-                    window.server_manager.refresh_thread.wait(1000)
+            shutdown_async_runtime()
         except:
             pass
 
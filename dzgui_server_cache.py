@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+DZGUI Server Cache - Stale-while-revalidate layer over the server database
+The last known server list is shown instantly from SQLite; a background refresh
+only runs when the filter set's cached result is older than its TTL
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from dzgui_database import DZServerDatabase
+
+FilterKey = Tuple[Optional[str], Optional[str], Optional[str]]  # (server_type, region, search_term)
+
+
+@dataclass
+class CachedServers:
+    """Result of a cache lookup"""
+    servers: List[Dict] = field(default_factory=list)
+    fetched_at: Optional[float] = None  # last completed refresh of this filter set, None if never
+    fresh: bool = False
+
+    @property
+    def age(self) -> Optional[float]:
+        return time.time() - self.fetched_at if self.fetched_at else None
+
+
+class ServerCache:
+    """Per-filter-set refresh bookkeeping (cache_meta table) on top of DZServerDatabase
+
+    Eviction follows the database cleanup rules: servers not seen for
+    offline_cleanup_hours drop out of the cached list, and rows (and
+    cache_meta entries) older than delete_cleanup_hours are deleted.
+    """
+
+    def __init__(self, database: DZServerDatabase, default_ttl: float = 15 * 60):
+        self.database = database
+        self.default_ttl = default_ttl
+        self.ttls: Dict[FilterKey, float] = {}
+        self.database.writer.execute(lambda conn: conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_meta (
+                filter_key TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL,
+                server_count INTEGER NOT NULL DEFAULT 0
+            )
+        """))
+
+    @staticmethod
+    def _meta_key(key: FilterKey) -> str:
+        return "|".join(part or "" for part in key)
+
+    def set_ttl(self, ttl: float, server_type: str = None, region: str = None, search_term: str = None):
+        """Override the TTL of one filter set"""
+        self.ttls[(server_type, region, search_term)] = ttl
+
+    def ttl_for(self, key: FilterKey) -> float:
+        return self.ttls.get(key, self.default_ttl)
+
+    def fetched_at(self, key: FilterKey) -> Optional[float]:
+        """When the filter set was last refreshed from the network"""
+        row = self.database._read_conn().execute(
+            "SELECT fetched_at FROM cache_meta WHERE filter_key = ?", (self._meta_key(key),)
+        ).fetchone()
+        return row['fetched_at'] if row else None
+
+    def is_fresh(self, key: FilterKey, fetched_at: Optional[float] = None) -> bool:
+        fetched_at = fetched_at if fetched_at is not None else self.fetched_at(key)
+        return fetched_at is not None and time.time() - fetched_at < self.ttl_for(key)
+
+    def load(self, server_type: str = None, region: str = None, search_term: str = None,
+             limit: int = -1, offset: int = 0) -> CachedServers:
+        """Last known servers of a filter set, each marked with 'cached_at' (its last_seen)
+
+        limit/offset page through the list by ping, so the first screen can be
+        shown before the rest is read.
+        """
+        key = (server_type, region, search_term)
+        if search_term:
+            end = offset + limit if limit >= 0 else None
+            servers = self.database.search_servers(search_term, server_type)[offset:end]
+        else:
+            servers = self.database.get_cached_servers(server_type, limit, offset)
+        for server_data in servers:
+            server_data['cached_at'] = server_data.get('last_seen')
+
+        fetched_at = self.fetched_at(key)
+        return CachedServers(servers=servers, fetched_at=fetched_at, fresh=self.is_fresh(key, fetched_at))
+
+    def mark_fetched(self, server_count: int, server_type: str = None, region: str = None, search_term: str = None):
+        """Record a completed network refresh of a filter set"""
+        meta_key = self._meta_key((server_type, region, search_term))
+        self.database.writer.execute(lambda conn: conn.execute("""
+            INSERT INTO cache_meta (filter_key, fetched_at, server_count) VALUES (?, ?, ?)
+            ON CONFLICT(filter_key) DO UPDATE SET
+                fetched_at = excluded.fetched_at,
+                server_count = excluded.server_count
+        """, (meta_key, time.time(), server_count)), wait=False)
+
+    def evict(self):
+        """Apply the database cleanup rules and drop expired cache_meta entries"""
+        self.database.cleanup_old_servers()
+        self._evict_meta()
+
+    async def evict_async(self):
+        """evict() for coroutines on the async runtime"""
+        await self.database.cleanup_old_servers_async()
+        self._evict_meta()
+
+    def _evict_meta(self):
+        delete_cutoff = time.time() - self.database.delete_cleanup_hours * 3600
+        self.database.writer.execute(lambda conn: conn.execute(
+            "DELETE FROM cache_meta WHERE fetched_at < ?", (delete_cutoff,)
+        ), wait=False)
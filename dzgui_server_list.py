@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+DZGUI Server List - Model/view server list
+Paints card-style rows with a delegate so only visible servers cost anything
+"""
+
+import json
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import (Qt, QAbstractListModel, QModelIndex, QObject, QRect, QRectF,
+                            QSize, QEvent, QTimer, Signal)
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPen, QCursor
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle, QToolTip
+
+from dzgui_metrics import get_metrics
+from dzgui_server_store import server_key
+
+CARD_HEIGHT = 100
+CARD_SPACING = 8
+
+ServerRole = Qt.UserRole + 1     # full server dict
+FavoriteRole = Qt.UserRole + 2   # bool
+
+
+def ping_display(ping: int) -> Tuple[str, str]:
+    """Ping text and color for a server card"""
+    if ping == -1:
+        return "Pinging...", "#b8b8b8"
+    if ping >= 999:
+        return "Offline", "#F44336"  # Red
+    if ping < 50:
+        return f"{ping}ms", "#4CAF50"  # Green - Excellent
+    if ping < 100:
+        return f"{ping}ms", "#8BC34A"  # Light Green - Good
+    if ping < 200:
+        return f"{ping}ms", "#FF9800"  # Orange - Acceptable
+    return f"{ping}ms", "#F44336"  # Red - Poor
+
+
+def age_display(seconds: float) -> str:
+    """Short human age ("just now", "12m ago", "3h ago")"""
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m ago"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}h ago"
+    return f"{int(seconds // 86400)}d ago"
+
+
+@lru_cache(maxsize=4096)
+def _mods_summary(mods_str: str) -> Tuple[str, str, str]:
+    try:
+        mods_list = json.loads(mods_str) if mods_str != '[]' else []
+    except (TypeError, ValueError):
+        return "❓ Mods", "#9E9E9E", "Mod information not available"
+
+    if not mods_list:
+        return "✅ Vanilla", "#4CAF50", "This server uses no mods (vanilla DayZ)"
+
+    mod_count = len(mods_list)
+    tooltip_lines = [f"This server uses {mod_count} mods:"]
+    for mod in mods_list[:10]:  # Show first 10 mods
+        if isinstance(mod, dict):
+            mod_name = mod.get('name', f"Mod {mod.get('id', 'Unknown')}")
+            tooltip_lines.append(f"• {mod_name} ({mod.get('id', '')})")
+        else:
+            # Old format - just ID
+            tooltip_lines.append(f"• Mod {mod}")
+    if mod_count > 10:
+        tooltip_lines.append(f"... and {mod_count - 10} more")
+
+    return f"🔧 {mod_count} mod{'s' if mod_count != 1 else ''}", "#ff9800", '\n'.join(tooltip_lines)
+
+
+def mods_display(mods) -> Tuple[str, str, str]:
+    """Mod label text, color and tooltip for a server card (parsed once per distinct mods string)"""
+    if isinstance(mods, list):
+        mods = json.dumps(mods)
+    elif not isinstance(mods, str):
+        mods = '[]'
+    return _mods_summary(mods)
+
+
+def mods_tooltip(mods, mod_titles: Callable[[List[str]], Dict[str, str]] = None) -> str:
+    """Mod list tooltip; IDs without a name in the server data are named from mod_titles"""
+    if mod_titles is None:
+        return mods_display(mods)[2]
+    try:
+        mods_list = json.loads(mods) if isinstance(mods, str) else list(mods or [])
+    except (TypeError, ValueError):
+        mods_list = []
+    if not mods_list:
+        return mods_display(mods)[2]
+
+    mod_ids = [str(mod.get('id', '')) if isinstance(mod, dict) else str(mod) for mod in mods_list]
+    titles = mod_titles(mod_ids)
+    tooltip_lines = [f"This server uses {len(mods_list)} mods:"]
+    for mod, mod_id in zip(mods_list[:10], mod_ids):  # Show first 10 mods
+        mod_name = mod.get('name') if isinstance(mod, dict) else None
+        if not mod_name or mod_name == f"Mod {mod_id}":
+            mod_name = titles.get(mod_id) or f"Mod {mod_id}"
+        tooltip_lines.append(f"• {mod_name} ({mod_id})")
+    if len(mods_list) > 10:
+        tooltip_lines.append(f"... and {len(mods_list) - 10} more")
+    return '\n'.join(tooltip_lines)
+
+
+class PingUpdateBatcher(QObject):
+    """Coalesces serverPingUpdated signals into one UI batch per interval
+
+    The latest update per (ip, qport) wins; batchReady fires at most once
+    every `interval_ms` with the buffered servers.
+    """
+
+    batchReady = Signal(list)
+
+    def __init__(self, interval_ms: int = 80, parent=None):
+        super().__init__(parent)
+        self._pending: Dict[Tuple[str, str], Dict] = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def add(self, server_data: Dict):
+        self._pending[server_key(server_data)] = server_data
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """Emit everything buffered so far"""
+        self._timer.stop()
+        if self._pending:
+            batch, self._pending = list(self._pending.values()), {}
+            self.batchReady.emit(batch)
+
+    def clear(self):
+        self._timer.stop()
+        self._pending.clear()
+
+
+class ServerListModel(QAbstractListModel):
+    """List model over server dicts, with row-level updates"""
+
+    def __init__(self, is_favorite: Callable[[Dict], bool] = None, parent=None,
+                 mod_titles: Callable[[List[str]], Dict[str, str]] = None):
+        super().__init__(parent)
+        self.is_favorite = is_favorite or (lambda server_data: False)
+        self.mod_titles = mod_titles  # workshop titles for mods the server data only lists by ID
+        self._servers: List[Dict] = []
+        self._row_by_key: Dict[Tuple[str, str], int] = {}
+        self._row_keys: List[Tuple[str, str]] = []  # server_key of each row, parallel to _servers
+        self._rows_dirty = False  # row index is rebuilt lazily after set_servers
+        self.ping_ordered = True  # rows are kept in ascending ping order (set_servers, update_server)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._servers)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._servers):
+            return None
+        server_data = self._servers[index.row()]
+        if role == ServerRole:
+            return server_data
+        if role == Qt.DisplayRole:
+            return server_data.get('name', '')
+        if role == FavoriteRole:
+            return self.is_favorite(server_data)
+        if role == Qt.ToolTipRole:
+            return mods_tooltip(server_data.get('mods', '[]'), self.mod_titles)
+        return None
+
+    def servers(self) -> List[Dict]:
+        return list(self._servers)
+
+    def server_at(self, row: int) -> Optional[Dict]:
+        return self._servers[row] if 0 <= row < len(self._servers) else None
+
+    def set_servers(self, servers: List[Dict], ping_ordered: bool = False):
+        """Replace all rows; with ping_ordered the servers must be sorted by ping and stay that way"""
+        with get_metrics().span("ui.populate", len(servers)):
+            self.beginResetModel()
+            self._servers = list(servers)
+            self._rows_dirty = True
+            self.ping_ordered = ping_ordered
+            self.endResetModel()
+
+    def clear(self):
+        self.set_servers([], self.ping_ordered)
+
+    def row_of(self, server_data: Dict) -> int:
+        """Row of a server, -1 if not shown"""
+        if self._rows_dirty:
+            self._row_keys = [server_key(existing) for existing in self._servers]
+            self._row_by_key = {key: row for row, key in enumerate(self._row_keys)}
+            self._rows_dirty = False
+        return self._row_by_key.get(server_key(server_data), -1)
+
+    def _reindex(self, first: int, last: int):
+        """Re-key rows first..last after they shifted; rows outside the range keep their index"""
+        if not self._rows_dirty:
+            self._row_by_key.update(zip(self._row_keys[first:last + 1], range(first, last + 1)))
+
+    def insert_server(self, row: int, server_data: Dict):
+        row = max(0, min(row, len(self._servers)))
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._servers.insert(row, server_data)
+        if not self._rows_dirty:
+            self._row_keys.insert(row, server_key(server_data))
+        self._reindex(row, len(self._servers) - 1)
+        self.endInsertRows()
+
+    @staticmethod
+    def _ping_of(server_data: Dict):
+        return server_data.get('ping', 999)
+
+    def insert_by_ping(self, server_data: Dict) -> int:
+        """Insert after the last row with a ping <= this one (rows are kept in ping order)"""
+        row = bisect_right(self._servers, self._ping_of(server_data), key=self._ping_of)
+        self.insert_server(row, server_data)
+        return row
+
+    def update_server(self, server_data: Dict) -> bool:
+        """Replace one row's data and repaint just that row (moved first if its ping changed its place)"""
+        row = self.row_of(server_data)
+        if row < 0:
+            return False
+        ping_changed = self._ping_of(self._servers[row]) != self._ping_of(server_data)
+        self._servers[row] = server_data
+        if self.ping_ordered and ping_changed:
+            row = self._move_by_ping(row)
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def _move_by_ping(self, row: int) -> int:
+        """Move a row whose ping changed back into ping order, return its new row"""
+        ping = self._ping_of(self._servers[row])
+        if row > 0 and ping < self._ping_of(self._servers[row - 1]):
+            destination = bisect_right(self._servers, ping, 0, row, key=self._ping_of)
+        elif row < len(self._servers) - 1 and ping > self._ping_of(self._servers[row + 1]):
+            destination = bisect_right(self._servers, ping, row + 1, len(self._servers), key=self._ping_of)
+        else:
+            return row
+
+        # destination counts rows before the move; after removing this row it shifts down by one
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination)
+        server_data = self._servers.pop(row)
+        new_row = destination if destination < row else destination - 1
+        self._servers.insert(new_row, server_data)
+        if not self._rows_dirty:
+            self._row_keys.insert(new_row, self._row_keys.pop(row))
+        self._reindex(min(row, new_row), max(row, new_row))
+        self.endMoveRows()
+        return new_row
+
+    def remove_server(self, server_data: Dict) -> bool:
+        row = self.row_of(server_data)
+        if row < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._servers[row]
+        if not self._rows_dirty:
+            del self._row_by_key[self._row_keys.pop(row)]
+        self._reindex(row, len(self._servers) - 1)
+        self.endRemoveRows()
+        return True
+
+    def refresh_favorites(self):
+        """Repaint star icons (only visible rows are actually painted)"""
+        if self._servers:
+            self.dataChanged.emit(self.index(0), self.index(len(self._servers) - 1), [FavoriteRole])
+
+
+class ServerCardDelegate(QStyledItemDelegate):
+    """Paints a server row as a card with favorite and connect buttons"""
+
+    connectClicked = Signal(dict)
+    favoriteClicked = Signal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.name_font = QFont("Cantarell", 11, QFont.Bold)
+        self.info_font = QFont("Cantarell", 9)
+        self.info_bold_font = QFont("Cantarell", 9, QFont.Bold)
+        self.star_font = QFont("Cantarell", 14, QFont.Bold)
+        self.button_font = QFont("Cantarell", 8, QFont.Bold)
+
+    def sizeHint(self, option, index) -> QSize:
+        return QSize(option.rect.width(), CARD_HEIGHT + CARD_SPACING)
+
+    def _layout(self, rect: QRect, server_data: Dict) -> Dict[str, QRect]:
+        """Geometry of the card and its hit-testable parts"""
+        card = rect.adjusted(0, CARD_SPACING // 2, -1, -CARD_SPACING // 2)
+        inner = card.adjusted(16, 12, -16, -12)
+        header_height = 24
+
+        connect = QRect(inner.right() - 80, inner.top(), 80, header_height)
+        players_text = f"● {server_data.get('players', 0)}/{server_data.get('max_players', 0)}"
+        players_width = QFontMetrics(self.info_font).horizontalAdvance(players_text) + 8
+        players = QRect(connect.left() - 6 - players_width, inner.top(), players_width, header_height)
+        star = QRect(players.left() - 6 - 24, inner.top(), 24, header_height)
+        name = QRect(inner.left(), inner.top(), star.left() - inner.left() - 8, header_height)
+
+        info_top = inner.top() + header_height + 8
+        map_text = f"Map: {server_data.get('map', 'Unknown')}"
+        map_width = QFontMetrics(self.info_font).horizontalAdvance(map_text) + 16
+        map_rect = QRect(inner.left(), info_top, map_width, 18)
+        mods_text = mods_display(server_data.get('mods', '[]'))[0]
+        mods_width = QFontMetrics(self.info_bold_font).horizontalAdvance(mods_text) + 16
+        mods = QRect(map_rect.right(), info_top, mods_width, 18)
+        ping = QRect(mods.right(), info_top, 160, 18)
+        age = QRect(ping.right(), info_top, 160, 18)
+
+        return {'card': card, 'name': name, 'star': star, 'players': players, 'connect': connect,
+                'map': map_rect, 'mods': mods, 'ping': ping, 'age': age}
+
+    def paint(self, painter, option, index):
+        server_data = index.data(ServerRole)
+        if server_data is None:
+            return
+        rects = self._layout(option.rect, server_data)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        cursor = option.widget.mapFromGlobal(QCursor.pos()) if option.widget else None
+
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+
+        # Card background
+        painter.setPen(QPen(QColor("#4a7c59" if hovered else "#404040"), 1))
+        painter.setBrush(QColor("#333333" if hovered else "#2a2a2a"))
+        painter.drawRoundedRect(QRectF(rects['card']), 12, 12)
+
+        # Name
+        painter.setFont(self.name_font)
+        painter.setPen(QColor("#e8e8e8"))
+        name = QFontMetrics(self.name_font).elidedText(server_data.get('name', ''), Qt.ElideRight, rects['name'].width())
+        painter.drawText(rects['name'], Qt.AlignLeft | Qt.AlignVCenter, name)
+
+        # Favorite star
+        is_fav = bool(index.data(FavoriteRole))
+        star_hovered = cursor is not None and rects['star'].contains(cursor)
+        if star_hovered:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(255, 215, 0, 25))
+            painter.drawEllipse(rects['star'].adjusted(0, 0, -1, -1))
+        painter.setFont(self.star_font)
+        painter.setPen(QColor("#FFD700" if is_fav or star_hovered else "#666666"))
+        painter.drawText(rects['star'], Qt.AlignCenter, "★" if is_fav else "☆")
+
+        # Status and players
+        painter.setFont(self.info_font)
+        painter.setPen(QColor("#4CAF50" if server_data.get('online') else "#F44336"))
+        painter.drawText(rects['players'], Qt.AlignCenter,
+                         f"● {server_data.get('players', 0)}/{server_data.get('max_players', 0)}")
+
+        # Connect button
+        connect_hovered = cursor is not None and rects['connect'].contains(cursor)
+        painter.setPen(QPen(QColor("#6a9c79" if connect_hovered else "#5a8c69"), 1))
+        painter.setBrush(QColor("#5a8c69" if connect_hovered else "#4a7c59"))
+        painter.drawRoundedRect(QRectF(rects['connect']), 4, 4)
+        painter.setFont(self.button_font)
+        painter.setPen(QColor("white"))
+        painter.drawText(rects['connect'], Qt.AlignCenter, "⚡ Connect")
+
+        # Info row
+        painter.setFont(self.info_font)
+        painter.setPen(QColor("#b8b8b8"))
+        painter.drawText(rects['map'], Qt.AlignLeft | Qt.AlignVCenter, f"Map: {server_data.get('map', 'Unknown')}")
+
+        mods_text, mods_color, _ = mods_display(server_data.get('mods', '[]'))
+        painter.setFont(self.info_bold_font)
+        painter.setPen(QColor(mods_color))
+        painter.drawText(rects['mods'], Qt.AlignLeft | Qt.AlignVCenter, mods_text)
+
+        ping_text, ping_color = ping_display(server_data.get('ping', -1))
+        painter.setPen(QColor(ping_color))
+        painter.drawText(rects['ping'], Qt.AlignLeft | Qt.AlignVCenter, f"Ping: {ping_text}")
+
+        # Age marker for rows still showing cached data (live updates replace the dict)
+        cached_at = server_data.get('cached_at')
+        if cached_at:
+            painter.setFont(self.info_font)
+            painter.setPen(QColor("#9E9E9E"))
+            painter.drawText(rects['age'], Qt.AlignLeft | Qt.AlignVCenter,
+                             f"⏱ cached {age_display(time.time() - cached_at)}")
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        """Hit-test the painted star and connect buttons"""
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            server_data = index.data(ServerRole)
+            if server_data is None:
+                return False
+            rects = self._layout(option.rect, server_data)
+            pos = event.position().toPoint()
+            if rects['connect'].contains(pos):
+                self.connectClicked.emit(server_data)
+                return True
+            if rects['star'].contains(pos):
+                self.favoriteClicked.emit(server_data)
+                return True
+        elif event.type() == QEvent.MouseMove and option.widget is not None:
+            # Repaint the row so button hover states follow the cursor
+            option.widget.update(index)
+        return False
+
+    def helpEvent(self, event, view, option, index) -> bool:
+        """Show the mod list tooltip only over the mods label"""
+        server_data = index.data(ServerRole)
+        if server_data is None:
+            return False
+        rects = self._layout(option.rect, server_data)
+        if rects['mods'].contains(event.pos()):
+            QToolTip.showText(event.globalPos(), index.data(Qt.ToolTipRole), view)
+        else:
+            QToolTip.hideText()
+        return True
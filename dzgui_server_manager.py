@@ -5,9 +5,9 @@ Replaces bash logic with native Python server queries
 """
 
 import asyncio
-from a2s.info import info as a2s_info
 try:
     import aiohttp
+    from dzgui_http import get_http_session, close_http_session
     HAS_AIOHTTP = True
 except ImportError:
     HAS_AIOHTTP = False
@@ -15,13 +15,21 @@ import json
 import time
 import socket
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
 from dataclasses import dataclass
-from PySide6.QtCore import QObject, QThread, Signal
+from PySide6.QtCore import QObject, Signal
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import our database manager
-from dzgui_database import get_database, ServerRecord
+from dzgui_database import get_database, ServerRecord, ServerChangeset
+from dzgui_server_cache import ServerCache, CachedServers
+from dzgui_steam_index import SteamServerIndex
+from dzgui_ping_scheduler import PingScheduler, PingRefresher, PingStats, PortReply
+from dzgui_a2s import get_a2s_client, close_a2s_client, decode_dayz_mod_ids
+from dzgui_icmp import get_icmp_pinger, close_icmp_pinger
+from dzgui_async_runtime import get_async_runtime
+from dzgui_metrics import get_metrics
+from battlemetrics_api import close_battlemetrics_api
 
 @dataclass
 class ServerInfo:
@@ -51,6 +59,7 @@ class DZServerManager(QObject):
     serverError = Signal(str)
     progressUpdate = Signal(int, str)  # percentage, message
     serverPingUpdated = Signal(dict)   # single server with fresh ping - FORWARDED from database
+    serversChanged = Signal(object)    # ServerChangeset of the last refresh (added/changed/removed)
     
     def __init__(self):
         super().__init__()
@@ -66,9 +75,49 @@ class DZServerManager(QObject):
         self.database.progressUpdate.connect(self.progressUpdate)
         self.database.serverPingUpdated.connect(self.serverPingUpdated)  # Forward real-time ping updates
         
+        # Stale-while-revalidate bookkeeping (refresh time and TTL per filter set)
+        self.cache = ServerCache(self.database)
+        
+        # Steam master-server list persisted for map enrichment, refreshed in the background
+        self.steam_index = SteamServerIndex(self.database)
+        self.steam_index_task: Optional[asyncio.Task] = None
+        
+        # Prioritized multi-sample pings with adaptive concurrency, one host probe per IP
+        self.ping_scheduler = PingScheduler(self._probe_host, self._probe_port)
+        
+        # Rolling re-ping of on-screen servers and favorites between refreshes
+        self.ping_refresher = PingRefresher(
+            self.ping_scheduler,
+            load_records=self.database.get_records,
+            on_result=self._on_refreshed_ping,
+            is_paused=lambda: self.refresh_future is not None and not self.refresh_future.done()
+        )
+        
+        # Stage timings of the refresh pipeline (Diagnostics tab)
+        self.metrics = get_metrics()
+        
+        # Targeted per-host Steam lookups: concurrency cap and negative cache (ip -> miss time)
+        self.steam_lookup_concurrency = 8
+        self.steam_negative_ttl = 30 * 60
+        self.steam_negative_cache: Dict[str, float] = {}
+        
         # Thread pool for concurrent queries
         self.executor = ThreadPoolExecutor(max_workers=50)
         
+        # All network work runs on one persistent event loop; sessions and sockets live as long as it does
+        self.runtime = get_async_runtime()
+        self.refresh_future = None
+        self.search_refresh_future = None  # background refresh of a search term, runs alongside refresh_future
+        
+        # Server keys returned by the previous unfiltered refresh (seeded from the cached rows), to derive removals
+        self.refresh_keys: Optional[set] = None
+        self.last_changeset: Optional[ServerChangeset] = None
+        if HAS_AIOHTTP:
+            self.runtime.add_shutdown_callback(close_http_session)
+        self.runtime.add_shutdown_callback(close_battlemetrics_api)
+        self.runtime.add_shutdown_callback(close_a2s_client)
+        self.runtime.add_shutdown_callback(close_icmp_pinger)
+        
         print("Server manager initialized with SQLite database")
     
     async def query_server_a2s(self, ip: str, qport: int = 27016, fast_mode: bool = False) -> Optional[ServerInfo]:
@@ -77,19 +126,15 @@ class DZServerManager(QObject):
             # DayZ servers: query port = game port + 1
             actual_qport = qport + 1 if qport < 27000 else qport
             
-            # Measure A2S query time for accurate ping
-            start_time = time.time()
-            
             # Timeout agressif pour fast mode (premiers 60%)
             timeout_value = 1.5 if fast_mode else 3.0
             
-            # Query server info with timeout
-            info = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: a2s_info((ip, actual_qport), timeout=timeout_value)
-            )
+            # Query server info over the shared A2S socket - RTT is timed from the moment the packet is sent
+            a2s_client = await get_a2s_client()
+            info = await a2s_client.info((ip, actual_qport), timeout=timeout_value)
             
-            # Calculate ping from A2S query time (most accurate)
-            ping = int((time.time() - start_time) * 1000)
+            # Ping from A2S round-trip time (most accurate)
+            ping = int(info.ping * 1000)
             
             # Cap ping at reasonable maximum
             if ping > 2000:
@@ -129,42 +174,22 @@ class DZServerManager(QObject):
                 ping=999
             )
     
-    async def ping_server_icmp(self, ip: str) -> int:
-        """Optimized fast ICMP ping"""
+    async def ping_server_icmp(self, ip: str, qport: Optional[int] = None) -> int:
+        """In-process ICMP echo, falls back to A2S round-trip time when ICMP is unavailable"""
         try:
-            import subprocess
-            import time
-            
-            # Use system ping command with optimized settings for speed
-            start_time = time.time()
-            
-            # Optimized ping: 1 packet, 1 second timeout, faster execution
-            result = await asyncio.get_event_loop().run_in_executor(
-                None, 
-                lambda: subprocess.run(
-                    ['ping', '-c', '1', '-W', '1000', '-q', ip],  # -q for quiet (faster), 1s timeout
-                    capture_output=True, 
-                    text=True,
-                    timeout=2  # Process timeout reduced to 2s
-                )
-            )
-            
-            if result.returncode == 0:
-                # Try to extract actual ping time from output
-                try:
-                    # Parse ping output for actual RTT time
-                    import re
-                    ping_match = re.search(r'time=([0-9.]+)', result.stdout)
-                    if ping_match:
-                        return int(float(ping_match.group(1)))
-                except:
-                    pass
-                
-                # Fallback: calculate from execution time
-                ping_time = int((time.time() - start_time) * 1000)
-                return max(min(ping_time, 999), 10)  # Between 10ms and 999ms
-            else:
-                return -1  # Ping failed
+            pinger = await get_icmp_pinger()
+            if pinger.available:
+                rtt = await pinger.ping(ip, timeout=1.0)
+                if rtt is not None:
+                    return max(1, int(rtt))
+            
+            # ICMP not permitted or filtered by the host - time an A2S_INFO round trip instead
+            if qport:
+                a2s_client = await get_a2s_client()
+                info = await a2s_client.info((ip, qport), timeout=1.5)
+                return max(1, int(info.ping * 1000))
+            
+            return -1  # Ping failed
                 
         except Exception as e:
             # Silent failure for better performance
@@ -173,21 +198,23 @@ class DZServerManager(QObject):
     async def get_server_mods(self, ip: str, qport: int = 27016) -> List[str]:
         """Get server mod list using A2S rules query"""
         try:
-            from a2s import dayzquery
-            rules = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: dayzquery.dayz_rules((ip, qport))
-            )
-            
-            if hasattr(rules, 'mods') and rules.mods:
-                return [mod.workshop_id for mod in rules.mods]
-            return []
+            a2s_client = await get_a2s_client()
+            rules = await a2s_client.rules((ip, qport))
+            return decode_dayz_mod_ids(rules)
             
         except Exception as e:
             print(f"Error getting mods for {ip}:{qport} - {e}")
             return []
     
-    async def fetch_battlemetrics_servers(self, limit: int = None, filters: Dict[str, str] = None) -> List[ServerRecord]:
-        """Fetch DayZ servers from BattleMetrics API (superior to Steam API)"""
+    async def fetch_battlemetrics_servers(self, limit: int = None, filters: Dict[str, str] = None,
+                                          on_batch: Optional[Callable[[List[ServerRecord]], Awaitable[None]]] = None,
+                                          force: bool = False) -> List[ServerRecord]:
+        """Fetch DayZ servers from BattleMetrics API (superior to Steam API)
+        
+        Pages are streamed: `on_batch` is awaited with each converted page while
+        later pages are still in flight, so callers can upsert and ping early.
+        Fresh results for the same filters are reused unless `force` is set.
+        """
         servers = []
         
         try:
@@ -202,26 +229,30 @@ class DZServerManager(QObject):
             fetch_limit = limit if limit else 2500
             self.progressUpdate.emit(20, f"Fetching {fetch_limit} popular servers from BattleMetrics...")
             
-            # Get servers from BattleMetrics with filters
-            bm_servers = await bm_api.get_dayz_servers(limit=fetch_limit, filters=filters)
-            
-            if bm_servers:
-                self.progressUpdate.emit(60, f"Converting {len(bm_servers)} BattleMetrics servers...")
-                
+            # Stream servers from BattleMetrics with filters
+            async for bm_batch in bm_api.iter_dayz_servers(limit=fetch_limit, filters=filters, force=force):
                 # Convert BattleMetrics servers to our ServerRecord format
-                for bm_server in bm_servers:
-                    try:
-                        server_record = bm_api.battlemetrics_to_server_record(bm_server)
-                        servers.append(server_record)
-                    except Exception as e:
-                        print(f"Error converting BattleMetrics server: {e}")
-                        continue
+                batch_records = []
+                with self.metrics.span("convert", len(bm_batch)) as span:
+                    for bm_server in bm_batch:
+                        try:
+                            batch_records.append(bm_api.battlemetrics_to_server_record(bm_server))
+                        except Exception as e:
+                            print(f"Error converting BattleMetrics server: {e}")
+                            span.errors += 1
+                            continue
                 
-                print(f"✅ Successfully converted {len(servers)} servers from BattleMetrics")
+                # 🗺️ Steam map names are a local join, so each page is enriched before it is saved
+                self._enrich_servers_with_steam_maps(batch_records)
+                servers.extend(batch_records)
+                progress = 20 + int(min(len(servers) / fetch_limit, 1.0) * 40)  # 20-60% range
+                self.progressUpdate.emit(progress, f"Received {len(servers)} BattleMetrics servers...")
                 
-                # 🗺️ Hybrid approach: Enrich with Steam API map data (fast batch method)
-                self.progressUpdate.emit(75, f"Enriching {len(servers)} servers with Steam API map data...")
-                servers = await self._enrich_servers_with_steam_maps(servers)
+                if on_batch and batch_records:
+                    await on_batch(batch_records)
+            
+            if servers:
+                print(f"✅ Successfully converted {len(servers)} servers from BattleMetrics")
             else:
                 print("❌ No servers returned from BattleMetrics")
                 
@@ -233,8 +264,14 @@ class DZServerManager(QObject):
         return servers
     
     async def _enrich_servers_with_steam_maps_targeted(self, servers: List[ServerRecord]) -> List[ServerRecord]:
-        """Enrich BattleMetrics servers by searching Steam API for each server specifically"""
-        if not servers:
+        """Enrich BattleMetrics servers by looking up hosts missing from the Steam index
+        
+        One `\\gameaddr\\<ip>` request per host covers every port on it; requests run
+        concurrently (bounded by a semaphore), hosts Steam does not know are
+        remembered for `steam_negative_ttl` seconds, and results go into the
+        Steam index so later refreshes enrich them locally.
+        """
+        if not servers or not HAS_AIOHTTP:
             return servers
             
         try:
@@ -244,42 +281,60 @@ class DZServerManager(QObject):
                 print("⚠️ No Steam API key - keeping BattleMetrics map detection")
                 return servers
             
-            print(f"🗺️ Searching Steam API for {len(servers)} specific servers...")
+            now = time.time()
+            ips = sorted({server.ip for server in servers if server.ip})
+            ips = [ip for ip in self.steam_index.missing_ips(ips)
+                   if now - self.steam_negative_cache.get(ip, 0) > self.steam_negative_ttl]
             
-            if HAS_AIOHTTP:
-                async with aiohttp.ClientSession() as session:
-                    enriched_count = 0
-                    
-                    # Search for each server individually in Steam API
-                    for i, server in enumerate(servers):
-                        if i % 20 == 0:  # Progress every 20 servers
-                            self.progressUpdate.emit(75 + int(i/len(servers)*10), f"Searching Steam API: {i}/{len(servers)}")
-                        
-                        # Try both game port and query port
-                        for port in [server.port, server.query_port]:
-                            steam_map = await self._get_steam_map_for_server(session, steam_api_key, server.ip, port)
-                            if steam_map and steam_map != 'Unknown':
-                                old_map = server.map_name
-                                server.map_name = steam_map
-                                enriched_count += 1
-                                print(f"🗺️ Found: {server.name[:35]}... {old_map} -> {steam_map}")
-                                break  # Found it, no need to try other port
-                    
-                    print(f"🗺️ Successfully enriched {enriched_count}/{len(servers)} servers with targeted Steam search")
+            if ips:
+                print(f"🗺️ Looking up {len(ips)} hosts on Steam API ({len(servers)} servers)...")
+                session = await get_http_session()
+                semaphore = asyncio.Semaphore(self.steam_lookup_concurrency)
+                
+                async def lookup(ip: str):
+                    async with semaphore:
+                        return ip, await self._get_steam_servers_on_ip(session, steam_api_key, ip)
+                
+                tasks = [asyncio.create_task(lookup(ip)) for ip in ips]
+                found = []
+                with self.metrics.span("steam.lookup", len(ips)) as span:
+                    try:
+                        for done, next_result in enumerate(asyncio.as_completed(tasks), 1):
+                            ip, steam_servers = await next_result
+                            if steam_servers:
+                                found.extend(steam_servers)
+                            elif steam_servers is None:
+                                span.errors += 1  # request failed
+                            else:
+                                self.steam_negative_cache[ip] = time.time()  # Steam does not list this host
+                            if done % 10 == 0 or done == len(tasks):
+                                self.progressUpdate.emit(75 + int(done / len(tasks) * 10),
+                                                         f"Steam lookup: {done}/{len(tasks)} hosts, {len(found)} servers found")
+                    finally:
+                        for task in tasks:
+                            task.cancel()
+                
+                if found:
+                    await asyncio.get_running_loop().run_in_executor(None, self.steam_index.store, found)
             
+            enriched_count = self.steam_index.enrich(servers)
+            print(f"🗺️ Successfully enriched {enriched_count}/{len(servers)} servers with targeted Steam search")
+            
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             print(f"⚠️ Error in targeted Steam enrichment: {e}")
         
         return servers
     
-    async def _get_steam_map_for_server(self, session, steam_api_key: str, ip: str, port: int) -> Optional[str]:
-        """Get map for specific server from Steam API"""
+    async def _get_steam_servers_on_ip(self, session, steam_api_key: str, ip: str) -> Optional[List[Dict]]:
+        """All Steam-listed servers on one host (None if the request failed)"""
         try:
             base_url = "https://api.steampowered.com/IGameServersService/GetServerList/v1/"
             
-            # Search specifically for this server
+            # Search specifically for this host, any port
             params = {
-                'filter': f'\\addr\\{ip}:{port}',  # Search for specific server
+                'filter': f'\\appid\\221100\\gameaddr\\{ip}',
                 'key': steam_api_key,
                 'format': 'json'
             }
@@ -287,65 +342,64 @@ class DZServerManager(QObject):
             async with session.get(base_url, params=params, timeout=10) as response:
                 if response.status == 200:
                     data = await response.json()
-                    steam_servers = data.get('response', {}).get('servers', [])
-                    
-                    if steam_servers:
-                        return steam_servers[0].get('map', 'Unknown')
+                    return data.get('response', {}).get('servers', [])
                 
                 return None
                         
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            # Silent fail for individual server lookups
+            # Silent fail for individual host lookups
             return None
     
-    async def _enrich_servers_with_steam_maps(self, servers: List[ServerRecord]) -> List[ServerRecord]:
-        """Enrich BattleMetrics servers with Steam API map information"""
+    async def _enrich_and_save_targeted(self, servers: List[ServerRecord]):
+        """Targeted Steam enrichment, saving only servers whose map changed"""
+        previous_maps = {server.key: server.map_name for server in servers}
+        await self._enrich_servers_with_steam_maps_targeted(servers)
+        changed = [server for server in servers if server.map_name != previous_maps[server.key]]
+        if changed:
+            with self.metrics.span("db.upsert", len(changed)):
+                await self.database.upsert_servers_batch_async(changed)
+    
+    def _enrich_servers_with_steam_maps(self, servers: List[ServerRecord]) -> List[ServerRecord]:
+        """Enrich BattleMetrics servers with Steam map names from the local Steam index"""
         if not servers:
             return servers
-            
-        try:
-            # Get Steam API key
-            steam_api_key = self.get_steam_api_key()
-            if not steam_api_key:
-                print("⚠️ No Steam API key - keeping BattleMetrics map detection")
-                return servers
-            
-            print(f"🗺️ Enriching with Steam API map data for {len(servers)} servers...")
-            
-            if HAS_AIOHTTP:
-                async with aiohttp.ClientSession() as session:
-                    # Get Steam servers (larger batch to find our servers)
-                    steam_servers = await self._fetch_steam_servers_for_maps(session, steam_api_key)
-                    
-                    if steam_servers:
-                        # Create mapping: IP -> map_name (ignore port differences between APIs)
-                        steam_map_data = {}
-                        for steam_server in steam_servers:
-                            addr = steam_server.get('addr', '')
-                            if ':' in addr:
-                                ip, port_str = addr.split(':', 1)
-                                steam_map_data[ip] = steam_server.get('map', 'Unknown')
-                        
-                        # Enrich our servers with Steam map data (match by IP only)
-                        enriched_count = 0
-                        for server in servers:
-                            if server.ip in steam_map_data:
-                                server.map_name = steam_map_data[server.ip]
-                                enriched_count += 1
-                        
-                        print(f"🗺️ Successfully enriched {enriched_count}/{len(servers)} servers with Steam map data")
-                    else:
-                        print("⚠️ No Steam servers returned - keeping BattleMetrics map detection")
-            
-        except asyncio.TimeoutError:
-            print(f"⚠️ Steam API timeout - continuing without map enrichment")
-        except Exception as e:
-            print(f"⚠️ Error enriching with Steam maps: {e}")
-            import traceback
-            traceback.print_exc()
+        
+        with self.metrics.span("steam.enrich", len(servers)) as span:
+            try:
+                enriched_count = self.steam_index.enrich(servers)
+                if enriched_count:
+                    print(f"🗺️ Enriched {enriched_count}/{len(servers)} servers from the Steam index")
+            except Exception as e:
+                print(f"⚠️ Error enriching with Steam maps: {e}")
+                span.errors = 1
         
         return servers
     
+    def _schedule_steam_index_refresh(self):
+        """Start a background Steam list fetch when the index is older than its refresh interval"""
+        if not HAS_AIOHTTP or (self.steam_index_task and not self.steam_index_task.done()):
+            return
+        if not self.steam_index.needs_refresh() or not self.get_steam_api_key():
+            return
+        self.steam_index_task = asyncio.create_task(self._refresh_steam_index())
+    
+    async def _refresh_steam_index(self):
+        """Fetch the Steam server list and merge it into the Steam index"""
+        try:
+            session = await get_http_session()
+            steam_servers = await self._fetch_steam_servers_for_maps(session, self.get_steam_api_key())
+            if steam_servers:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: self.steam_index.store(steam_servers, full_list=True))
+            else:
+                print("⚠️ No Steam servers returned - Steam index unchanged")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Error refreshing Steam index: {e}")
+    
     async def _fetch_steam_servers_for_maps(self, session, steam_api_key: str) -> List[Dict]:
         """Fetch servers from Steam API specifically for map information"""
         try:
@@ -376,7 +430,9 @@ class DZServerManager(QObject):
             print(f"❌ Error fetching Steam servers for maps: {e}")
             return []
     
-    async def fetch_filtered_servers(self, server_type: str = None, region: str = None, search_term: str = None, max_servers: int = 200) -> List[ServerRecord]:
+    async def fetch_filtered_servers(self, server_type: str = None, region: str = None, search_term: str = None, max_servers: int = 200,
+                                     on_batch: Optional[Callable[[List[ServerRecord]], Awaitable[None]]] = None,
+                                     force: bool = False) -> List[ServerRecord]:
         """Fetch servers using BattleMetrics API filters - much faster than client-side filtering"""
         try:
             # Build filters for BattleMetrics API
@@ -415,12 +471,12 @@ class DZServerManager(QObject):
             
             # Fetch filtered servers
             self.progressUpdate.emit(10, f"Fetching {max_servers} filtered servers...")
-            return await self.fetch_battlemetrics_servers(limit=max_servers, filters=filters)
+            return await self.fetch_battlemetrics_servers(limit=max_servers, filters=filters, on_batch=on_batch, force=force)
             
         except Exception as e:
             print(f"❌ Error in filtered fetch: {e}")
             # Fallback to regular fetch
-            return await self.fetch_battlemetrics_servers(limit=max_servers)
+            return await self.fetch_battlemetrics_servers(limit=max_servers, on_batch=on_batch, force=force)
     
     async def fetch_steam_servers_fallback(self) -> List[ServerRecord]:
         """Fallback Steam API method (kept for compatibility)"""
@@ -437,228 +493,123 @@ class DZServerManager(QObject):
         
         if HAS_AIOHTTP:
             try:
-                async with aiohttp.ClientSession() as session:
-                    params = {
-                        'filter': '\\appid\\221100',
-                        'limit': '1000',  # Reduced limit for fallback
-                        'key': steam_api_key,
-                        'format': 'json'
-                    }
-                    
-                    async with session.get(base_url, params=params, timeout=15) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            steam_servers = data.get('response', {}).get('servers', [])
-                            
-                            for server_data in steam_servers:
-                                try:
-                                    server_record = ServerRecord.from_steam_api(server_data)
-                                    servers.append(server_record)
-                                except Exception as e:
-                                    continue
-                                    
-                            print(f"Steam fallback: {len(servers)} servers")
+                session = await get_http_session()
+                params = {
+                    'filter': '\\appid\\221100',
+                    'limit': '1000',  # Reduced limit for fallback
+                    'key': steam_api_key,
+                    'format': 'json'
+                }
+                
+                async with session.get(base_url, params=params, timeout=15) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        steam_servers = data.get('response', {}).get('servers', [])
                         
+                        for server_data in steam_servers:
+                            try:
+                                server_record = ServerRecord.from_steam_api(server_data)
+                                servers.append(server_record)
+                            except Exception as e:
+                                continue
+                                
+                        print(f"Steam fallback: {len(servers)} servers")
+                    
             except Exception as e:
                 print(f"Steam fallback failed: {e}")
         
         return servers
     
-    async def measure_server_pings_batch(self, servers: List[ServerRecord], max_concurrent: int = 50) -> List[ServerRecord]:
-        """Parallel ICMP ping measurement for maximum speed"""
-        if not servers:
-            return []
-        
-        # Sort servers by priority: players > 0, then by player count
-        servers.sort(key=lambda s: (s.players > 0, s.players), reverse=True)
-        
-        print(f"⚡ Parallel ICMP ping for {len(servers)} servers (max {max_concurrent} concurrent)...")
-        
-        # Use higher concurrency for ICMP pings (much lighter than A2S)
-        semaphore = asyncio.Semaphore(max_concurrent)
-        total_servers = len(servers)
-        completed = 0
-        
-        async def ping_server(server: ServerRecord) -> ServerRecord:
-            nonlocal completed
-            async with semaphore:
-                # Smart ping strategy: Use fast ICMP ping instead of slow A2S
-                try:
-                    # Skip ping for servers with 0 players (likely actually offline)
-                    if server.players == 0:
-                        print(f"⏭️ {server.name[:40]}... - Skipping (0 players)")
-                        server.ping = 500  # Assign medium ping, keep BattleMetrics data
-                        server.online = True  # Trust BattleMetrics status
-                    else:
-                        # Use fast ICMP ping instead of A2S (much faster and more reliable)
-                        try:
-                            ping_result = await self.ping_server_icmp(server.ip)
-                            if ping_result > 0:
-                                server.ping = min(ping_result, 999)  # Cap at 999ms
-                                server.online = True
-                                print(f"🏓 {server.name[:40]}... - {server.ping}ms ICMP ({server.players}/{server.max_players})")
-                            else:
-                                # ICMP failed, use BattleMetrics data with estimated ping
-                                server.ping = 350
-                                server.online = True
-                                print(f"📊 {server.name[:40]}... - ICMP failed, estimated ping ({server.players}/{server.max_players})")
-                        except Exception as e:
-                            # Fallback to estimated ping based on BattleMetrics data
-                            server.ping = 300
-                            server.online = True
-                            print(f"📊 {server.name[:40]}... - Using BattleMetrics data ({server.players}/{server.max_players})")
-                    
-                    server.last_seen = time.time()
-                    server.last_updated = time.time()
-                    
-                    # Update database with server info
-                    self.database.update_server_ping(
-                        server.ip, server.query_port, server.ping, 
-                        server.players, server.max_players, emit_signal=True
-                    )
-                        
-                except Exception as e:
-                    # Even on exception, keep BattleMetrics data
-                    server.ping = 400
-                    server.online = True
-                    print(f"📊 {server.name[:40]}... - Using BattleMetrics data only ({server.players}/{server.max_players})")
-                
-                completed += 1
-                progress = int(80 + (completed / total_servers) * 15)  # 80-95% range
-                
-                # Early Display à 60% des serveurs pingés
-                progress_ratio = completed / total_servers
-                if progress_ratio >= 0.6 and not hasattr(self, '_early_display_triggered'):
-                    self._early_display_triggered = True
-                    self.progressUpdate.emit(90, f"Ready to play! Loading {total_servers - completed} more servers in background...")
-                elif progress_ratio < 0.6:
-                    self.progressUpdate.emit(progress, f"Pinging {completed}/{total_servers} servers...")
-                else:
-                    # Background loading - progress plus discret
-                    self.progressUpdate.emit(progress, f"Background: {completed}/{total_servers} servers loaded")
-                
-                # DÉLAI entre pings pour éviter surcharge et faux pings
-                # Plus agressif pour les premiers serveurs
-                if progress_ratio < 0.6:
-                    await asyncio.sleep(0.03)  # 30ms pour premiers serveurs
-                else:
-                    await asyncio.sleep(0.1)   # 100ms pour background servers
-                    
-                return server
-        
-        # Execute ALL pings in parallel for maximum speed
-        print(f"🚀 Starting {total_servers} parallel ICMP pings...")
-        start_time = time.time()
-        
-        # Create all ping tasks at once
-        tasks = [ping_server(server) for server in servers]
-        
-        # Execute all pings in parallel with proper cancellation handling
+    async def _probe_host(self, ip: str) -> Optional[float]:
+        """One ICMP sample for the ping scheduler, shared by every server on the IP (None when lost)"""
+        pinger = await get_icmp_pinger()
+        if not pinger.available:
+            return None
+        return await pinger.ping(ip, timeout=1.0)
+    
+    async def _probe_port(self, ip: str, qport: int) -> Optional[PortReply]:
+        """One A2S_INFO query for the ping scheduler: server up, its players, and an RTT sample (None when lost)"""
         try:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            a2s_client = await get_a2s_client()
+            info = await a2s_client.info((ip, qport), timeout=1.5)
+            return PortReply(max(1.0, info.ping * 1000), info.player_count, info.max_players)
         except asyncio.CancelledError:
-            print("⚠️ Ping tasks cancelled during shutdown")
-            # Cancel all remaining tasks
-            for task in tasks:
-                if hasattr(task, 'cancel'):
-                    task.cancel()
-            return servers  # Return original servers without ping updates
-        
-        # Filter successful results
-        updated_servers = []
-        for result in results:
-            if isinstance(result, ServerRecord):
-                updated_servers.append(result)
-            elif isinstance(result, Exception):
-                print(f"❌ Ping task failed: {result}")
-        
-        end_time = time.time()
-        duration = end_time - start_time
-        
-        print(f"⚡ Parallel ping complete! {len(updated_servers)} servers in {duration:.1f}s ({len(updated_servers)/duration:.1f} pings/sec)")
-        return updated_servers
+            raise
+        except Exception:
+            return None
     
-    async def measure_server_pings_realtime(self, servers: List[ServerRecord], max_concurrent: int = 50):
-        """Measure pings with real-time UI updates as results come in"""
-        if not servers:
-            return
-        
-        print(f"🏓 Real-time ping measurement for {len(servers)} servers...")
+    def set_ping_priorities(self, visible: List[Tuple[str, int]], favorites: List[Tuple[str, int]]):
+        """Probe these (ip, query_port) servers first and keep re-pinging them (callable from any thread)"""
+        self.runtime.call_soon(self.ping_scheduler.set_priorities, list(visible), list(favorites))
+        self.runtime.call_soon(self.ping_refresher.start)
+    
+    def _on_refreshed_ping(self, server: ServerRecord, stats: PingStats):
+        """Background re-ping result: same database/serverPingUpdated path as a refresh"""
+        self.database.update_server_ping(server.ip, server.query_port, stats.ping,
+                                         stats.players, stats.max_players, emit_signal=True)
+    
+    async def measure_server_pings_batch(self, servers: List[ServerRecord]) -> List[ServerRecord]:
+        """Measure pings through the shared ping scheduler, updating the database as results arrive
         
-        # Sort servers by priority for better user experience
-        servers.sort(key=lambda s: (s.players > 0, s.players), reverse=True)
+        Servers nobody answered for (after retries) get the 999 "offline" sentinel,
+        never an estimated value.
+        """
+        if not servers:
+            return []
         
-        # Use semaphore for controlled concurrency
-        semaphore = asyncio.Semaphore(max_concurrent)
+        print(f"⚡ Scheduling pings for {len(servers)} servers ({int(self.ping_scheduler.concurrency)} concurrent)...")
         total_servers = len(servers)
         completed = 0
+        start_time = time.time()
         
-        async def ping_and_update_server(server: ServerRecord):
-            """Ping server and update UI immediately when result arrives"""
+        def on_result(server: ServerRecord, stats: PingStats):
             nonlocal completed
+            server.ping = stats.ping
+            if stats.players is not None:
+                # Live player counts from the server's own A2S reply
+                server.players, server.max_players = stats.players, stats.max_players
+            server.last_seen = time.time()
+            server.last_updated = time.time()
+            
+            if stats.received:
+                print(f"🏓 {server.name[:40]}... - {server.ping}ms (min {stats.min:.0f}, jitter {stats.jitter:.0f}, "
+                      f"loss {stats.loss:.0%}) ({server.players}/{server.max_players})")
+            else:
+                print(f"📴 {server.name[:40]}... - no reply after {stats.sent} probes")
             
-            async with semaphore:
-                try:
-                    # Skip ping for empty servers (keep estimated ping)
-                    if server.players == 0:
-                        completed += 1
-                        return
-                    
-                    # Measure ICMP ping
-                    ping_result = await self.ping_server_icmp(server.ip)
-                    
-                    if ping_result > 0:
-                        # Real ping successful
-                        server.ping = min(ping_result, 999)
-                        server.online = True
-                        
-                        # Update database immediately
-                        self.database.update_server_ping(
-                            server.ip, server.query_port, server.ping, 
-                            server.players, server.max_players, emit_signal=True
-                        )
-                        
-                        print(f"🏓 {server.name[:30]}... - {server.ping}ms (live update)")
-                    else:
-                        # ICMP failed - keep estimated ping but mark as less reliable
-                        server.ping = min(server.ping + 50, 500)  # Slight penalty for failed ping
-                        server.online = True
-                        
-                        # Still update database for consistency
-                        self.database.update_server_ping(
-                            server.ip, server.query_port, server.ping, 
-                            server.players, server.max_players, emit_signal=True
-                        )
-                        
-                        print(f"📊 {server.name[:30]}... - {server.ping}ms (estimated+)")
-                
-                except Exception as e:
-                    # Keep estimated ping on error
-                    print(f"❌ {server.name[:30]}... - Error: {e}")
-                
-                completed += 1
-                
-                # Progress update every 10 servers
-                if completed % 10 == 0 or completed >= total_servers:
-                    progress = 85 + int((completed / total_servers) * 10)  # 85-95% range
-                    self.progressUpdate.emit(progress, f"Live pings: {completed}/{total_servers} updated")
-        
-        # 🚀 Launch all ping tasks in parallel
-        print(f"🚀 Launching {total_servers} concurrent ping tasks...")
-        tasks = [ping_and_update_server(server) for server in servers]
+            # Update database with server info
+            self.database.update_server_ping(
+                server.ip, server.query_port, server.ping, 
+                server.players, server.max_players, emit_signal=True
+            )
+            
+            completed += 1
+            progress = int(80 + (completed / total_servers) * 15)  # 80-95% range
+            
+            # Early Display à 60% des serveurs pingés
+            progress_ratio = completed / total_servers
+            if progress_ratio >= 0.6 and not hasattr(self, '_early_display_triggered'):
+                self._early_display_triggered = True
+                self.progressUpdate.emit(90, f"Ready to play! Loading {total_servers - completed} more servers in background...")
+            elif progress_ratio < 0.6:
+                self.progressUpdate.emit(progress, f"Pinging {completed}/{total_servers} servers...")
+            else:
+                # Background loading - progress plus discret
+                self.progressUpdate.emit(progress, f"Background: {completed}/{total_servers} servers loaded")
         
-        # Wait for all pings to complete with proper cancellation handling
         try:
-            await asyncio.gather(*tasks, return_exceptions=True)
+            with self.metrics.span("ping.sweep", len(servers)) as span:
+                results = await self.ping_scheduler.measure(servers, on_result)
+                span.errors = sum(1 for stats in results.values() if not stats.received)
         except asyncio.CancelledError:
-            print("⚠️ Real-time ping tasks cancelled during shutdown")
-            # Cancel all remaining tasks
-            for task in tasks:
-                if hasattr(task, 'cancel'):
-                    task.cancel()
-            return
+            print("⚠️ Ping tasks cancelled")
+            raise
         
-        print(f"✅ Real-time ping measurement complete! All {total_servers} servers processed")
+        duration = max(time.time() - start_time, 0.001)
+        reachable = len(results) - span.errors
+        print(f"⚡ Pings complete! {reachable}/{len(results)} reachable in {duration:.1f}s "
+              f"({len(results)/duration:.1f} servers/sec)")
+        return servers
     
     def get_steam_api_key(self) -> Optional[str]:
         """Get Steam API key from config - OPTIONAL for privacy"""
@@ -704,60 +655,112 @@ class DZServerManager(QObject):
         
         return [ServerRecord.from_steam_api(data) for data in fallback_data]
     
-    async def refresh_servers_async(self, server_type: str = None, region: str = None, search_term: str = None):
+    async def refresh_servers_async(self, server_type: str = None, region: str = None, search_term: str = None,
+                                    force: bool = False):
         """Ultra-Smart server refresh - Use BattleMetrics API filters to fetch only relevant servers (~200 max)"""
+        # Upsert and ping each page as soon as it arrives, while later pages are still in flight
+        ping_tasks = []
+        changeset = ServerChangeset()
+        started = time.perf_counter()
+        self.metrics.incr("refresh.started")
+        
         try:
             self.progressUpdate.emit(5, "Starting BattleMetrics filtered refresh...")
+            self._schedule_steam_index_refresh()
             
             # 🎯 NEW APPROACH: Use BattleMetrics API filters to get ONLY relevant servers
             max_servers = 200  # Much smaller, faster set
             
+            async def on_batch(batch: List[ServerRecord]):
+                nonlocal changeset
+                with self.metrics.span("db.upsert", len(batch)):
+                    changeset = changeset.merge(await self.database.upsert_servers_batch_async(batch))
+                ping_tasks.append(asyncio.create_task(self.measure_server_pings_batch(batch)))
+            
             if server_type or region or search_term:
                 self.progressUpdate.emit(10, f"Fetching filtered servers: {server_type}/{region}/{search_term}")
                 server_records = await self.fetch_filtered_servers(
                     server_type=server_type, 
                     region=region, 
                     search_term=search_term, 
-                    max_servers=max_servers
+                    max_servers=max_servers,
+                    on_batch=on_batch,
+                    force=force
                 )
             else:
                 # Default: Get top popular servers (no specific filters)
                 self.progressUpdate.emit(10, f"Fetching top {max_servers} popular servers...")
-                server_records = await self.fetch_battlemetrics_servers(limit=max_servers)
+                server_records = await self.fetch_battlemetrics_servers(limit=max_servers, on_batch=on_batch, force=force)
             
             if not server_records:
+                for task in ping_tasks:
+                    task.cancel()
                 self.serverError.emit("Failed to fetch filtered servers from BattleMetrics API")
+                self.metrics.record("refresh.total", (time.perf_counter() - started) * 1000, errors=1)
                 return
             
             print(f"🎯 API-Filtered: Got {len(server_records)} servers (vs old 2500+)")
-            self.progressUpdate.emit(40, f"Got {len(server_records)} filtered servers, saving...")
-            
-            # Save filtered servers to database (for search/stats only)
-            self.database.upsert_servers_batch(server_records)
+            self.progressUpdate.emit(65, f"Got {len(server_records)} filtered servers, saving...")
+            
+            # Save enriched servers to database (only rows changed by enrichment are rewritten)
+            with self.metrics.span("db.upsert", len(server_records)):
+                changeset = changeset.merge(await self.database.upsert_servers_batch_async(server_records))
+            
+            # Servers the previous unfiltered refresh returned but this one did not. Only that
+            # refresh owns the full server list; a filtered or search refresh sees a slice of it
+            # (BattleMetrics matches names only, the local search also maps and mods), so what
+            # it does not return is not gone
+            if not (server_type or region or search_term):
+                current_keys = changeset.keys()
+                previous_keys = self.refresh_keys
+                if previous_keys is None:
+                    # First refresh in this session: the UI shows the cached rows
+                    previous_keys = await asyncio.get_running_loop().run_in_executor(None, self._cached_keys)
+                changeset.removed = sorted(previous_keys - current_keys)
+                self.refresh_keys = current_keys
+            self.last_changeset = changeset
+            print(f"🧮 Refresh changeset: {changeset.summary()}")
+            self.serversChanged.emit(changeset)
+            self.cache.mark_fetched(len(server_records), server_type, region, search_term)
             
             # Convert to display format
             display_servers = [server.to_dict() for server in server_records]
             
             # 🚀 DISPLAY immediately - all servers are relevant
-            self.progressUpdate.emit(60, f"Showing all {len(display_servers)} filtered servers...")
+            self.progressUpdate.emit(70, f"Showing all {len(display_servers)} filtered servers...")
             self.serversUpdated.emit(display_servers)
             
             print(f"✅ API-Filtered Display: All {len(display_servers)} servers shown immediately")
-            self.progressUpdate.emit(70, "Measuring pings for filtered servers...")
+            self.progressUpdate.emit(80, "Measuring pings for filtered servers...")
             
-            # 🏓 Ping all filtered servers (small set, very fast)
-            print(f"🏓 Pinging all {len(server_records)} filtered servers...")
-            await self.measure_server_pings_batch(server_records, max_concurrent=50)
+            # 🏓 Pings for every page were started as the page arrived
+            if not ping_tasks:
+                # Steam fallback path does not stream pages
+                ping_tasks.append(asyncio.create_task(self.measure_server_pings_batch(server_records)))
+            if server_type or region or search_term:
+                # Filtered sets are small: look up hosts the Steam index misses while pings run
+                ping_tasks.append(asyncio.create_task(self._enrich_and_save_targeted(server_records)))
+            print(f"🏓 Waiting for pings of all {len(server_records)} filtered servers...")
+            await asyncio.gather(*ping_tasks)
             
             self.progressUpdate.emit(95, "Finalizing...")
-            self.database.cleanup_old_servers()
+            await self.cache.evict_async()
             
             self.progressUpdate.emit(100, f"✅ Ready! {len(server_records)} filtered servers loaded & pinged")
+            self.metrics.record("refresh.total", (time.perf_counter() - started) * 1000, count=len(server_records))
             
             # Print final stats
             print(f"📊 API-Filtered stats: {len(server_records)} servers (filtered by BattleMetrics API)")
             
+        except asyncio.CancelledError:
+            # Superseded by a newer refresh or application shutdown
+            for task in ping_tasks:
+                task.cancel()
+            print("🛑 Refresh cancelled")
+            self.metrics.incr("refresh.cancelled")
+            raise
         except Exception as e:
+            self.metrics.record("refresh.total", (time.perf_counter() - started) * 1000, errors=1)
             self.serverError.emit(f"Error refreshing servers: {str(e)}")
             print(f"Refresh error: {e}")
     
@@ -780,6 +783,17 @@ class DZServerManager(QObject):
             last_seen=server_dict.get('last_seen', 0)
         )
     
+    def _cached_keys(self) -> set:
+        """(ip, query_port) of the cached servers shown before the first refresh"""
+        cached = self.cache.load()
+        return {(server['ip'], int(server['qport'])) for server in cached.servers}
+    
+    def load_cached_servers(self, server_type: str = None, region: str = None, search_term: str = None,
+                            limit: int = -1, offset: int = 0) -> CachedServers:
+        """Last known servers from the database, instantly, with their refresh age"""
+        return self.cache.load(server_type=server_type, region=region, search_term=search_term,
+                               limit=limit, offset=offset)
+    
     def search_servers(self, query: str, server_type: Optional[str] = None) -> List[Dict]:
         """Search servers in database"""
         return self.database.search_servers(query, server_type)
@@ -787,7 +801,7 @@ class DZServerManager(QObject):
     def get_servers_by_type(self, server_type: str) -> List[Dict]:
         """Get servers by type - directly fetch with filters instead of cache"""
         # With BattleMetrics filtering, we fetch fresh data instead of using cache
-        asyncio.create_task(self.refresh_servers_async(server_type=server_type))
+        self.refresh_servers(server_type=server_type)
         return []  # Return empty, will be populated via signals
     
     def get_database_stats(self) -> Dict:
@@ -795,58 +809,36 @@ class DZServerManager(QObject):
         return self.database.get_database_stats()
     
     
-    def refresh_servers(self, server_type: str = None, region: str = None, search_term: str = None):
-        """Start server refresh in thread - no more cache checking needed"""
+    def refresh_servers(self, server_type: str = None, region: str = None, search_term: str = None,
+                        force: bool = False):
+        """Schedule a server refresh on the async runtime, cancelling any refresh still in flight
+        
+        Fresh BattleMetrics results for the same filters are reused; `force` refetches them.
+        """
         # Show progress immediately 
         self.progressUpdate.emit(0, "Starting BattleMetrics filtered refresh...")
         
-        # Start async refresh with filters
-        self.refresh_thread = ServerRefreshThread(self, server_type, region, search_term)
-        self.refresh_thread.start()
-
-
-class ServerRefreshThread(QThread):
-    """Thread for async server refresh"""
-    
-    def __init__(self, manager: DZServerManager, server_type: str = None, region: str = None, search_term: str = None):
-        super().__init__()
-        self.manager = manager
-        self.server_type = server_type
-        self.region = region
-        self.search_term = search_term
+        if self.refresh_future and not self.refresh_future.done():
+            print("🛑 Cancelling previous refresh...")
+            self.refresh_future.cancel()
+        
+        self.refresh_future = self.runtime.submit(self.refresh_servers_async(
+            server_type=server_type,
+            region=region,
+            search_term=search_term,
+            force=force
+        ))
     
-    def run(self):
-        """Run async server refresh"""
-        # Create new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    def refresh_search(self, search_term: str):
+        """Schedule a background refresh of one search term alongside the main refresh
         
-        try:
-            # Run the async refresh with filters
-            loop.run_until_complete(self.manager.refresh_servers_async(
-                server_type=self.server_type,
-                region=self.region, 
-                search_term=self.search_term
-            ))
-        except Exception as e:
-            print(f"Thread refresh error: {e}")
-        finally:
-            # Clean shutdown of event loop
-            try:
-                # Cancel all remaining tasks
-                pending = asyncio.all_tasks(loop)
-                if pending:
-                    print(f"🔄 Cancelling {len(pending)} pending tasks...")
-                    for task in pending:
-                        task.cancel()
-                    
-                    # Wait for cancelled tasks to complete
-                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-            except Exception as e:
-                print(f"Error cancelling tasks: {e}")
-            finally:
-                loop.close()
-                print("🔄 Thread event loop closed")
+        Only a newer search refresh cancels it; refresh_servers neither cancels nor waits for it.
+        """
+        if self.search_refresh_future and not self.search_refresh_future.done():
+            print("🛑 Cancelling previous search refresh...")
+            self.search_refresh_future.cancel()
+        
+        self.search_refresh_future = self.runtime.submit(self.refresh_servers_async(search_term=search_term))
 
 
 # Singleton instance
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+DZGUI Server Mods - Required-mods cache per server
+Workshop IDs a server needs, taken from BattleMetrics data or A2S rules, cached with a
+TTL and prefetched for hovered/visible servers so Connect does not wait on the network
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dzgui_a2s import get_a2s_client, decode_dayz_mod_ids
+
+ServerModsKey = Tuple[str, int]  # (ip, query_port)
+
+
+@dataclass
+class ServerMods:
+    """Required mods of one server"""
+    mod_ids: List[str]
+    source: str  # "battlemetrics", "a2s" or "launcher api"
+    fetched_at: float
+
+
+def battlemetrics_mod_ids(mods) -> List[str]:
+    """Workshop IDs from a server's `mods` data ([{"id", "name"}] JSON from BattleMetrics, or plain IDs)"""
+    try:
+        mods_list = json.loads(mods) if isinstance(mods, str) else list(mods or [])
+    except (TypeError, ValueError):
+        return []
+    mod_ids = [str(mod.get('id', '')) if isinstance(mod, dict) else str(mod) for mod in mods_list]
+    return list(dict.fromkeys(mod_id for mod_id in mod_ids if mod_id.isdigit()))
+
+
+class ServerModsCache:
+    """(ip, query_port) -> required workshop IDs
+
+    BattleMetrics mod lists are taken as-is; servers without one are asked over
+    A2S rules (an empty answer means vanilla), then the launcher API of the mod
+    manager. get() must run on the async runtime loop; concurrent lookups of the
+    same server share one request.
+    """
+
+    def __init__(self, mod_manager, ttl: float = 15 * 60, retry_after: float = 60,
+                 max_concurrency: int = 8):
+        self.mod_manager = mod_manager
+        self.ttl = ttl
+        self.retry_after = retry_after  # prefetch skips servers that failed this recently
+        self.max_concurrency = max_concurrency
+        self.entries: Dict[ServerModsKey, ServerMods] = {}
+        self.failed_at: Dict[ServerModsKey, float] = {}
+        self.in_flight: Dict[ServerModsKey, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def cached(self, ip: str, query_port: int) -> Optional[List[str]]:
+        """Fresh cached mod IDs, None when unknown or expired"""
+        entry = self.entries.get((ip, int(query_port)))
+        if entry is None or time.time() - entry.fetched_at > self.ttl:
+            return None
+        return entry.mod_ids
+
+    def seed(self, ip: str, query_port: int, mods) -> Optional[List[str]]:
+        """Store the BattleMetrics mod list of a server, if it has one"""
+        mod_ids = battlemetrics_mod_ids(mods)
+        if not mod_ids:
+            return None  # vanilla or unknown to BattleMetrics: A2S decides
+        self.entries[(ip, int(query_port))] = ServerMods(mod_ids, "battlemetrics", time.time())
+        return mod_ids
+
+    async def get(self, ip: str, query_port: int, force: bool = False) -> List[str]:
+        """Required mod IDs of a server, from the cache when fresh"""
+        key = (ip, int(query_port))
+        if not force:
+            mod_ids = self.cached(*key)
+            if mod_ids is not None:
+                return mod_ids
+
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._resolve(key))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def prefetch(self, servers: Iterable[Tuple[str, int]]):
+        """Resolve servers not cached yet, plus Workshop titles of their mods"""
+        servers = list(servers)
+        now = time.time()
+        keys = [(ip, int(query_port)) for ip, query_port in servers
+                if self.cached(ip, query_port) is None
+                and now - self.failed_at.get((ip, int(query_port)), 0) > self.retry_after]
+        results = await asyncio.gather(*(self.get(*key) for key in keys), return_exceptions=True)
+        mod_ids = {mod_id for result in results if isinstance(result, list) for mod_id in result}
+        for ip, query_port in servers:
+            mod_ids.update(self.cached(ip, query_port) or [])
+        if mod_ids:
+            await self.mod_manager.workshop_meta.get(mod_ids)
+
+    async def _resolve(self, key: ServerModsKey) -> List[str]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        ip, query_port = key
+
+        async with self._semaphore:
+            try:
+                a2s_client = await get_a2s_client()
+                rules = await a2s_client.rules((ip, query_port), timeout=2.0)
+                entry = ServerMods(decode_dayz_mod_ids(rules), "a2s", time.time())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Rules blocked or server down: ask the launcher API
+                entry = ServerMods(await self.mod_manager.get_server_mods(ip, query_port),
+                                   "launcher api", time.time())
+                if not entry.mod_ids:
+                    self.failed_at[key] = time.time()
+                    return []  # unknown rather than vanilla: not cached
+
+        self.entries[key] = entry
+        print(f"🧩 {ip}:{query_port} requires {len(entry.mod_ids)} mods ({entry.source})")
+        return entry.mod_ids
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+DZGUI Server Store - In-memory server index for the UI
+O(1) lookup by (ip, qport) and a ping-sorted index maintained with bisect
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+ServerKey = Tuple[str, str]
+
+
+def server_key(server_data: Dict) -> ServerKey:
+    """Key identifying a server in the UI (ip, qport)"""
+    return (server_data.get('ip') or '', str(server_data.get('qport')))
+
+
+class ServerStore:
+    """Server dicts indexed by (ip, qport), in arrival order
+
+    Behaves like a read-only list of server dicts (len, iteration, truthiness,
+    copy()), so existing list-based filtering code keeps working.
+    """
+
+    def __init__(self, servers: Iterable[Dict] = ()):
+        self._records: Dict[ServerKey, Dict] = {}
+        self._pings: Dict[ServerKey, int] = {}  # ping as indexed, even if a dict is mutated in place
+        self._by_ping: List[Tuple[int, ServerKey]] = []
+        self.replace_all(servers)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __bool__(self) -> bool:
+        return bool(self._records)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(list(self._records.values()))
+
+    def __contains__(self, server_data: Dict) -> bool:
+        return server_key(server_data) in self._records
+
+    def copy(self) -> List[Dict]:
+        return list(self._records.values())
+
+    def get(self, key: ServerKey) -> Optional[Dict]:
+        return self._records.get(key)
+
+    def replace_all(self, servers: Iterable[Dict]):
+        """Reset the store with a new server list"""
+        self._records = {}
+        for server_data in servers:
+            self._records[server_key(server_data)] = server_data
+        self._pings = {key: self._ping_of(server_data) for key, server_data in self._records.items()}
+        self._by_ping = sorted((ping, key) for key, ping in self._pings.items())
+
+    def clear(self):
+        self.replace_all(())
+
+    def upsert(self, server_data: Dict) -> bool:
+        """Insert or replace one server, return True if it was new"""
+        key = server_key(server_data)
+        is_new = key not in self._records
+        if not is_new:
+            self._remove_ping_entry(self._pings[key], key)
+        ping = self._ping_of(server_data)
+        self._records[key] = server_data
+        self._pings[key] = ping
+        insort(self._by_ping, (ping, key))
+        return is_new
+
+    def remove(self, key: ServerKey) -> Optional[Dict]:
+        server_data = self._records.pop(key, None)
+        if server_data is not None:
+            self._remove_ping_entry(self._pings.pop(key), key)
+        return server_data
+
+    def sorted_by_ping(self, limit: Optional[int] = None) -> List[Dict]:
+        """Servers in ascending ping order (no sort needed)"""
+        entries = self._by_ping if limit is None else self._by_ping[:limit]
+        return [self._records[key] for _, key in entries]
+
+    def ping_range(self, low: int, high: int) -> List[Dict]:
+        """Servers with low <= ping < high"""
+        start = bisect_left(self._by_ping, (low,))
+        end = bisect_left(self._by_ping, (high,))
+        return [self._records[key] for _, key in self._by_ping[start:end]]
+
+    @staticmethod
+    def _ping_of(server_data: Dict) -> int:
+        ping = server_data.get('ping', 999)
+        return ping if isinstance(ping, int) else 999
+
+    def _remove_ping_entry(self, ping: int, key: ServerKey):
+        index = bisect_left(self._by_ping, (ping, key))
+        if index < len(self._by_ping) and self._by_ping[index] == (ping, key):
+            del self._by_ping[index]
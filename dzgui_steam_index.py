@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+DZGUI Steam Index - Persistent Steam master-server index for map enrichment
+Steam GetServerList results are stored in SQLite keyed by (ip, game port), so enriching
+a refresh is a local join; the list itself is refreshed in the background
+"""
+
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from dzgui_database import DZServerDatabase, ServerRecord
+
+
+class SteamServerIndex:
+    """steam_servers table in servers.db: (ip, port) -> query port, name, map, fetch time
+
+    Rows are merged on every Steam fetch (never rebuilt) and expire after `max_age`.
+    """
+
+    def __init__(self, database: DZServerDatabase, refresh_interval: float = 15 * 60,
+                 max_age: float = 24 * 3600):
+        self.database = database
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.database.writer.execute(self._create_table)
+
+    @staticmethod
+    def _create_table(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS steam_servers (
+                ip TEXT NOT NULL,
+                port INTEGER NOT NULL,
+                query_port INTEGER NOT NULL,
+                name TEXT,
+                map_name TEXT,
+                players INTEGER DEFAULT 0,
+                max_players INTEGER DEFAULT 0,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (ip, port)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_steam_servers_fetched ON steam_servers(fetched_at)")
+        # Full-list fetch time; row fetch times also move on targeted per-host lookups
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS steam_index_meta (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            )
+        """)
+
+    def last_fetched(self) -> Optional[float]:
+        """Time of the most recent full Steam server list merged into the index"""
+        row = self.database._read_conn().execute(
+            "SELECT value FROM steam_index_meta WHERE name = 'list_fetched_at'").fetchone()
+        return row[0] if row else None
+
+    def needs_refresh(self) -> bool:
+        last_fetched = self.last_fetched()
+        return last_fetched is None or time.time() - last_fetched > self.refresh_interval
+
+    def store(self, steam_servers: List[Dict], full_list: bool = False) -> int:
+        """Merge a GetServerList response into the index, drop expired rows
+
+        full_list marks the complete server list (it resets the refresh interval);
+        targeted per-host lookups leave it False.
+        """
+        now = time.time()
+        rows = []
+        for steam_server in steam_servers:
+            addr = steam_server.get('addr', '')
+            if ':' not in addr:
+                continue
+            ip, query_port = addr.rsplit(':', 1)
+            if not query_port.isdigit():
+                continue
+            # addr carries the query port; the game port is reported separately
+            port = steam_server.get('gameport') or int(query_port)
+            rows.append((ip, port, int(query_port), steam_server.get('name'),
+                         steam_server.get('map') or 'Unknown', steam_server.get('players', 0),
+                         steam_server.get('max_players', 0), now))
+
+        def write(conn):
+            conn.executemany("""
+                INSERT INTO steam_servers (ip, port, query_port, name, map_name, players, max_players, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ip, port) DO UPDATE SET
+                    query_port = excluded.query_port,
+                    name = excluded.name,
+                    map_name = excluded.map_name,
+                    players = excluded.players,
+                    max_players = excluded.max_players,
+                    fetched_at = excluded.fetched_at
+            """, rows)
+            conn.execute("DELETE FROM steam_servers WHERE fetched_at < ?", (now - self.max_age,))
+            if full_list:
+                conn.execute("""
+                    INSERT INTO steam_index_meta (name, value) VALUES ('list_fetched_at', ?)
+                    ON CONFLICT(name) DO UPDATE SET value = excluded.value
+                """, (now,))
+
+        self.database.writer.execute(write)
+        print(f"🗺️ Steam index: merged {len(rows)} servers")
+        return len(rows)
+
+    def _entries_by_ip(self, ips: List[str]) -> Dict[str, List[Tuple[int, int, str]]]:
+        """(port, query_port, map) entries per IP, in chunks below SQLite's variable limit"""
+        entries: Dict[str, List[Tuple[int, int, str]]] = {}
+        conn = self.database._read_conn()
+        for start in range(0, len(ips), 400):
+            chunk = ips[start:start + 400]
+            cursor = conn.execute(f"""
+                SELECT ip, port, query_port, map_name FROM steam_servers
+                WHERE ip IN ({",".join("?" * len(chunk))})
+            """, chunk)
+            for row in cursor:
+                entries.setdefault(row['ip'], []).append((row['port'], row['query_port'], row['map_name']))
+        return entries
+
+    def missing_ips(self, ips: List[str]) -> List[str]:
+        """IPs with no Steam entry in the index"""
+        entries = self._entries_by_ip(ips)
+        return [ip for ip in ips if ip not in entries]
+
+    def enrich(self, servers: List[ServerRecord]) -> int:
+        """Set map_name from the index; return the number of servers matched
+
+        Matches on (ip, game port), then (ip, query port). An IP-only match is
+        used only when both sides have a single server on the host, so servers
+        sharing a host never get each other's map.
+        """
+        if not servers:
+            return 0
+        servers_per_ip = Counter(server.ip for server in servers)
+        entries = self._entries_by_ip(list(servers_per_ip))
+        enriched = 0
+        for server in servers:
+            candidates = entries.get(server.ip)
+            if not candidates:
+                continue
+            map_name = next((m for port, _, m in candidates if port == server.port), None)
+            if map_name is None:
+                map_name = next((m for _, query_port, m in candidates if query_port == server.query_port), None)
+            if map_name is None and len(candidates) == 1 and servers_per_ip[server.ip] == 1:
+                map_name = candidates[0][2]
+            if map_name and map_name != 'Unknown':
+                server.map_name = map_name
+                enriched += 1
+        return enriched
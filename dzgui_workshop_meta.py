@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+DZGUI Workshop Metadata - Cached Steam Workshop item details
+Any number of workshop IDs is resolved with concurrent, chunked GetPublishedFileDetails
+requests; titles, sizes and update times are cached in SQLite with a TTL
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from dzgui_http import get_http_session
+
+API_URL = "https://api.steampowered.com/ISteamRemoteStorage/GetPublishedFileDetails/v1/"
+
+
+@dataclass
+class WorkshopItem:
+    """Steam Workshop details of one item (title is None when Steam does not know it)"""
+    workshop_id: str
+    title: Optional[str] = None
+    description: str = ""
+    file_size: int = 0
+    time_updated: int = 0
+    fetched_at: float = 0.0
+
+    def to_info(self) -> Dict:
+        """Legacy get_mod_info_from_steam() entry"""
+        return {
+            'name': self.title or f'Mod {self.workshop_id}',
+            'description': self.description,
+            'size': self.file_size,
+            'updated': self.time_updated,
+            'subscriptions': 0,  # Not available in this API
+            'tags': []  # Not available in this API
+        }
+
+
+class WorkshopMetadataService:
+    """workshop_items table in mods.db, an in-memory copy, and in-flight request dedup
+
+    get() must run on the async runtime loop: IDs already being fetched by another
+    caller are awaited instead of requested twice.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, ttl: float = 24 * 3600,
+                 chunk_size: int = 100, max_concurrency: int = 4):
+        self.ttl = ttl
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        self.db_path = db_path or Path.home() / ".cache" / "dzgui" / "mods.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS workshop_items (
+                workshop_id TEXT PRIMARY KEY,
+                title TEXT,
+                description TEXT,
+                file_size INTEGER DEFAULT 0,
+                time_updated INTEGER DEFAULT 0,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self._lock = threading.Lock()
+
+        self.items: Dict[str, WorkshopItem] = {}
+        for row in self.conn.execute("SELECT * FROM workshop_items"):
+            self.items[row['workshop_id']] = WorkshopItem(
+                row['workshop_id'], row['title'], row['description'] or "",
+                row['file_size'] or 0, row['time_updated'] or 0, row['fetched_at'])
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def cached(self, workshop_id: str) -> Optional[WorkshopItem]:
+        """Cached details regardless of age (thread-safe, no I/O)"""
+        return self.items.get(workshop_id)
+
+    def title(self, workshop_id: str) -> Optional[str]:
+        item = self.items.get(workshop_id)
+        return item.title if item else None
+
+    def is_fresh(self, workshop_id: str) -> bool:
+        item = self.items.get(workshop_id)
+        return item is not None and time.time() - item.fetched_at < self.ttl
+
+    async def get(self, workshop_ids: Iterable[str], force: bool = False) -> Dict[str, WorkshopItem]:
+        """Details for all IDs known to Steam; stale or missing ones are fetched in one wave"""
+        workshop_ids = list(dict.fromkeys(str(workshop_id) for workshop_id in workshop_ids))
+        loop = asyncio.get_running_loop()
+
+        waiting = {}
+        to_fetch = []
+        for workshop_id in workshop_ids:
+            if not force and self.is_fresh(workshop_id):
+                continue
+            if workshop_id in self.in_flight:
+                waiting[workshop_id] = self.in_flight[workshop_id]
+            else:
+                future = loop.create_future()
+                self.in_flight[workshop_id] = future
+                waiting[workshop_id] = future
+                to_fetch.append(workshop_id)
+
+        if to_fetch:
+            chunks = [to_fetch[start:start + self.chunk_size]
+                      for start in range(0, len(to_fetch), self.chunk_size)]
+            print(f"🧩 Workshop details: {len(to_fetch)} items in {len(chunks)} requests")
+            await asyncio.gather(*(self._fetch_chunk(chunk) for chunk in chunks))
+
+        if waiting:
+            # Also covers IDs another caller is fetching; a failed fetch leaves the cached value
+            await asyncio.gather(*(asyncio.shield(future) for future in waiting.values()))
+
+        return {workshop_id: self.items[workshop_id] for workshop_id in workshop_ids
+                if workshop_id in self.items and self.items[workshop_id].title}
+
+    async def _fetch_chunk(self, chunk: List[str]):
+        """One GetPublishedFileDetails POST; resolves the in-flight futures of its IDs"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        fetched: List[WorkshopItem] = []
+        try:
+            form_data = {'itemcount': len(chunk), 'format': 'json'}
+            for i, workshop_id in enumerate(chunk):
+                form_data[f'publishedfileids[{i}]'] = workshop_id
+
+            async with self._semaphore:
+                session = await get_http_session()
+                async with session.post(API_URL, data=form_data, timeout=15) as response:
+                    if response.status != 200:
+                        print(f"Steam API returned status {response.status}")
+                        return
+                    data = await response.json()
+
+            now = time.time()
+            for details in data.get('response', {}).get('publishedfiledetails', []):
+                workshop_id = str(details.get('publishedfileid', ''))
+                if details.get('result', 0) == 1:  # Result 1 = success
+                    fetched.append(WorkshopItem(
+                        workshop_id=workshop_id,
+                        title=details.get('title'),
+                        description=details.get('description', ''),
+                        file_size=int(details.get('file_size', 0) or 0),
+                        time_updated=int(details.get('time_updated', 0) or 0),
+                        fetched_at=now
+                    ))
+                else:
+                    # Removed or private item: remembered so it is not asked again until the TTL
+                    fetched.append(WorkshopItem(workshop_id=workshop_id, fetched_at=now))
+
+            for item in fetched:
+                self.items[item.workshop_id] = item
+            await asyncio.get_running_loop().run_in_executor(None, self._store, fetched)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error getting mod info from Steam: {e}")
+        finally:
+            for workshop_id in chunk:
+                future = self.in_flight.pop(workshop_id, None)
+                if future is not None and not future.done():
+                    future.set_result(None)
+
+    def _store(self, items: List[WorkshopItem]):
+        with self._lock:
+            self.conn.executemany("""
+                INSERT INTO workshop_items (workshop_id, title, description, file_size, time_updated, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(workshop_id) DO UPDATE SET
+                    title = excluded.title,
+                    description = excluded.description,
+                    file_size = excluded.file_size,
+                    time_updated = excluded.time_updated,
+                    fetched_at = excluded.fetched_at
+            """, [(item.workshop_id, item.title, item.description, item.file_size,
+                   item.time_updated, item.fetched_at) for item in items])
+            self.conn.commit()
+
+
+# Singleton instance
+_workshop_metadata = None
+
+def get_workshop_metadata() -> WorkshopMetadataService:
+    """Get singleton workshop metadata service"""
+    global _workshop_metadata
+    if _workshop_metadata is None:
+        _workshop_metadata = WorkshopMetadataService()
+    return _workshop_metadata